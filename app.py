@@ -1,21 +1,15 @@
-from collections import deque
-from datetime import datetime
-from random import randint
 from PIL import ImageFile
 
 import streamlit as st
 import pandas as pd
-import cv2 as cv
+import altair as alt
 
-import threading
-import shutil
-import os
+from datetime import datetime
+from urllib.parse import urlparse
 
-from src.img_capture import open_capture, close_capture, capture_frame
-from src.inference import infer_image
-from src.analysis import analyse_daily_activity, analyse_total_activity
-from src.utils import get_dataframe_row, image_to_base64
-from src.gif import make_gif
+from src.cameras import CameraSet
+from src.analysis import PERIODS, build_timeline, hour_heatmap, rollup, rolling_activity
+from src.metrics import metrics
 
 ImageFile.LOAD_TRUNCATED_IMAGES = True
 
@@ -28,6 +22,62 @@ PLACEHOLDER = 'resources/placeholder.png'
 CAM_BLIND = 'resources/cam_blind.png'
 SOURCE_VIDEO = 'resources/demo.mp4'
 
+# 카메라별 설정. source는 웹캠 번호, 영상 파일, 스트림 주소(rtsp:// 등)이다.
+# 폴더를 생략하면 'frames/<카메라 이름>'처럼 카메라 이름의 하위 폴더에 저장한다.
+CAMERAS = {
+    'demo': {'source': SOURCE_VIDEO, 'frame_dir': FRAME_DIR, 'bbox_dir': BBOX_DIR, 'capture_dir': CAPTURE_DIR},
+    # 'door': {'source': 'rtsp://192.168.0.10/stream'},
+}
+
+FRAME_BUFFER_SIZE = 120
+CAPTURE_FPS = 2.0
+INFER_BATCH_SIZE = 1
+# 추론 서버가 여러 카메라의 프레임을 모아 한 번에 추론하는 최대 프레임 수
+SHARED_BATCH_SIZE = 8
+# 추론 작업자 프로세스 수와 프로세스별 torch 스레드 수. 0이면 Streamlit 프로세스 안에서 추론한다.
+INFERENCE_PROCESSES = 1
+INFERENCE_THREADS = None
+# 추론 백엔드: 'torch', 'torchscript', 'onnx' (onnx는 onnxruntime 필요)
+# int8은 YOLO는 onnx에서만, ResNet은 모든 백엔드에서 지원한다. torch/torchscript ResNet은 calibration 폴더의
+# 저장된 프레임으로 정적 양자화하므로, 저장된 프레임이 없으면 float32로 실행한다.
+INFERENCE_BACKENDS = {'yolo': 'torch', 'resnet': 'torch', 'int8': False, 'calibration': FRAME_DIR}
+# 장면 변화가 없으면 추론을 건너뛴다. None이면 모든 프레임을 추론한다.
+MOTION_GATE = {'threshold': 0.01, 'pixel_delta': 25, 'force_interval': 30.0}
+# 강아지를 찾은 뒤에는 직전 위치 주변만 탐지한다. None이면 매번 전체 프레임을 탐지한다.
+TRACKING = {'margin': 0.5, 'redetect_every': 10, 'roi_imgsz': 320}
+# 추론 시간과 CPU 여유에 맞춰 캡쳐 FPS와 추론 주기를 범위 안에서 조절한다. None이면 CAPTURE_FPS와 1초 주기로 고정한다.
+SCHEDULER = {
+    'min_capture_fps': 1.0, 'max_capture_fps': 5.0, 'min_infer_interval': 0.25, 'max_infer_interval': 2.0,
+    'target_load': 0.7, 'cpu_limit': 0.85, 'boost_duration': 5.0, 'boost_batch': 4,
+}
+# 관측이 이 시간(초)보다 오래 끊기면(앱 종료, 캡쳐 멈춤) 행동 구간을 끊는다. None이면 가장 긴 추론 주기의 5배로 한다.
+# 카메라 설정에 'segment_gap'을 두면 그 카메라만 다른 값을 쓴다.
+SEGMENT_GAP = None
+PERSIST_FRAMES = True
+# 프레임 저장 JPEG 품질과 저장 작업자 스레드 수
+JPEG_QUALITY = 90
+WRITER_WORKERS = 2
+LOG_DAYS_PER_PAGE = 7
+PREVIEW_WIDTH = 800
+PREVIEW_JPEG_QUALITY = 80
+PREVIEW_INTERVAL = '200ms'
+# 실시간 영상을 MJPEG 서버로 내보낸다. None이면 Streamlit 재실행으로 이미지를 갱신한다.
+# 스트리밍 서버에는 인증이 없으므로 기본으로 이 PC(127.0.0.1)에서만 접속을 받는다.
+# 다른 기기에서도 스트리밍으로 보려면 '0.0.0.0'으로 바꾼다. 그 외의 접속자는 재실행 방식으로 화면을 받는다.
+STREAM_PORT = 8502
+STREAM_HOST = '127.0.0.1'
+# 행동 클립 형식 ('gif' 또는 'mp4'), 가로 해상도, 동시에 만드는 클립 수
+CLIP_FORMAT = 'gif'
+CLIP_WIDTH = 480
+CLIP_WORKERS = 2
+# 카메라별 폴더 보관 정책 (용량 byte, 보관 기간 초, 파일 수). None이면 지우지 않는다.
+# 카메라 설정에 'retention'을 두면 그 카메라만 다른 정책을 쓴다.
+# captures 폴더의 캡쳐와 행동 클립은 행동 기록의 '파일'이 가리키므로 정책을 두지 않는다(지우지 않는다).
+RETENTION = {
+    'frame_dir': {'max_bytes': 500 * 1024 ** 2, 'max_age': 24 * 60 * 60, 'max_files': 1000},
+    'bbox_dir': {'max_bytes': 500 * 1024 ** 2, 'max_age': 24 * 60 * 60, 'max_files': 1000},
+}
+
 BEEPS = {
     '알림음 끄기': '',
     '기본 알림음': 'https://www.soundjay.com/buttons/sounds/beep-07a.mp3',
@@ -37,21 +87,27 @@ BEHAVIORS = ['FEETUP', 'LYING', 'SIT', 'WALK']
 NODOG = '강아지 없음'
 
 
-os.makedirs(BBOX_DIR, exist_ok=True)
-os.makedirs(FRAME_DIR, exist_ok=True)
-os.makedirs(CAPTURE_DIR, exist_ok=True)
+@st.cache_resource
+def get_cameras():
+    """모든 브라우저 세션이 공유하는 카메라 파이프라인들. 프로세스당 한 번만 생성된다."""
+    return CameraSet(
+        CAMERAS, log_dir=LOG_DIR, frame_dir=FRAME_DIR, bbox_dir=BBOX_DIR, capture_dir=CAPTURE_DIR,
+        backends=INFERENCE_BACKENDS, shared_batch_size=SHARED_BATCH_SIZE, stream_port=STREAM_PORT, stream_host=STREAM_HOST,
+        retention=RETENTION, inference_processes=INFERENCE_PROCESSES, inference_threads=INFERENCE_THREADS,
+        buffer_size=FRAME_BUFFER_SIZE, capture_fps=CAPTURE_FPS,
+        infer_batch_size=INFER_BATCH_SIZE, persist_frames=PERSIST_FRAMES,
+        jpeg_quality=JPEG_QUALITY, writer_workers=WRITER_WORKERS,
+        motion_gate=MOTION_GATE, tracking=TRACKING, scheduler=SCHEDULER, segment_gap=SEGMENT_GAP,
+        preview_width=PREVIEW_WIDTH, preview_quality=PREVIEW_JPEG_QUALITY,
+        clip_format=CLIP_FORMAT, clip_width=CLIP_WIDTH, clip_workers=CLIP_WORKERS,
+    ).start()
 
 
-def load_logs(log_dir='logs/'):
-    logs = []
-    for i, file_name in enumerate(os.listdir(log_dir)):
-        df = pd.read_csv(os.path.join(log_dir, file_name))
-        logs.append(df)
-    if not logs:
-        logs.append(pd.DataFrame(columns=['날짜', '시간', '행동']))
-    log = logs.pop()
-    logs.reverse()
-    return log, logs
+cameras = get_cameras()
+
+if 'camera' not in st.session_state or st.session_state.camera not in cameras.pipelines:
+    st.session_state.camera = next(iter(cameras))
+pipeline = cameras[st.session_state.camera]
 
 
 """
@@ -60,67 +116,40 @@ def load_logs(log_dir='logs/'):
 
 if 'placeholder' not in st.session_state:
     st.session_state.placeholder = 0 
-if 'log' not in st.session_state:
-    st.session_state.log, st.session_state.logs = load_logs()
-if 'behavior' not in st.session_state:
-    st.session_state.behavior = NODOG
+if 'last_events' not in st.session_state:
+    st.session_state.last_events = {name: camera.event_seq for name, camera in cameras.items()}
 if 'beep' not in st.session_state:
     st.session_state.beep = list(BEEPS.keys())[1]
 if 'noti_filter' not in st.session_state:
     st.session_state.noti_filter = []
 if 'log_filter' not in st.session_state:
     st.session_state.log_filter = []
+if 'log_cameras' not in st.session_state:
+    st.session_state.log_cameras = []
 if 'log_expanded' not in st.session_state:
     st.session_state.log_expanded = {}
+if 'log_page' not in st.session_state:
+    st.session_state.log_page = 0
+if 'log_version' not in st.session_state:
+    st.session_state.log_version = cameras.log_version
 if 'is_mic_on' not in st.session_state:
     st.session_state.is_mic_on = False
 if 'is_cam_on' not in st.session_state:
     st.session_state.is_cam_on = True
-    
-if 'demo_cap' not in st.session_state:
-    st.session_state.demo_cap = open_capture(SOURCE_VIDEO)
-
-if 'frames' not in st.session_state:
-    frames = os.listdir(FRAME_DIR)
-    for i in range(len(frames)):
-        frame = frames[i]
-        timestamp = datetime.strptime(frame[:-4], r'%Y-%m-%d %H_%M_%S_%f')
-        frames[i] = (os.path.join(FRAME_DIR, frame), timestamp)
-    frames = deque(frames)
-    st.session_state.frames = frames
-if 'bbox_frames' not in st.session_state:
-    bbox_frames = os.listdir(BBOX_DIR)
-    for i in range(len(bbox_frames)):
-        file_path = bbox_frames[i]
-        file_name = os.path.basename(file_path)
-        if len(file_name[:-4].split(maxsplit=3)) != 4:
-            continue
-        d, t, has_dog, behavior = file_name[:-4].split(maxsplit=3)
-        timestamp = datetime.strptime(f'{d} {t}', r'%Y-%m-%d %H_%M_%S_%f')
-        bbox_frames[i] = (file_path, timestamp, has_dog, behavior)
-    bbox_frames = deque(bbox_frames)
-    st.session_state.bbox_frames = bbox_frames
+if 'show_bbox' not in st.session_state:
+    st.session_state.show_bbox = False
+
 if 'is_demo' not in st.session_state:
     st.session_state.is_demo = True
-if 'gif_queue' not in st.session_state:
-    st.session_state.gif_queue = deque()
 
 
-def add_log(tiemstamp, behavior, image_path, notify=True):
-    row = get_dataframe_row(tiemstamp.date(), tiemstamp.time(), behavior, image_path)
-    if st.session_state.log.empty or st.session_state.log.iloc[0]['날짜'] == row.iloc[0]['날짜']:
-        st.session_state.log = pd.concat([row, st.session_state.log], ignore_index=True)
-    else:
-        st.session_state.logs.insert(0, st.session_state.log)
-        st.session_state.log = row
-    if not st.session_state.log.empty:
-        st.session_state.log.to_csv(os.path.join(LOG_DIR, st.session_state.log.iloc[0]['날짜'] + '.csv'), index=False)
-    if notify and behavior in st.session_state.noti_filter:
+def notify(behavior, camera=None):
+    if behavior in st.session_state.noti_filter:
         st.html(
             f'<audio autoplay><source src="{BEEPS[st.session_state.beep]}" type="audio/mpeg"></audio>'
         )
-        st.toast(f'행동이 감지되었습니다: {behavior}', icon='🐶')
-    st.session_state.behavior = behavior
+        where = f' ({camera})' if camera is not None and len(cameras) > 1 else ''
+        st.toast(f'행동이 감지되었습니다: {behavior}{where}', icon='🐶')
 
 
 """
@@ -128,23 +157,57 @@ def add_log(tiemstamp, behavior, image_path, notify=True):
 """
 
 
-@st.fragment(run_every='100ms')
+def stream_url():
+    """
+    이 브라우저가 Streamlit에 접속한 호스트 이름으로 스트리밍 서버 주소를 만든다.
+    서버가 없거나, 이 PC에서만 접속을 받는데 다른 기기에서 접속했거나, https 화면이라 http 스트림을 받을 수 없으면 None.
+    """
+    if cameras.stream_server is None:
+        return None
+    url = urlparse(st.context.url or '')
+    host = url.hostname or 'localhost'
+    if url.scheme == 'https':
+        return None
+    if STREAM_HOST in ('127.0.0.1', 'localhost', '::1') and host not in ('127.0.0.1', 'localhost', '::1'):
+        return None
+    return f'http://{f"[{host}]" if ":" in host else host}:{STREAM_PORT}'
+
+
 def realtime_image():
-    if st.session_state.is_cam_on:
-        image = ''
-        if frames := os.listdir(FRAME_DIR):
-            image = os.path.join(FRAME_DIR, frames[-1])
-        if not os.path.exists(image):
-            image = PLACEHOLDER
+    url = stream_url()
+    if url is not None and st.session_state.is_cam_on:
+        # 스트리밍 서버가 프레임을 직접 보내므로 Streamlit은 재실행 없이 <img>만 한 번 그린다.
+        stream = 'annotated' if st.session_state.show_bbox else 'raw'
+        st.html(f'<img src="{url}/{st.session_state.camera}/{stream}.mjpg" style="width: 100%;">')
+    else:
+        realtime_image_fragment()
+
+
+@st.fragment(run_every=PREVIEW_INTERVAL)
+def realtime_image_fragment():
+    # 미리보기는 프레임마다 한 번만 인코딩되어 모든 화면이 같은 바이트를 받는다.
+    # 마지막으로 그린 (카메라, 화면, 프레임 번호)와 이미지를 세션에 두고, 바뀌지 않았으면 버퍼를 읽지 않고 그 이미지를 다시 쓴다.
+    # fragment가 다시 실행될 때 그리지 않은 요소는 화면에서 지워지므로 st.image는 건너뛸 수 없다.
+    # 같은 이미지는 같은 미디어 URL로 전달되어 브라우저가 다시 받지 않는다.
+    preview = pipeline.bbox_preview if st.session_state.show_bbox else pipeline.preview
+    if not st.session_state.is_cam_on:
+        key, image = None, CAM_BLIND
     else:
-        image = CAM_BLIND
+        key = (st.session_state.camera, st.session_state.show_bbox, preview.version)
+        rendered = st.session_state.get('preview_rendered')
+        if rendered is not None and rendered[0] == key:
+            image = rendered[1]
+        else:
+            latest = preview.get()
+            image = latest[1] if latest and latest[1] else PLACEHOLDER
+            st.session_state.preview_rendered = (key, image)
     st.image(image, use_container_width=True, width=800)
 
 
 @st.fragment(run_every='100ms')
 def dataframe_brief():
     st.dataframe(
-        st.session_state.log.head(10), 
+        cameras.log_store.latest(10, cameras=[st.session_state.camera]), 
         use_container_width=True, hide_index=True,
         column_config={
             '파일': st.column_config.LinkColumn(display_text="탐색기에서 열기")
@@ -152,15 +215,27 @@ def dataframe_brief():
     )
 
 
-@st.fragment(run_every='100ms')
+@st.cache_data(max_entries=64, show_spinner=False)
+def load_log_page(log_filter, camera_filter, version, page):
+    """
+    필터에 맞는 기록 중 page번째 페이지에 보이는 날짜들만 읽는다.
+    결과는 (필터, 카메라 필터, 데이터 버전, 페이지)로 캐시되므로, 기록이 바뀌지 않으면 다시 조회하지 않는다.
+    """
+    days = cameras.log_store.days(list(log_filter), list(camera_filter))
+    pages = max(1, -(-len(days) // LOG_DAYS_PER_PAGE))
+    visible = days[page * LOG_DAYS_PER_PAGE:(page + 1) * LOG_DAYS_PER_PAGE]
+    return [cameras.log_store.day(day, list(log_filter), list(camera_filter)) for day in visible], pages
+
+
+@st.fragment()
 def entire_dataframes():
     has_no_data = True
-    is_first = True
-    logs = [st.session_state.log] + st.session_state.logs
+    is_first = st.session_state.log_page == 0
+    log_filter = tuple(sorted(st.session_state.log_filter))
+    camera_filter = tuple(sorted(st.session_state.log_cameras))
+    dfs, pages = load_log_page(log_filter, camera_filter, cameras.log_version, st.session_state.log_page)
     with st.container():
-        for df in logs:
-            if st.session_state.log_filter:
-                df = df[df['행동'].isin(st.session_state.log_filter)]
+        for df in dfs:
             if df.empty:
                 continue
             has_no_data = False
@@ -180,11 +255,84 @@ def entire_dataframes():
                 )
         if has_no_data:
             st.caption('행동 기록이 없습니다.')
+        if pages > 1:
+            col1, col2, col3 = st.columns([1, 2, 1])
+            col1.button(
+                '◀ 최근', use_container_width=True, disabled=st.session_state.log_page == 0,
+                on_click=move_log_page, args=(-1,)
+            )
+            col2.caption(f'{st.session_state.log_page + 1} / {pages} 페이지')
+            col3.button(
+                '이전 ▶', use_container_width=True, disabled=st.session_state.log_page >= pages - 1,
+                on_click=move_log_page, args=(1,)
+            )
+
+
+@st.fragment()
+def segment_search():
+    col1, col2, col3 = st.columns([2, 1, 1])
+    today = datetime.now().date()
+    period = col1.date_input('기간', value=(today - pd.Timedelta(days=7), today), max_value=today)
+    min_minutes = col2.number_input('최소 지속 시간(분)', min_value=0.0, value=0.0, step=1.0)
+    moment = col3.time_input('이 시각의 행동', value=None, help='기간의 마지막 날 이 시각에 무엇을 했는지 찾습니다.')
+    if len(period) != 2:
+        return
+    start = datetime.combine(period[0], datetime.min.time())
+    end = datetime.combine(period[1], datetime.min.time()) + pd.Timedelta(days=1)
+    names = st.session_state.log_cameras or list(cameras)
+
+    if moment is not None:
+        at = datetime.combine(period[1], moment)
+        for name in names:
+            segment = cameras[name].segments.at(at)
+            prefix = f'[{name}] ' if len(cameras) > 1 else ''
+            if segment is None:
+                st.caption(f'{prefix}{at:%m월 %d일 %H:%M}의 기록이 없습니다.')
+            else:
+                st.caption(f'{prefix}{at:%m월 %d일 %H:%M}: {segment.behavior} '
+                           f'({segment.start:%H:%M:%S} ~ {segment.end:%H:%M:%S})')
+
+    frames = []
+    for name in names:
+        segments = cameras[name].segments.overlapping(
+            start, end, st.session_state.log_filter or None, min_minutes * 60 or None,
+        )
+        df = cameras[name].segments.to_frame(segments)
+        df.insert(0, '카메라', name)
+        frames.append(df)
+    df = pd.concat(frames, ignore_index=True).sort_values('시작', ascending=False) if frames else pd.DataFrame()
+    if df.empty:
+        st.caption('조건에 맞는 행동 구간이 없습니다.')
+        return
+    df['지속 시간'] = df['지속 시간'].map(lambda t: str(t).split('.')[0].replace('0 days ', ''))
+    if len(cameras) == 1:
+        df = df.drop(columns=['카메라'])
+    st.dataframe(
+        df, use_container_width=True, hide_index=True,
+        column_config={
+            '시작': st.column_config.DatetimeColumn(format='MM월 DD일 HH:mm:ss'),
+            '끝': st.column_config.DatetimeColumn(format='HH:mm:ss'),
+            '파일': st.column_config.LinkColumn(display_text='클립 열기'),
+        },
+    )
+
+
+def move_log_page(step):
+    st.session_state.log_page += step
+
+
+@st.fragment(run_every='1s')
+def watch_logs():
+    """기록이 바뀌었을 때만 화면을 다시 그린다."""
+    if cameras.log_version != st.session_state.log_version:
+        st.session_state.log_version = cameras.log_version
+        st.rerun()
 
 
 @st.fragment()
 def toolbar():
-    col1, col2, col3, col4 = st.columns(4)
+    view = (st.session_state.is_cam_on, st.session_state.show_bbox)
+    col1, col2, col5, col3, col4 = st.columns(5)
     with col1:
         st.session_state.is_mic_on = st.toggle(
             '🎙️ 마이크', 
@@ -197,11 +345,17 @@ def toolbar():
             value=True, 
             help='화면에서 실시간 카메라 화면이 가려지지만, 녹화와 분석은 계속 진행됩니다.'
         )
+    with col5:
+        st.session_state.show_bbox = st.toggle(
+            '🔲 분석 화면',
+            value=False,
+            help='강아지의 위치와 행동이 표시된 화면을 보여줍니다.'
+        )
+    if stream_url() is not None and view != (st.session_state.is_cam_on, st.session_state.show_bbox):
+        # 스트리밍 화면은 재실행 없이 그려지므로 화면 설정이 바뀌면 전체를 다시 그린다.
+        st.rerun()
     with col3:
-        if st.button('캡쳐하기', icon='📸', use_container_width=True) and frames:
-            image, timestamp = frames[-1]
-            shutil.copy(image, CAPTURE_DIR)
-            add_log(timestamp, st.session_state.behavior, os.path.join(CAPTURE_DIR, os.path.basename(image)), notify=False)
+        if st.button('캡쳐하기', icon='📸', use_container_width=True) and pipeline.capture_latest():
             st.toast('캡쳐된 이미지가 저장되었습니다.', icon='📸')
     with col4:
         st.button('저장소 열기', icon='📂', use_container_width=True)
@@ -215,9 +369,151 @@ def mic_info():
         st.empty()
 
 
+@st.fragment(run_every='1s')
+def capture_stats():
+    stats = pipeline.capture_stats()
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric('캡쳐 FPS', f'{stats["actual_fps"]:.1f}', help=f'목표 {stats["target_fps"]:.1f} FPS')
+    col2.metric('캡쳐된 프레임', stats['captured'])
+    col3.metric('버려진 프레임', stats['dropped'], help='추론하기 전에 프레임 버퍼에서 밀려난 프레임 수')
+    col4.metric('읽기 지연', f'{stats["last_read_ms"]:.0f} ms')
+
+
+@st.fragment(run_every='1s')
+def inference_stats():
+    stats = pipeline.inference_stats()
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric('처리한 프레임', stats['processed'])
+    if 'skip_ratio' in stats:
+        col2.metric('건너뛴 비율', f'{stats["skip_ratio"] * 100:.1f} %', help='장면 변화가 없어 이전 결과를 재사용한 프레임의 비율')
+        col3.metric('강제 재확인', stats['forced'])
+        col4.metric('장면 변화량', f'{stats["last_score"] * 100:.2f} %')
+    if 'roi_ratio' in stats:
+        col1, col2, col3, _ = st.columns(4)
+        col1.metric('전체 탐지', stats['full_detections'])
+        col2.metric('ROI 탐지 비율', f'{stats["roi_ratio"] * 100:.1f} %', help='직전 위치 주변만 탐지한 프레임의 비율')
+        col3.metric('추적 실패', stats['lost'])
+    if 'infer_interval' in stats:
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric('추론 FPS', f'{stats["infer_fps"]:.2f}', help=f'추론 주기 {stats["infer_interval"]:.2f}초'
+                    + (' (행동 변화 직후 우선 추론 중)' if stats['boosting'] else ''))
+        col2.metric('목표 캡쳐 FPS', f'{stats["capture_fps_target"]:.1f}', help='추론 시간과 CPU 여유에 맞춘 캡쳐 속도')
+        col3.metric('프레임당 추론', f'{stats["frame_ms"]:.0f} ms' if stats['frame_ms'] is not None else '-',
+                    help=f'CPU 사용률 {stats["cpu_usage"] * 100:.0f} % ({stats["cpu_source"]})' if stats['cpu_usage'] is not None else None)
+        col4.metric('추론 못 한 프레임', stats['skipped_frames'], help='추론이 밀려 건너뛴 프레임 수')
+        if stats['cpu_source'] is None:
+            st.caption('⚠️ CPU 사용률을 읽을 수 없어 CPU 여유에 맞춘 조절을 하지 않습니다. psutil을 설치하세요.')
+    shared = cameras.inference.stats()
+    col1, col2, col3, _ = st.columns(4)
+    col1.metric('추론 배치', shared['batches'], help='모든 카메라가 함께 쓰는 추론 서버가 실행한 배치 수')
+    col2.metric('평균 배치 크기', f'{shared["mean_batch"]:.1f}')
+    col3.metric('배치 추론 시간', f'{shared["last_infer_ms"]:.0f} ms')
+
+
+@st.fragment(run_every='1s')
+def clip_stats():
+    report = pipeline.clip_report()
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric('생성한 클립', report['clips'])
+    col2.metric('대기 중', report['pending'])
+    if report['clips']:
+        col3.metric('평균 인코딩 시간', f'{report["mean_encode_ms"]:.0f} ms')
+        col4.metric('평균 크기', f'{report["mean_bytes"] / 1024:.0f} KB')
+
+
+@st.fragment(run_every='5s')
+def storage_stats():
+    writer = pipeline.frame_writer.stats()
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric('저장한 프레임', writer['written'], help=f'{writer["written_bytes"] / 1024 ** 2:.1f} MB')
+    col2.metric('저장 대기', writer['queue_depth'])
+    col3.metric('저장 지연', f'{writer["mean_latency_ms"]:.0f} ms' if writer['mean_latency_ms'] is not None else '-',
+                help='제출부터 디스크 동기화까지 걸린 평균 시간')
+    col4.metric('버려진 저장', writer['dropped'], help=f'큐가 가득 차 기다린 횟수 {writer["blocked"]}')
+    rows = []
+    for directory, usage in pipeline.janitor.usage().items():
+        rows.append({
+            '폴더': directory,
+            '파일 수': usage['files'],
+            '용량': f'{usage["bytes"] / 1024 ** 2:.1f} MB',
+            '정리한 파일': usage['deleted_files'],
+            '정리한 용량': f'{usage["deleted_bytes"] / 1024 ** 2:.1f} MB',
+        })
+    st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+
+
+@st.fragment(run_every='1s')
+def model_stats():
+    rows = []
+    for name, stats in pipeline.model_report().items():
+        rows.append({
+            '모델': name,
+            '로드': '완료' if stats['loaded'] else '대기',
+            '로드 시간': f'{stats["load_ms"]:.0f} ms' if stats['load_ms'] is not None else '-',
+            '예열 시간': f'{stats["warmup_ms"]:.0f} ms' if stats['warmup_ms'] is not None else '-',
+        })
+    st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+    st.caption(f'추론 백엔드: YOLO {INFERENCE_BACKENDS["yolo"]}, ResNet {INFERENCE_BACKENDS["resnet"]}'
+               + (' (int8)' if INFERENCE_BACKENDS['int8'] else ''))
+
+
+@st.fragment(run_every='1s')
+def worker_stats():
+    rows = []
+    for i, worker in enumerate(cameras.inference.health()):
+        rows.append({
+            '작업자': i,
+            'PID': worker['pid'],
+            '상태': ('준비' if worker['ready'] else '로드 중') if worker['alive'] else '중지',
+            '처리한 배치': worker['completed'],
+            '실패': worker['failed'],
+            '재시작': worker['restarts'],
+            '마지막 응답': datetime.fromtimestamp(worker['last_seen']).strftime('%H:%M:%S') if worker['last_seen'] else '-',
+            '마지막 오류': worker['last_error'] or '-',
+        })
+    st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+
+
+@st.fragment(run_every='2s')
+def diagnostics():
+    report = metrics.report()
+    rows = []
+    for row in report['histograms']:
+        if row['metric'] != 'stage_seconds':
+            continue
+        labels = row['labels']
+        rows.append({
+            '단계': labels.get('stage'),
+            '카메라': labels.get('camera', '-'),
+            '프로세스': labels.get('process', 'app'),
+            '횟수': row['count'],
+            '평균': f'{row["mean_ms"]:.1f} ms',
+            'p50': f'{row["p50_ms"]:.1f} ms',
+            'p90': f'{row["p90_ms"]:.1f} ms',
+            'p99': f'{row["p99_ms"]:.1f} ms',
+        })
+    if rows:
+        st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+    else:
+        st.caption('아직 측정된 값이 없습니다.')
+    queues = {
+        f'{value["labels"]["queue"]}' + (f' ({value["labels"]["camera"]})' if 'camera' in value['labels'] else ''): value['value']
+        for value in report['values'] if value['metric'] == 'queue_depth'
+    }
+    if queues:
+        columns = st.columns(min(len(queues), 6))
+        for i, (name, depth) in enumerate(sorted(queues.items())):
+            columns[i % len(columns)].metric(name, depth, help='대기열에 쌓인 작업 수')
+    if cameras.stream_server is not None:
+        st.caption(f'Prometheus 형식의 전체 지표: {stream_url() or f"http://localhost:{STREAM_PORT}"}/metrics')
+
+
 @st.fragment(run_every='5s')
 def analysis():
-    df = analyse_total_activity([st.session_state.log] + st.session_state.logs)
+    df = pipeline.activity.summary()
+    if df.empty:
+        st.caption('행동 기록이 없습니다.')
+        return
     cur = df.iloc[len(df) - 1]
     
     if -5.0 <= cur['활동량 변화'] <= 5.0:
@@ -236,6 +532,42 @@ def analysis():
     st.line_chart(df, x='날짜', y='활동량', x_label='', y_label='', height=300)
 
 
+@st.cache_data(max_entries=4, show_spinner=False)
+def load_timeline(camera, version):
+    return build_timeline(cameras.log_store.timeline(cameras=[camera]))
+
+
+@st.fragment()
+def activity_rollups():
+    period = st.segmented_control(
+        '집계 단위', options=list(PERIODS), default='day', key='rollup_period',
+        format_func={'hour': '시간', 'day': '일', 'week': '주', 'month': '월'}.get,
+    ) or 'day'
+    timeline = load_timeline(pipeline.camera, cameras.log_version)
+    if timeline.empty:
+        st.caption('행동 기록이 없습니다.')
+        return
+    table = rollup(timeline, period)
+    trend = rolling_activity(table, period)
+
+    st.markdown('##### 활동량')
+    st.line_chart(trend, x_label='', y_label='%', height=300)
+    st.markdown('##### 행동별 시간')
+    hours = (table.drop(columns=['합계', '활동량']) / 3600).loc[:, lambda df: df.sum() > 0]
+    st.bar_chart(hours, x_label='', y_label='시간', height=300)
+    st.markdown('##### 시간대별 활동량')
+    heatmap = hour_heatmap(timeline).reset_index(names='요일').melt('요일', var_name='시', value_name='활동량')
+    st.altair_chart(
+        alt.Chart(heatmap).mark_rect().encode(
+            x=alt.X('시:O', title='시'),
+            y=alt.Y('요일:O', sort=list(heatmap['요일'].unique()), title=''),
+            color=alt.Color('활동량:Q', scale=alt.Scale(scheme='oranges'), title='활동량 (%)'),
+            tooltip=['요일', '시', alt.Tooltip('활동량:Q', format='.1f')],
+        ),
+        use_container_width=True,
+    )
+
+
 """
 뷰 배치
 """
@@ -244,11 +576,13 @@ st.set_page_config(
     page_title='로건 - 반려견 행동 분석',
     layout='wide'
 )
-tab_realtime, tab_log, tab_config = st.tabs(['🔴 실시간 영상', '📋 전체 행동 기록', '⚙️ 설정'])
+tab_realtime, tab_log, tab_analysis, tab_config = st.tabs(['🔴 실시간 영상', '📋 전체 행동 기록', '📊 활동 분석', '⚙️ 설정'])
 
 with tab_realtime:
     # col1, col2 = st.columns([6, 4])
     # with col1:
+    if len(cameras) > 1:
+        st.segmented_control('카메라', options=list(cameras), key='camera', label_visibility='collapsed')
     toolbar()
     realtime_image()
     # with col2:
@@ -265,12 +599,28 @@ with tab_log:
         analysis()
     with col2:
         st.markdown('### 행동 기록')
-        st.session_state.log_filter = st.multiselect(
+        log_filter = st.multiselect(
             label='검색 필터',
             options=[NODOG] + BEHAVIORS,
             placeholder='검색 조건을 추가하세요.'
         )
+        log_cameras = st.multiselect(
+            label='카메라',
+            options=list(cameras),
+            placeholder='모든 카메라',
+        ) if len(cameras) > 1 else []
+        if log_filter != st.session_state.log_filter or log_cameras != st.session_state.log_cameras:
+            st.session_state.log_page = 0
+        st.session_state.log_filter = log_filter
+        st.session_state.log_cameras = log_cameras
         entire_dataframes()
+        with st.expander('행동 구간 검색'):
+            segment_search()
+        watch_logs()
+
+with tab_analysis:
+    st.markdown(f'### 활동 분석 ({st.session_state.camera})' if len(cameras) > 1 else '### 활동 분석')
+    activity_rollups()
 
 with tab_config:
     col1, col2 = st.columns([1, 4])
@@ -297,105 +647,40 @@ with tab_config:
                 )
         st.markdown('### 접근성 설정')
         st.session_state.is_demo = st.toggle('시연 모드', value=True)
+        st.markdown(f'### 카메라 상태 ({st.session_state.camera})' if len(cameras) > 1 else '### 카메라 상태')
+        capture_stats()
+        st.markdown('### 추론 상태')
+        inference_stats()
+        st.markdown('### 클립 생성')
+        clip_stats()
+        st.markdown('### 저장 공간')
+        storage_stats()
+        if INFERENCE_PROCESSES:
+            st.markdown('### 추론 작업자')
+            worker_stats()
+        else:
+            st.markdown('### 모델 상태')
+            model_stats()
+        st.markdown('### 단계별 처리 시간')
+        diagnostics()
+        if st.button('백엔드 정확도 비교', help='현재 백엔드의 출력을 기본 PyTorch 모델과 비교합니다.'):
+            with st.spinner('비교 중...'):
+                try:
+                    st.json(pipeline.backend_parity())
+                except ValueError as e:
+                    st.warning(str(e))
 
 """
 작업 코루틴
 """
 
 
-@st.fragment(run_every='500ms')
-def take_frame():
-    frames = st.session_state.frames
-    demo_cap = st.session_state.demo_cap
-    
-    frame, timestamp = capture_frame(demo_cap, FRAME_DIR)
-    if frame is None:
-        return
-    frames.append((frame, timestamp))
-take_frame()
-
-
-@st.fragment(run_every='1s')
-def infer():
-    frames = st.session_state.frames
-    bbox_frames = st.session_state.bbox_frames
-    gif_queue = st.session_state.gif_queue
-    if not frames:
-        return
-    
-    if bbox_frames and isinstance(bbox_frames[-1], tuple):
-        _, _, has_dog, behavior = bbox_frames[-1]
-    else:
-        has_dog = False
-        behavior = NODOG
-    
-    if not frames:
-        return
-    
-    frame, timestamp = frames[-1]
-    
-    result = infer_image(frame, has_dog, behavior, magic=len(bbox_frames))
-    # result = {'bbox_image_path': bbox_frame, 'has_dog': True, 'current_class': 'WALK', 'make_gif': len(bbox_frames) > 100}
-    print(f'infer: {result}')
-    bbox_image = result['bbox_image_path']
-    has_dog = result['has_dog']
-    behavior = result['current_class']
-    # need_gif = result['make_gif']
-    need_gif = len(bbox_frames) == 108
-    
-    bbox_frames.append((bbox_image, timestamp, has_dog, behavior))
-    
-    if need_gif:
-        gif_name = f'{timestamp.strftime(r'%Y-%m-%d %H_%M_%S_%f')}.gif'
-        gif_queue.append((gif_name, timestamp))
-        add_log(timestamp, behavior, os.path.join(CAPTURE_DIR, gif_name))
-    
-    st.session_state.behavior = behavior
-infer()
-
-
-@st.fragment(run_every='1s')
-def gif():
-    gif_queue = st.session_state.gif_queue
-    print(f'@@@ gif: {gif_queue}')
-    DURATION = 10
-    
-    if not gif_queue:
-        return
-    
-    gif_name, timestamp = gif_queue[0]
-    while (datetime.now() - timestamp).total_seconds() > DURATION // 2:
-        threading.Thread(target=make_gif, args=(BBOX_DIR, CAPTURE_DIR, gif_name, 10 * DURATION), daemon=True).start()
-        gif_queue.popleft()
-        if not gif_queue:
-            break
-        gif_name, timestamp = gif_queue[0]
-gif()
-
-
 @st.fragment(run_every='1s')
-def remove_old_frame():
-    print(f'@@@ remove_old_frame')
-    frames = st.session_state.frames
-    bbox_frames = st.session_state.bbox_frames
-    
-    while len(frames) > 1000:
-        to_remove, _ = frames[0]
-        if os.path.exists(to_remove):
-            try:
-                os.remove(to_remove)
-            except Exception as e:
-                print(e)
-                continue
-        frames.popleft()
-
-    while len(bbox_frames) > 1000:
-        to_remove, _, _, _ = bbox_frames[0]
-        if os.path.exists(to_remove):
-            try:
-                os.remove(to_remove)
-            except Exception as e:
-                print(e)
-                continue
-        bbox_frames.popleft()
-remove_old_frame()
+def subscribe_events():
+    # 알림은 화면에 보이는 카메라와 관계없이 모든 카메라에서 받는다.
+    for name, camera in cameras.items():
+        for seq, _, behavior, need_notify in camera.events_since(st.session_state.last_events.get(name, 0)):
+            if need_notify:
+                notify(behavior, name)
+            st.session_state.last_events[name] = seq
+subscribe_events()
@@ -1,7 +1,17 @@
+import threading
+import numpy as np
 import pandas as pd
+from collections import defaultdict
 from datetime import timedelta
 
 NODOG = '강아지 없음'
+LABELS = ['LYING', 'SIT', 'WALK', 'FEETUP', 'BODYSHAKE']
+# 활동량은 100 - (쉬는 행동의 비율)로 계산한다.
+RESTING = ['LYING', 'SIT']
+# 집계 단위별 기간 시작 시각과 이동 평균 기본 창 크기
+PERIODS = {'hour': 'h', 'day': 'D', 'week': 'W-MON', 'month': 'MS'}
+ROLLING_WINDOWS = {'hour': 24, 'day': 7, 'week': 4, 'month': 3}
+WEEKDAYS = ['월', '화', '수', '목', '금', '토', '일']
 
 
 def analyse_daily_activity(df: pd.DataFrame, labels=['LYING', 'SIT', 'WALK', 'FEETUP', 'BODYSHAKE']):
@@ -21,7 +31,7 @@ def analyse_daily_activity(df: pd.DataFrame, labels=['LYING', 'SIT', 'WALK', 'FE
             t = duration_of_behavior[behavior]
             results['행동'].append(behavior)
             results['총 지속 시간'].append(t)
-            results['비율'].append(t / total_duration * 100)
+            results['비율'].append(t / total_duration * 100 if total_duration else 0)
         else:
             results['행동'].append(behavior)
             results['총 지속 시간'].append(timedelta(seconds=0))
@@ -31,14 +41,254 @@ def analyse_daily_activity(df: pd.DataFrame, labels=['LYING', 'SIT', 'WALK', 'FE
 
 
 def analyse_total_activity(dfs: list[pd.DataFrame]):
-    results = {'날짜': [], '활동량': []}
-    for df in dfs:
-        daily = analyse_daily_activity(df)
-        results['날짜'].append(df['날짜'].iloc[0])
-        results['활동량'].append(100.0 - daily['비율']['LYING'] - daily['비율']['SIT'])
-    df = pd.DataFrame(results)
+    """날짜별 DataFrame 목록을 하나의 타임라인으로 합쳐 한 번에 일별 활동량을 계산한다."""
+    dfs = [df for df in dfs if not df.empty]
+    if not dfs:
+        return pd.DataFrame(columns=['index', '날짜', '활동량', '활동량 변화'])
+    daily = rollup(build_timeline(pd.concat(dfs, ignore_index=True)), 'day')['활동량']
+    dates = [df['날짜'].iloc[0] for df in dfs]
+    days = pd.to_datetime(pd.Series(dates), format=r'%Y년 %m월 %d일')
+    # 강아지 없음 기록만 있는 날은 analyse_daily_activity와 같이 활동량 100으로 본다.
+    df = pd.DataFrame({'날짜': dates, '활동량': daily.reindex(days).fillna(100.0).to_numpy()})
     df = df.sort_values('날짜')
     df['활동량 변화'] = df['활동량'].diff().fillna(0)
     df = df.reset_index()
-    
-    return df
\ No newline at end of file
+
+    return df
+
+
+def build_timeline(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    행동 기록 전체를 하나의 열 형식 타임라인으로 만든다.
+    analyse_daily_activity와 같이 강아지 없음 기록은 빼고, 각 행동은 같은 날(같은 카메라)의 다음 행동까지 이어진 것으로 본다.
+
+    Args:
+        df (pd.DataFrame): LogStore.timeline() 결과(ts, behavior, camera) 또는 CSV 형식(날짜, 시간, 행동)
+
+    Returns:
+        pd.DataFrame: start, end, behavior, camera, seconds 열 (start 순서)
+    """
+    if 'ts' in df:
+        start, behavior = pd.to_datetime(df['ts']), df['behavior']
+    else:
+        start = pd.to_datetime(df['날짜'] + ' ' + df['시간'], format=r'%Y년 %m월 %d일 %H시 %M분 %S초 %f')
+        behavior = df['행동']
+    camera = df['camera'].fillna('') if 'camera' in df else ''
+    timeline = pd.DataFrame({'start': start.to_numpy(), 'behavior': behavior.to_numpy(), 'camera': camera})
+    timeline = timeline[timeline['behavior'] != NODOG].sort_values(['camera', 'start'], kind='stable')
+
+    day = timeline['start'].dt.normalize()
+    timeline['end'] = timeline.groupby([timeline['camera'], day])['start'].shift(-1).fillna(timeline['start'])
+    timeline['seconds'] = (timeline['end'] - timeline['start']).dt.total_seconds()
+    return timeline.sort_values('start', kind='stable').reset_index(drop=True)
+
+
+def split_hours(timeline: pd.DataFrame) -> pd.DataFrame:
+    """
+    타임라인의 각 구간을 정시 경계에서 자른다. 10시 50분부터 30분 이어진 행동은 10시에 10분, 11시에 20분이 된다.
+
+    Returns:
+        pd.DataFrame: hour(구간이 속한 정시), behavior, camera, seconds 열
+    """
+    step = np.timedelta64(1, 'h')
+    start = timeline['start'].to_numpy()
+    end = timeline['end'].to_numpy()
+    first = timeline['start'].dt.floor('h').to_numpy()
+    last = timeline['end'].dt.floor('h').to_numpy()
+    counts = ((last - first) // step).astype(np.int64) + 1
+
+    rows = np.repeat(np.arange(len(timeline)), counts)
+    offsets = np.arange(len(rows)) - np.repeat(np.cumsum(counts) - counts, counts)
+    hour = first[rows] + offsets * step
+    seconds = (np.minimum(end[rows], hour + step) - np.maximum(start[rows], hour)) / np.timedelta64(1, 's')
+    return pd.DataFrame({
+        'hour': hour,
+        'behavior': timeline['behavior'].to_numpy()[rows],
+        'camera': timeline['camera'].to_numpy()[rows],
+        'seconds': seconds,
+    })
+
+
+def _period_start(times: pd.Series, period):
+    if period == 'day':
+        return times.dt.normalize()
+    if period == 'week':
+        return times.dt.to_period('W-SUN').dt.start_time
+    if period == 'month':
+        return times.dt.to_period('M').dt.start_time
+    return times.dt.floor('h')
+
+
+def rollup(timeline: pd.DataFrame, period='day', labels=LABELS) -> pd.DataFrame:
+    """
+    기간(시간/일/주/월)별 행동 지속 시간과 활동량을 한 번의 groupby로 계산한다.
+    시간 단위는 정시 경계에서 자른 구간으로, 나머지는 행동이 시작된 기간으로 집계한다 (행동은 하루를 넘지 않는다).
+
+    Args:
+        timeline (pd.DataFrame): build_timeline() 결과
+        period (str): 'hour', 'day', 'week', 'month'
+
+    Returns:
+        pd.DataFrame: 기간 시작 시각을 인덱스로 하는 행동별 지속 시간(초), 합계(초), 활동량(%)
+    """
+    if period not in PERIODS:
+        raise ValueError(f'지원하지 않는 기간입니다: {period} (가능: {list(PERIODS)})')
+    pieces = split_hours(timeline) if period == 'hour' else timeline
+    key = _period_start(pieces['hour' if period == 'hour' else 'start'], period).rename('기간')
+    table = pieces.groupby([key, pieces['behavior']])['seconds'].sum().unstack(fill_value=0.0)
+    columns = list(labels) + [column for column in table.columns if column not in labels]
+    table = table.reindex(columns=columns, fill_value=0.0)
+    table.columns.name = None
+
+    total = table.sum(axis=1)
+    resting = table[[column for column in RESTING if column in table]].sum(axis=1)
+    table['합계'] = total
+    table['활동량'] = np.where(total > 0, 100.0 - resting / total.where(total > 0, 1.0) * 100, 100.0)
+    return table
+
+
+def rolling_activity(table: pd.DataFrame, period='day', window=None) -> pd.DataFrame:
+    """
+    rollup() 결과의 활동량과 이동 평균. 기록이 없는 기간도 채워 넣어 창이 달력 기준이 되게 한다.
+
+    Args:
+        window (int | None): 이동 평균에 쓸 기간 수. None이면 ROLLING_WINDOWS의 값
+
+    Returns:
+        pd.DataFrame: 활동량, 이동 평균 열
+    """
+    window = window or ROLLING_WINDOWS[period]
+    activity = table['활동량']
+    if len(activity) > 1:
+        activity = activity.reindex(pd.date_range(activity.index[0], activity.index[-1], freq=PERIODS[period]))
+    return pd.DataFrame({
+        '활동량': activity,
+        '이동 평균': activity.rolling(window, min_periods=1).mean(),
+    })
+
+
+def hour_heatmap(timeline: pd.DataFrame, by='weekday', behavior=None) -> pd.DataFrame:
+    """
+    시간대(0~23시)별 행동 비율 히트맵.
+
+    Args:
+        by (str): 'weekday'면 요일 × 시간대, 'day'면 날짜 × 시간대
+        behavior (str | None): 비율을 볼 행동. None이면 활동량(쉬는 행동이 아닌 시간의 비율)
+
+    Returns:
+        pd.DataFrame: 행은 요일(또는 날짜), 열은 0~23시, 값은 비율(%). 기록이 없는 칸은 NaN
+    """
+    pieces = split_hours(timeline)
+    if behavior is None:
+        value = pieces['seconds'].where(~pieces['behavior'].isin(RESTING), 0.0)
+    else:
+        value = pieces['seconds'].where(pieces['behavior'] == behavior, 0.0)
+    row = pieces['hour'].dt.weekday if by == 'weekday' else pieces['hour'].dt.normalize()
+    cells = pd.DataFrame({'row': row, 'hour': pieces['hour'].dt.hour, 'value': value, 'total': pieces['seconds']})
+    sums = cells.groupby(['row', 'hour'])[['value', 'total']].sum()
+    ratio = (sums['value'] / sums['total'].where(sums['total'] > 0) * 100).unstack('hour').reindex(columns=range(24))
+    if by == 'weekday':
+        ratio = ratio.reindex(range(7))
+        ratio.index = WEEKDAYS
+    ratio.columns.name = None
+    return ratio
+
+class ActivityTracker:
+    """
+    일별 행동 지속 시간을 캐시해 활동량을 증분으로 계산하는 집계기.
+    LogStore에서 새로 추가된 기록만 읽어 해당 날짜의 집계에 더하므로, 지난 날짜는 다시 계산하지 않는다.
+    결과는 analyse_total_activity와 같은 방식(행동 사이 간격을 앞 행동의 지속 시간으로 봄)으로 계산된다.
+    camera가 있으면 그 카메라의 기록만 집계한다.
+    """
+
+    def __init__(self, store, camera=None):
+        self.store = store
+        self.camera = camera
+        self._lock = threading.Lock()
+        self._last_id = 0
+        self._days = {}  # day -> {'날짜', 'durations', 'last'}
+        self._summary = None
+
+    def _day_state(self, day, date):
+        return self._days.setdefault(day, {'날짜': date, 'durations': defaultdict(timedelta), 'last': None})
+
+    def _add(self, state, timestamp, behavior):
+        last = state['last']
+        if last is not None:
+            last_timestamp, last_behavior = last
+            state['durations'][last_behavior] += timestamp - last_timestamp
+        state['last'] = (timestamp, behavior)
+
+    def _rebuild_day(self, day):
+        state = self._days.pop(day)
+        state = self._day_state(day, state['날짜'])
+        events = [
+            (ts, behavior) for id, ts, behavior in self.store.events(day=day, camera=self.camera)
+            if id <= self._last_id and behavior != NODOG
+        ]
+        for timestamp, behavior in sorted(events):
+            self._add(state, timestamp, behavior)
+
+    def refresh(self):
+        """새 기록을 반영한다. 바뀐 날짜 목록을 반환한다."""
+        changed = set()
+        rebuild = set()
+        for id, timestamp, behavior in self.store.events(self._last_id, camera=self.camera):
+            self._last_id = id
+            if behavior == NODOG:
+                continue
+            day = timestamp.strftime('%Y-%m-%d')
+            state = self._day_state(day, timestamp.strftime(r'%Y년 %m월 %d일'))
+            changed.add(day)
+            if state['last'] is not None and timestamp < state['last'][0]:
+                # 순서가 뒤바뀐 기록(예: 예전 CSV 가져오기)은 그 날짜만 다시 계산한다.
+                rebuild.add(day)
+            elif day not in rebuild:
+                self._add(state, timestamp, behavior)
+        for day in rebuild:
+            self._rebuild_day(day)
+        return changed
+
+    def daily_activity(self, day, labels=['LYING', 'SIT', 'WALK', 'FEETUP', 'BODYSHAKE']):
+        """analyse_daily_activity와 같은 형식의 하루 집계를 캐시에서 만든다."""
+        durations = self._days[day]['durations']
+        total = sum(durations.values(), timedelta())
+        results = {'행동': [], '총 지속 시간': [], '비율': []}
+        for behavior in labels:
+            t = durations.get(behavior, timedelta(seconds=0))
+            results['행동'].append(behavior)
+            results['총 지속 시간'].append(t)
+            results['비율'].append(t / total * 100 if total else 0)
+        return pd.DataFrame(results).set_index('행동')
+
+    def _activity(self, day):
+        durations = self._days[day]['durations']
+        total = sum(durations.values(), timedelta())
+        if not total:
+            return 100.0
+        return 100.0 - (durations.get('LYING', timedelta()) + durations.get('SIT', timedelta())) / total * 100
+
+    def summary(self) -> pd.DataFrame:
+        """
+        날짜별 활동량과 전날 대비 변화를 반환한다. 새 기록이 오늘 것뿐이면 마지막 행만 갱신한다.
+
+        Returns:
+            pd.DataFrame: 날짜, 활동량, 활동량 변화
+        """
+        with self._lock:
+            changed = self.refresh()
+            summary = self._summary
+            days = sorted(self._days)
+            if summary is not None and changed and changed == {days[-1]} and len(summary) == len(days):
+                summary = summary.copy()
+                summary.loc[summary.index[-1], '활동량'] = self._activity(days[-1])
+                previous = summary['활동량'].iloc[-2] if len(summary) > 1 else summary['활동량'].iloc[-1]
+                summary.loc[summary.index[-1], '활동량 변화'] = summary['활동량'].iloc[-1] - previous
+            elif summary is None or changed:
+                summary = pd.DataFrame({
+                    '날짜': [self._days[day]['날짜'] for day in days],
+                    '활동량': [self._activity(day) for day in days],
+                })
+                summary['활동량 변화'] = summary['활동량'].diff().fillna(0)
+            self._summary = summary
+            return summary
@@ -0,0 +1,219 @@
+import os
+
+import numpy as np
+import torch
+
+BACKENDS = ['torch', 'torchscript', 'onnx']
+EXPORT_DIR = 'resources/exported'
+INPUT_SHAPE = (1, 3, 224, 224)
+
+
+def _export_path(weights, suffix):
+    os.makedirs(EXPORT_DIR, exist_ok=True)
+    stem = os.path.splitext(os.path.basename(weights))[0]
+    return os.path.join(EXPORT_DIR, f'{stem}{suffix}')
+
+
+def _is_stale(path, weights):
+    return not os.path.exists(path) or os.path.getmtime(path) < os.path.getmtime(weights)
+
+
+def _quantize_onnx(src, dest):
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    quantize_dynamic(src, dest, weight_type=QuantType.QInt8)
+    return dest
+
+
+def _quantize_static(model, calibration):
+    """
+    FX 그래프 모드 정적 양자화. 합성곱, 선형 층의 가중치와 활성값을 모두 int8로 바꾼다.
+    (동적 양자화는 Linear만 바꾸므로 ResNet에서는 마지막 fc 층 하나만 int8이 된다.)
+    활성값 범위는 calibration 입력(실제 프레임을 전처리한 텐서)으로 정한다.
+    """
+    from torch.ao.quantization import get_default_qconfig_mapping
+    from torch.ao.quantization.quantize_fx import convert_fx, prepare_fx
+    engine = 'x86' if 'x86' in torch.backends.quantized.supported_engines else 'qnnpack'
+    torch.backends.quantized.engine = engine
+    model = model.cpu().eval()
+    prepared = prepare_fx(model, get_default_qconfig_mapping(engine), example_inputs=(calibration[0],))
+    with torch.no_grad():
+        for batch in calibration:
+            prepared(batch)
+    return convert_fx(prepared)
+
+
+# ------------------------
+# ResNet 분류기 백엔드
+# ------------------------
+class TorchClassifier:
+    """eager PyTorch 또는 TorchScript 모듈을 감싼 분류기. (N, 3, 224, 224) 텐서를 받아 로짓을 반환한다."""
+
+    def __init__(self, model, device='cpu', name='torch'):
+        self.model = model
+        self.device = device
+        self.name = name
+
+    def __call__(self, batch):
+        with torch.no_grad():
+            return self.model(batch.to(self.device)).float().cpu()
+
+
+class OnnxClassifier:
+    """ONNX Runtime 세션을 감싼 분류기. TorchClassifier와 같은 입출력을 갖는다."""
+
+    def __init__(self, path, threads=None, name='onnx'):
+        import onnxruntime as ort
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(path, options, providers=['CPUExecutionProvider'])
+        self.input_name = self.session.get_inputs()[0].name
+        self.name = name
+
+    def __call__(self, batch):
+        outputs = self.session.run(None, {self.input_name: batch.cpu().numpy().astype(np.float32, copy=False)})
+        return torch.from_numpy(outputs[0])
+
+
+def build_classifier(model, weights, backend='torch', int8=False, device='cpu', calibration=None):
+    """
+    eager ResNet 모델을 지정한 백엔드로 변환한다. 변환 결과는 EXPORT_DIR에 캐시되고,
+    원본 가중치가 바뀌면 다시 만들어진다.
+
+    Args:
+        model (torch.nn.Module): 가중치를 불러온 eager 모델
+        weights (str): 원본 가중치 경로 (캐시 파일 이름과 갱신 여부 판단에 사용)
+        backend (str): 'torch', 'torchscript', 'onnx' 중 하나
+        int8 (bool): int8 양자화 적용 여부. onnx는 ONNX Runtime 동적 양자화,
+            torch/torchscript는 calibration으로 활성값 범위를 정하는 정적 양자화(CPU)를 쓴다.
+        calibration (list[torch.Tensor] | None): 정적 양자화 보정용 (N, 3, 224, 224) 입력.
+            없으면 (캐시된 int8 TorchScript가 없는 한) 경고를 출력하고 float32로 불러온다.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f'지원하지 않는 백엔드입니다: {backend} (가능: {BACKENDS})')
+
+    if backend == 'onnx':
+        path = _export_path(weights, '.onnx')
+        if _is_stale(path, weights):
+            torch.onnx.export(
+                model.cpu(), torch.zeros(INPUT_SHAPE), path, input_names=['input'], output_names=['logits'],
+                dynamic_axes={'input': {0: 'batch'}, 'logits': {0: 'batch'}}, dynamo=False,
+            )
+            model.to(device)
+        if int8:
+            quantized = _export_path(weights, '.int8.onnx')
+            if _is_stale(quantized, path):
+                _quantize_onnx(path, quantized)
+            path = quantized
+        return OnnxClassifier(path, name=f'{backend}-int8' if int8 else backend)
+
+    def torchscript_path(quantized):
+        return _export_path(weights, '.int8.torchscript.pt' if quantized else '.torchscript.pt')
+
+    # int8 TorchScript가 이미 만들어져 있으면 보정 없이 그대로 불러온다.
+    cached = backend == 'torchscript' and not _is_stale(torchscript_path(int8), weights)
+    if int8 and not cached:
+        if calibration:
+            model = _quantize_static(model, calibration)
+        else:
+            print(f'⚠️ int8 보정에 쓸 프레임이 없어 {backend} 분류기를 float32로 불러옵니다.')
+            int8 = False
+            cached = backend == 'torchscript' and not _is_stale(torchscript_path(False), weights)
+    if int8:
+        # 양자화된 연산은 CPU에서만 동작한다.
+        device = 'cpu'
+
+    if backend == 'torchscript':
+        path = torchscript_path(int8)
+        if not cached:
+            with torch.no_grad():
+                traced = torch.jit.trace(model, torch.zeros(INPUT_SHAPE, device=device))
+            torch.jit.save(traced, path)
+        scripted = torch.jit.load(path, map_location=device)
+        model = torch.jit.optimize_for_inference(torch.jit.freeze(scripted.eval()))
+
+    return TorchClassifier(model, device, name=f'{backend}-int8' if int8 else backend)
+
+
+# ------------------------
+# YOLO 탐지기 백엔드
+# ------------------------
+def build_detector(weights, backend='torch', int8=False):
+    """
+    ultralytics 내보내기 기능으로 YOLO 모델을 지정한 백엔드로 변환해 불러온다.
+    int8은 onnx 백엔드에서 ONNX Runtime 동적 양자화로 적용된다. 다른 백엔드에서는 경고를 출력하고 float32로 실행한다.
+    """
+    from ultralytics import YOLO
+    if backend not in BACKENDS:
+        raise ValueError(f'지원하지 않는 백엔드입니다: {backend} (가능: {BACKENDS})')
+    if int8 and backend != 'onnx':
+        print(f'⚠️ YOLO {backend} 백엔드는 int8을 지원하지 않아 float32로 실행합니다. (int8은 onnx 백엔드에서만 지원)')
+    if backend == 'torch':
+        return YOLO(weights)
+
+    path = os.path.splitext(weights)[0] + ('.onnx' if backend == 'onnx' else '.torchscript')
+    if _is_stale(path, weights):
+        path = YOLO(weights).export(format=backend, dynamic=True)
+    if int8 and backend == 'onnx':
+        quantized = _export_path(weights, '.int8.onnx')
+        if _is_stale(quantized, path):
+            _quantize_onnx(path, quantized)
+        path = quantized
+    return YOLO(path, task='detect')
+
+
+# ------------------------
+# 정확도 비교
+# ------------------------
+def classifier_parity(reference, candidate, inputs):
+    """
+    같은 입력에 대해 두 분류기의 출력을 비교한다.
+
+    Args:
+        inputs (list[torch.Tensor]): (N, 3, 224, 224) 입력 배치 목록. 저장된 프레임의 강아지 크롭을 전처리한 것을 쓴다.
+
+    Returns:
+        dict: 비교한 입력 수, 확률의 최대 절대 오차와 top-1 일치율
+    """
+    if not inputs:
+        raise ValueError('비교할 입력이 없습니다.')
+    max_diff = 0.0
+    agree = total = 0
+    for batch in inputs:
+        expected = torch.softmax(reference(batch), dim=1)
+        actual = torch.softmax(candidate(batch), dim=1)
+        max_diff = max(max_diff, (expected - actual).abs().max().item())
+        agree += (expected.argmax(dim=1) == actual.argmax(dim=1)).sum().item()
+        total += len(batch)
+    return {'samples': total, 'max_prob_diff': max_diff, 'top1_agreement': agree / total}
+
+
+def detector_parity(reference, candidate, frames, cls=16):
+    """
+    같은 프레임에 대해 두 탐지기가 찾은 최고 신뢰도 박스(기본: 강아지)의 IoU를 비교한다.
+
+    Returns:
+        dict: 탐지 여부 일치율과 평균 IoU
+    """
+    def best_boxes(model):
+        boxes = []
+        for result in model(list(frames), verbose=False):
+            data = [box.tolist() for box in result.boxes.data if int(box[5]) == cls]
+            boxes.append(max(data, key=lambda box: box[4])[:4] if data else None)
+        return boxes
+
+    def iou(a, b):
+        ix = max(0.0, min(a[2], b[2]) - max(a[0], b[0]))
+        iy = max(0.0, min(a[3], b[3]) - max(a[1], b[1]))
+        inter = ix * iy
+        union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+        return inter / union if union > 0 else 0.0
+
+    agree = 0
+    ious = []
+    for a, b in zip(best_boxes(reference), best_boxes(candidate)):
+        agree += (a is None) == (b is None)
+        if a is not None and b is not None:
+            ious.append(iou(a, b))
+    return {'presence_agreement': agree / len(frames), 'mean_iou': float(np.mean(ious)) if ious else None}
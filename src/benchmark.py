@@ -0,0 +1,384 @@
+"""
+영상 파일이나 프레임 폴더를 앱과 같은 Pipeline(프레임 버퍼 → 움직임 게이트 → 추론 → FrameWriter 저장 → 행동 기록 → 클립)에
+그대로 흘려 단계별 지연 시간, 처리량(FPS), 최대 메모리, 저장한 파일 수를 측정한다. Streamlit 없이 실행한다.
+
+    python -m src.benchmark resources/demo.mp4 --frames 300 --batch-sizes 1 4 --inference direct process --out bench.json
+
+백엔드, 배치 크기, 추론 방식(직접, 추론 서버, 작업자 프로세스), 움직임 게이트, 추적, 저장 설정의 모든 조합을
+차례로 실행하고 결과를 JSON으로 저장한다. 단계별 시간은 앱이 쓰는 계측 값(stage_seconds)의 이번 실행분이므로
+/metrics나 설정 탭과 같은 기준이며, 백분위수도 같은 방식(구간 보간)으로 추정한다.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from itertools import product
+
+import cv2
+import torch
+
+from src.inference import configure_backends, device
+from src.inference_worker import ProcessInferenceServer
+from src.log_store import LogStore
+from src.metrics import STAGE_SECONDS, metrics
+from src.model_registry import registry
+from src.model_server import InferenceServer
+from src.pipeline import Pipeline
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+INFERENCE_MODES = ('direct', 'server', 'process')
+STAGES = (
+    'capture', 'motion_gate', 'infer_batch', 'load', 'convert', 'detect', 'preprocess', 'classify', 'annotate',
+    'encode', 'write', 'fsync', 'log', 'clip', 'end_to_end',
+)
+
+
+# ------------------------
+# 측정 도구
+# ------------------------
+def _stage_totals():
+    """stage_seconds의 현재 값을 (모든 카메라와 작업자 프로세스를 합쳐) 단계별 [구간별 개수, 합계, 개수]로 반환한다."""
+    _, series = metrics.series('stage_seconds')
+    totals = {}
+    for key, (counts, total, count) in series.items():
+        stage = dict(key).get('stage')
+        current = totals.setdefault(stage, [[0] * len(counts), 0.0, 0])
+        current[0] = [a + b for a, b in zip(current[0], counts)]
+        current[1] += total
+        current[2] += count
+    return totals
+
+
+def stage_summary(before, after, frames):
+    """
+    두 _stage_totals() 사이에 기록된 단계별 호출 수, 평균/p50/p90/p99(ms), 총 시간, 프레임당 시간을 계산한다.
+    프레임당 시간은 단계의 총 시간을 처리한 프레임 수로 나눈 값이다 (배치 단계는 배치 안의 프레임에 나눠진다).
+    """
+    histogram = STAGE_SECONDS
+    report = {}
+    for stage, (counts, total, count) in after.items():
+        base_counts, base_total, base_count = before.get(stage, [[0] * len(counts), 0.0, 0])
+        counts = [a - b for a, b in zip(counts, base_counts)]
+        total, count = total - base_total, count - base_count
+        if count <= 0:
+            continue
+        row = {'calls': count, 'mean_ms': total / count * 1000, 'total_ms': total * 1000,
+               'per_frame_ms': total * 1000 / frames if frames else None}
+        for q in (50, 90, 99):
+            row[f'p{q}_ms'] = histogram.quantile(q / 100, counts, count) * 1000
+        report[stage] = row
+    return report
+
+
+def _rss_mb():
+    """현재 프로세스의 상주 메모리(MB). 측정할 수 없으면 None."""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 1024 ** 2
+    except ImportError:
+        pass
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1024 ** 2
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class MemorySampler:
+    """백그라운드에서 상주 메모리를 주기적으로 읽어 최댓값을 기록한다."""
+
+    def __init__(self, interval=0.02):
+        self.interval = interval
+        self.peak_mb = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            rss = _rss_mb()
+            if rss is not None:
+                self.peak_mb = max(self.peak_mb or 0.0, rss)
+            if self._stop.wait(self.interval):
+                break
+
+
+# ------------------------
+# 입력
+# ------------------------
+def read_source(source, max_frames=None, labels=None):
+    """
+    영상 파일 또는 프레임 폴더에서 BGR 이미지를 차례로 읽는다.
+    읽기와 디코딩 시간은 캡쳐 스레드와 같이 'capture' 단계로 기록한다.
+    """
+    labels = labels or {}
+    count = 0
+    if os.path.isdir(source):
+        files = sorted(name for name in os.listdir(source) if name.lower().endswith(IMAGE_EXTENSIONS))
+        for name in files:
+            if max_frames is not None and count >= max_frames:
+                return
+            with STAGE_SECONDS.time(stage='capture', **labels):
+                image = cv2.imread(os.path.join(source, name))
+            if image is None:
+                continue
+            count += 1
+            yield image
+        return
+
+    cap = cv2.VideoCapture(source)
+    if not cap.isOpened():
+        raise FileNotFoundError(f'영상을 열 수 없습니다: {source}')
+    try:
+        while max_frames is None or count < max_frames:
+            with STAGE_SECONDS.time(stage='capture', **labels):
+                ok, image = cap.read()
+            if not ok:
+                return
+            yield image
+            count += 1
+    finally:
+        cap.release()
+
+
+def inference_server(mode, batch_size, backends=None):
+    """
+    추론 방식에 맞는 추론 서버를 만들어 시작한다.
+
+    Args:
+        mode (str): 'direct'(파이프라인 스레드에서 infer_batch), 'server'(InferenceServer), 'process'(ProcessInferenceServer)
+        backends (dict | None): 작업자 프로세스에서 호출할 configure_backends 인자
+
+    Returns:
+        InferenceServer | None: 'direct'면 None
+    """
+    if mode == 'direct':
+        return None
+    if mode == 'server':
+        return InferenceServer(max_batch=batch_size).start()
+    if mode == 'process':
+        server = ProcessInferenceServer(1, backends=backends, max_batch=batch_size).start()
+        # 작업자의 모델 로드와 예열은 측정에서 뺀다. 준비 신호는 서버의 작업 스레드가 받는다.
+        deadline = time.monotonic() + server.startup_timeout
+        while not all(worker.ready for worker in server.workers):
+            if time.monotonic() > deadline:
+                server.stop()
+                raise TimeoutError('추론 작업자가 준비되지 않았습니다.')
+            time.sleep(0.1)
+        return server
+    raise ValueError(f'알 수 없는 추론 방식입니다: {mode}')
+
+
+# ------------------------
+# 재생
+# ------------------------
+def replay(source, out_dir, max_frames=None, batch_size=1, motion_gate=None, tracking=None, inference='direct',
+           backends=None, jpeg_quality=90, writer_workers=2, clip_format='gif', clip_every=60, clip_width=480,
+           gif_duration=10, camera='benchmark'):
+    """
+    source의 프레임을 Pipeline에 넣고, 앱의 캡쳐 스레드와 추론 스레드가 하는 일(버퍼에 넣고 FrameWriter로 저장,
+    batch_size개마다 추론 → 결과 저장, 행동 기록, 구간 갱신)을 주기를 기다리지 않고 최대한 빠르게 반복한다.
+    파일은 out_dir 아래 frames/, bbox/, captures/와 logs/에 쓴다.
+
+    Args:
+        batch_size (int): 한 번에 추론할 프레임 수 (Pipeline의 infer_batch_size)
+        motion_gate (dict | None): MotionGate 설정. None이면 모든 프레임을 추론한다.
+        tracking (dict | None): DogTracker 설정. None이면 매번 전체 프레임을 탐지한다.
+        inference (str): 추론 방식 ('direct', 'server', 'process')
+        backends (dict | None): 'process' 작업자에서 쓸 configure_backends 인자
+        jpeg_quality, writer_workers (int): FrameWriter 설정
+        clip_format (str | None): 'gif', 'mp4' 또는 None(클립을 만들지 않음)
+        clip_every (int): 이 프레임 수마다 최근 gif_duration초의 클립을 하나 만든다.
+
+    Returns:
+        dict: 프레임 수, 경과 시간, FPS, 단계별 시간, 추론/재사용 프레임 수, 저장/클립 통계, 최대 메모리, 쓴 파일 수와 용량
+    """
+    labels = {'camera': camera}
+    dirs = {name: os.path.join(out_dir, name) for name in ('frames', 'bbox', 'captures', 'logs')}
+    server = inference_server(inference, batch_size, backends)
+    log_store = LogStore(os.path.join(dirs['logs'], 'logs.sqlite3'))
+    pipeline = Pipeline(
+        source, log_store, log_dir=dirs['logs'], frame_dir=dirs['frames'], bbox_dir=dirs['bbox'], capture_dir=dirs['captures'],
+        buffer_size=max(120, 2 * batch_size), infer_batch_size=batch_size, warmup_models=False,
+        motion_gate=motion_gate, tracking=tracking, clip_format=clip_format or 'gif', clip_width=clip_width,
+        gif_duration=gif_duration, retention={}, camera=camera, inference=server,
+        jpeg_quality=jpeg_quality, writer_workers=writer_workers,
+    )
+    half = timedelta(seconds=gif_duration / 2)
+
+    before = _stage_totals()
+    captured = 0
+    start = time.perf_counter()
+    try:
+        with MemorySampler() as memory:
+            for image in read_source(source, max_frames, labels):
+                # 캡쳐 스레드와 같이 버퍼에 넣고 원본 프레임 저장을 제출한다.
+                pipeline.feed(image)
+                captured += 1
+                if clip_format and captured % clip_every == 0:
+                    # 방금까지 gif_duration초 동안의 bbox 프레임으로 클립을 만들도록 앱과 같은 대기열에 넣는다.
+                    pipeline.request_clip(datetime.now() - half)
+                if captured % batch_size == 0:
+                    pipeline.step()
+            if captured % batch_size:
+                pipeline.step()
+            pipeline.drain()
+            elapsed = time.perf_counter() - start
+            after = _stage_totals()
+    finally:
+        pipeline.stop()
+        log_store.close()
+        if server is not None:
+            server.stop()
+
+    stats = pipeline.inference_stats()
+    processed = stats['processed']
+    reused = stats.get('skipped', 0)
+    files = [os.path.join(root, name) for root, _, names in os.walk(out_dir) for name in names]
+    return {
+        'frames': processed,
+        'inferred_frames': processed - reused,
+        'reused_frames': reused,
+        'clips': len(pipeline.clip_stats),
+        'elapsed_s': elapsed,
+        'fps': processed / elapsed if elapsed else None,
+        'stages': stage_summary(before, after, processed),
+        'writer': pipeline.frame_writer.stats(),
+        'peak_rss_mb': memory.peak_mb,
+        'files_written': len(files),
+        'bytes_written': sum(os.path.getsize(path) for path in files),
+        'tracker': pipeline.tracker.stats() if pipeline.tracker is not None else None,
+    }
+
+
+def environment():
+    return {
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+        'torch': torch.__version__,
+        'torch_threads': torch.get_num_threads(),
+        'opencv': cv2.__version__,
+        'device': device,
+    }
+
+
+def run_suite(source, max_frames=None, batch_sizes=(1,), yolo_backends=('torch',), resnet_backends=('torch',),
+              int8=(False,), inference_modes=('direct',), motion_gates=(None,), trackings=(None,),
+              jpeg_qualities=(90,), writer_workers=(2,), keep=None, **options):
+    """
+    설정의 모든 조합으로 replay()를 실행한다. 모델 로드와 예열 시간은 측정에서 제외한다.
+
+    Args:
+        keep (str | None): 출력 파일을 남길 폴더. None이면 임시 폴더에 쓰고 지운다.
+        options: replay() 인자
+
+    Returns:
+        dict: 실행 환경과 조합별 결과
+    """
+    runs = []
+    for yolo, resnet, quantize, mode, batch_size, gate, tracking, quality, workers in product(
+        yolo_backends, resnet_backends, int8, inference_modes, batch_sizes, motion_gates, trackings,
+        jpeg_qualities, writer_workers,
+    ):
+        config = {
+            'yolo': yolo, 'resnet': resnet, 'int8': quantize, 'inference': mode, 'batch_size': batch_size,
+            'motion_gate': gate, 'tracking': tracking, 'jpeg_quality': quality, 'writer_workers': workers, **options,
+        }
+        print(f'▶️ {config}')
+        # int8 정적 양자화는 재생할 영상(프레임)으로 보정한다.
+        backends = {'yolo': yolo, 'resnet': resnet, 'int8': quantize, 'calibration': source}
+        configure_backends(**backends)
+        if mode != 'process':
+            registry.warmup()
+        out_dir = tempfile.mkdtemp(prefix='rogun-bench-') if keep is None else os.path.join(keep, f'run{len(runs)}')
+        try:
+            result = replay(
+                source, out_dir, max_frames, batch_size, gate, tracking, mode, backends,
+                jpeg_quality=quality, writer_workers=workers, camera=f'run{len(runs)}', **options,
+            )
+        finally:
+            if keep is None:
+                shutil.rmtree(out_dir, ignore_errors=True)
+        runs.append({'config': config, **result})
+        print(f'   {result["frames"]}프레임, {result["fps"]:.2f} FPS, 최대 메모리 {result["peak_rss_mb"] or 0:.0f} MB')
+    return {
+        'source': source,
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'environment': environment(),
+        'models': registry.report(),
+        'runs': runs,
+    }
+
+
+def _print_table(report):
+    for run in report['runs']:
+        config = run['config']
+        print(f'\n[{config["yolo"]}/{config["resnet"]}{"-int8" if config["int8"] else ""} {config["inference"]} '
+              f'batch={config["batch_size"]} gate={"on" if config["motion_gate"] else "off"} '
+              f'tracking={"on" if config["tracking"] else "off"} jpeg={config["jpeg_quality"]} '
+              f'writers={config["writer_workers"]}] {run["fps"]:.2f} FPS, '
+              f'추론 {run["inferred_frames"]}/{run["frames"]}, 파일 {run["files_written"]}개 '
+              f'({run["bytes_written"] / 1024 ** 2:.1f} MB), 버려진 저장 {run["writer"]["dropped"]}, '
+              f'최대 메모리 {run["peak_rss_mb"] or 0:.0f} MB')
+        print(f'  {"단계":<12}{"호출":>6}{"p50 ms":>10}{"p90 ms":>10}{"p99 ms":>10}{"프레임당 ms":>12}')
+        for stage in STAGES:
+            if stage in run['stages']:
+                s = run['stages'][stage]
+                print(f'  {stage:<12}{s["calls"]:>6}{s["p50_ms"]:>10.1f}{s["p90_ms"]:>10.1f}{s["p99_ms"]:>10.1f}{s["per_frame_ms"]:>12.2f}')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='파이프라인 재생 벤치마크')
+    parser.add_argument('source', help='영상 파일 또는 프레임 폴더')
+    parser.add_argument('--frames', type=int, default=None, help='처리할 최대 프레임 수')
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1])
+    parser.add_argument('--yolo', nargs='+', default=['torch'], help="YOLO 백엔드 ('torch', 'torchscript', 'onnx')")
+    parser.add_argument('--resnet', nargs='+', default=['torch'], help="ResNet 백엔드 ('torch', 'torchscript', 'onnx')")
+    parser.add_argument('--int8', choices=['off', 'on', 'both'], default='off')
+    parser.add_argument('--inference', nargs='+', choices=INFERENCE_MODES, default=['direct'],
+                        help='추론 방식 (direct: 파이프라인 스레드, server: 추론 서버, process: 작업자 프로세스)')
+    parser.add_argument('--motion-gate', choices=['off', 'on', 'both'], default='off')
+    parser.add_argument('--tracking', choices=['off', 'on', 'both'], default='off')
+    parser.add_argument('--jpeg-quality', type=int, nargs='+', default=[90])
+    parser.add_argument('--writer-workers', type=int, nargs='+', default=[2])
+    parser.add_argument('--clip', choices=['gif', 'mp4', 'none'], default='gif')
+    parser.add_argument('--clip-every', type=int, default=60, help='이 프레임 수마다 클립을 만든다')
+    parser.add_argument('--keep', default=None, help='출력 파일을 남길 폴더 (기본: 임시 폴더에 쓰고 지움)')
+    parser.add_argument('--out', default=None, help='결과 JSON 경로')
+    args = parser.parse_args(argv)
+
+    def choices(mode, on):
+        return {'off': [None], 'on': [on], 'both': [None, on]}[mode]
+
+    report = run_suite(
+        args.source, args.frames, args.batch_sizes, args.yolo, args.resnet,
+        {'off': [False], 'on': [True], 'both': [False, True]}[args.int8], args.inference,
+        choices(args.motion_gate, {'threshold': 0.01, 'pixel_delta': 25, 'force_interval': 30.0}),
+        choices(args.tracking, {'margin': 0.5, 'redetect_every': 10, 'roi_imgsz': 320}),
+        args.jpeg_quality, args.writer_workers,
+        keep=args.keep, clip_format=None if args.clip == 'none' else args.clip, clip_every=args.clip_every,
+    )
+    _print_table(report)
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f'\n결과를 저장했습니다: {args.out}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+import os
+import threading
+
+from src.inference import configure_backends
+from src.log_store import LogStore
+from src.model_registry import registry
+from src.inference_worker import ProcessInferenceServer
+from src.model_server import InferenceServer
+from src.pipeline import Pipeline
+from src.stream import MjpegServer
+
+
+class CameraSet:
+    """
+    여러 카메라의 파이프라인을 묶어 돌리는 관리자.
+    카메라마다 캡쳐 루프, 저장 폴더, 보관 정책, 프레임 색인을 따로 두고,
+    행동 기록 저장소, 추론 서버(모델), 스트리밍 서버는 모든 카메라가 함께 쓴다.
+    """
+
+    def __init__(
+        self, cameras, log_dir='logs', frame_dir='frames', bbox_dir='bbox', capture_dir='captures',
+        backends=None, warmup_models=True, shared_batch_size=8, infer_linger=0.05, stream_port=None,
+        stream_host='127.0.0.1', retention=None, inference_processes=0, inference_threads=None, **options,
+    ):
+        """
+        Args:
+            cameras (dict[str, dict]): 카메라 이름별 설정. 'source'는 필수이고, 나머지는 Pipeline 인자로 전달된다.
+                폴더(frame_dir, bbox_dir, capture_dir)를 생략하면 '<폴더>/<카메라 이름>'을 사용한다.
+            backends (dict | None): configure_backends 인자
+            shared_batch_size (int): 추론 서버가 카메라를 모아 한 번에 추론할 최대 프레임 수
+            infer_linger (float): 추론 서버가 다른 카메라의 요청을 기다리는 시간(초)
+            stream_port (int | None): 스트리밍 서버 포트. 경로는 '/<카메라 이름>/raw.mjpg' 형식이다.
+            stream_host (str): 스트리밍 서버가 바인딩할 주소
+            retention (dict | None): 'frame_dir', 'bbox_dir', 'capture_dir'별 보관 정책. 카메라 설정의 retention이 우선한다.
+            inference_processes (int): 추론 작업자 프로세스 수. 0이면 이 프로세스의 스레드에서 추론한다.
+            inference_threads (int | None): 작업자 프로세스마다 torch가 쓸 스레드 수
+            options: 모든 카메라에 공통으로 적용할 Pipeline 인자
+        """
+        if not cameras:
+            raise ValueError('카메라가 하나 이상 필요합니다.')
+        if backends:
+            configure_backends(**backends)
+        # 작업자 프로세스가 모델을 따로 불러오므로 이 프로세스에서는 예열하지 않는다.
+        self.warmup_models = warmup_models and not inference_processes
+        self.stream_port = stream_port
+        self.stream_host = stream_host
+        self.stream_server = None
+
+        self.log_store = LogStore(os.path.join(log_dir, 'logs.sqlite3'))
+        self.log_store.migrate_csv(log_dir)
+        # 카메라 구분이 없던 이전 기록은 첫 번째 카메라의 기록으로 본다.
+        self.log_store.claim_unassigned(next(iter(cameras)))
+        if inference_processes:
+            self.inference = ProcessInferenceServer(
+                inference_processes, backends=backends, threads=inference_threads,
+                max_batch=shared_batch_size, linger=infer_linger,
+            )
+        else:
+            self.inference = InferenceServer(max_batch=shared_batch_size, linger=infer_linger)
+
+        roots = {'frame_dir': frame_dir, 'bbox_dir': bbox_dir, 'capture_dir': capture_dir}
+        self.pipelines = {}
+        for name, config in cameras.items():
+            config = dict(config)
+            source = config.pop('source')
+            dirs = {option: config.pop(option, os.path.join(root, name)) for option, root in roots.items()}
+            policies = {**(retention or {}), **config.pop('retention', {})}
+            self.pipelines[name] = Pipeline(
+                source, log_dir=log_dir, **dirs,
+                retention={dirs[option]: policy for option, policy in policies.items()} if policies else None,
+                warmup_models=False, camera=name, log_store=self.log_store, inference=self.inference,
+                **{**options, **config},
+            )
+
+    def __getitem__(self, name) -> Pipeline:
+        return self.pipelines[name]
+
+    def __iter__(self):
+        return iter(self.pipelines)
+
+    def __len__(self):
+        return len(self.pipelines)
+
+    def items(self):
+        return self.pipelines.items()
+
+    @property
+    def log_version(self):
+        return self.log_store.version
+
+    def start(self):
+        if self.warmup_models:
+            threading.Thread(target=registry.warmup, daemon=True).start()
+        self.inference.start()
+        for pipeline in self.pipelines.values():
+            pipeline.start()
+        if self.stream_port is not None:
+            streams = {}
+            for name, pipeline in self.pipelines.items():
+                streams[f'{name}/raw'] = pipeline.preview
+                streams[f'{name}/annotated'] = pipeline.bbox_preview
+            try:
+                self.stream_server = MjpegServer(streams, host=self.stream_host, port=self.stream_port).start()
+            except OSError as e:
+                print(f'❌ 스트리밍 서버를 시작하지 못했습니다: {e}')
+        return self
+
+    def stop(self):
+        for pipeline in self.pipelines.values():
+            pipeline.stop()
+        self.inference.stop()
+        if self.stream_server is not None:
+            self.stream_server.stop()
@@ -0,0 +1,62 @@
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+
+import numpy as np
+
+
+@dataclass
+class Frame:
+    seq: int
+    image: np.ndarray
+    timestamp: datetime
+    meta: dict = field(default_factory=dict)
+
+
+class FrameBuffer:
+    """
+    디코딩된 프레임(numpy 배열)을 타임스탬프와 함께 보관하는 고정 크기 링 버퍼.
+    캡쳐, 추론, 실시간 화면이 같은 버퍼를 읽으며, 가득 차면 가장 오래된 프레임이 밀려난다.
+    """
+
+    def __init__(self, capacity=120):
+        self.capacity = capacity
+        self._frames: deque[Frame] = deque(maxlen=capacity)
+        self._lock = threading.Condition()
+        self._seq = 0
+
+    def __len__(self):
+        return len(self._frames)
+
+    @property
+    def version(self):
+        """마지막으로 추가된 프레임의 번호. 프레임이 없으면 0."""
+        return self._seq
+
+    def append(self, image, timestamp=None, **meta) -> Frame:
+        with self._lock:
+            self._seq += 1
+            frame = Frame(self._seq, image, timestamp or datetime.now(), meta)
+            self._frames.append(frame)
+            self._lock.notify_all()
+        return frame
+
+    def wait_for(self, seq, timeout=None) -> bool:
+        """번호가 seq보다 큰 프레임이 추가될 때까지 기다린다. 시간 안에 추가되면 True."""
+        with self._lock:
+            return self._lock.wait_for(lambda: self._seq > seq, timeout)
+
+    def latest(self) -> Frame | None:
+        with self._lock:
+            return self._frames[-1] if self._frames else None
+
+    def since(self, seq) -> list[Frame]:
+        """번호가 seq보다 큰 프레임들을 오래된 순서로 반환한다."""
+        with self._lock:
+            return [frame for frame in self._frames if frame.seq > seq]
+
+    def window(self, start: datetime, end: datetime) -> list[Frame]:
+        """start <= 타임스탬프 <= end 인 프레임들을 오래된 순서로 반환한다."""
+        with self._lock:
+            return [frame for frame in self._frames if start <= frame.timestamp <= end]
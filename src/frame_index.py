@@ -0,0 +1,191 @@
+import os
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime
+
+from src.img_capture import FRAME_NAME_FORMAT
+
+
+def parse_frame_name(file_name):
+    """
+    'YYYY-MM-DD HH_MM_SS_ffffff.jpg' 형식의 원본 프레임 이름에서 시각을 읽는다.
+
+    Returns:
+        tuple | None: (시각, None, None). 형식이 맞지 않으면 None
+    """
+    stem, ext = os.path.splitext(file_name)
+    if ext != '.jpg':
+        return None
+    try:
+        return datetime.strptime(stem, FRAME_NAME_FORMAT), None, None
+    except ValueError:
+        return None
+
+
+def parse_bbox_name(file_name):
+    """
+    'YYYY-MM-DD HH_MM_SS_ffffff True WALK.jpg' 형식의 바운딩 박스 프레임 이름을 읽는다.
+
+    Returns:
+        tuple | None: (시각, 강아지 여부, 행동). 형식이 맞지 않으면 None
+    """
+    stem, ext = os.path.splitext(file_name)
+    parts = stem.split(maxsplit=3)
+    if ext != '.jpg' or len(parts) != 4 or parts[2] not in ('True', 'False'):
+        return None
+    d, t, has_dog, behavior = parts
+    try:
+        return datetime.strptime(f'{d} {t}', FRAME_NAME_FORMAT), has_dog == 'True', behavior
+    except ValueError:
+        return None
+
+
+PARSERS = {'frame': parse_frame_name, 'bbox': parse_bbox_name}
+
+
+class FrameIndex:
+    """
+    저장된 프레임 파일의 목록(경로, 시각, 강아지 여부, 행동)을 SQLite에 유지하는 색인.
+    프레임이 저장될 때마다 한 줄씩 추가하므로, 시작할 때 폴더를 훑고 파일 이름을 해석하지 않고
+    (종류, 시각) 인덱스로 최신 n개만 읽는다. 폴더와 어긋나면 rebuild()로 다시 만든다.
+    """
+
+    def __init__(self, path='logs/frames.sqlite3', flush_every=32, flush_interval=1.0):
+        """
+        Args:
+            path (str): 색인 파일 경로
+            flush_every (int): 이만큼 쌓이면 한 번에 기록한다
+            flush_interval (float): 마지막 기록 후 이 시간(초)이 지나면 쌓인 만큼 기록한다
+        """
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.path = path
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._pending = []
+        self._last_flush = time.monotonic()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript('''
+            CREATE TABLE IF NOT EXISTS frames (
+                path TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                ts TEXT NOT NULL,
+                has_dog INTEGER,
+                behavior TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_frames_kind_ts ON frames(kind, ts);
+        ''')
+        self._conn.commit()
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            self._conn.close()
+
+    def add(self, kind, path, timestamp: datetime, has_dog=None, behavior=None):
+        """저장된 파일 하나를 색인에 추가한다. 기록은 flush_every개 또는 flush_interval초마다 모아서 한다."""
+        row = (
+            os.path.normpath(path), kind, timestamp.isoformat(sep=' ', timespec='microseconds'),
+            None if has_dog is None else int(bool(has_dog)), behavior,
+        )
+        with self._lock:
+            self._pending.append(row)
+            if len(self._pending) >= self.flush_every or time.monotonic() - self._last_flush >= self.flush_interval:
+                self._flush_locked()
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        self._last_flush = time.monotonic()
+        if not self._pending:
+            return
+        self._conn.executemany(
+            'INSERT OR REPLACE INTO frames (path, kind, ts, has_dog, behavior) VALUES (?, ?, ?, ?, ?)', self._pending
+        )
+        self._conn.commit()
+        self._pending.clear()
+
+    def remove(self, paths):
+        """지워진 파일들을 색인에서 뺀다."""
+        paths = [(os.path.normpath(path),) for path in paths]
+        if not paths:
+            return
+        with self._lock:
+            self._flush_locked()
+            self._conn.executemany('DELETE FROM frames WHERE path = ?', paths)
+            self._conn.commit()
+
+    def recent(self, kind, limit=None):
+        """
+        종류가 kind인 파일 중 최신 limit개를 오래된 순서로 반환한다.
+
+        Returns:
+            list: 'frame'은 (경로, 시각), 'bbox'는 (경로, 시각, 강아지 여부, 행동) 목록
+        """
+        sql = 'SELECT path, ts, has_dog, behavior FROM frames WHERE kind = ? ORDER BY ts DESC'
+        if limit is not None:
+            sql += f' LIMIT {int(limit)}'
+        with self._lock:
+            self._flush_locked()
+            rows = self._conn.execute(sql, (kind,)).fetchall()
+        rows.reverse()
+        if kind == 'bbox':
+            return [(path, datetime.fromisoformat(ts), bool(has_dog), behavior) for path, ts, has_dog, behavior in rows]
+        return [(path, datetime.fromisoformat(ts)) for path, ts, _, _ in rows]
+
+    def count(self, kind=None):
+        sql, params = 'SELECT COUNT(*) FROM frames', ()
+        if kind is not None:
+            sql, params = sql + ' WHERE kind = ?', (kind,)
+        with self._lock:
+            self._flush_locked()
+            return self._conn.execute(sql, params).fetchone()[0]
+
+    def rebuild(self, kind, directory):
+        """
+        폴더를 훑어 종류가 kind인 색인을 다시 만든다. 이름 형식이 맞지 않는 파일은 색인하지 않는다.
+
+        Returns:
+            dict: 색인된 파일 수(indexed)와 건너뛴 파일 수(skipped)
+        """
+        parse = PARSERS[kind]
+        rows, skipped = [], 0
+        if os.path.isdir(directory):
+            with os.scandir(directory) as it:
+                for entry in it:
+                    if not entry.is_file():
+                        continue
+                    parsed = parse(entry.name)
+                    if parsed is None:
+                        skipped += 1
+                        continue
+                    timestamp, has_dog, behavior = parsed
+                    rows.append((
+                        os.path.normpath(entry.path), kind, timestamp.isoformat(sep=' ', timespec='microseconds'),
+                        None if has_dog is None else int(has_dog), behavior,
+                    ))
+        with self._lock:
+            self._flush_locked()
+            self._conn.execute('DELETE FROM frames WHERE kind = ?', (kind,))
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO frames (path, kind, ts, has_dog, behavior) VALUES (?, ?, ?, ?, ?)', rows
+            )
+            self._conn.commit()
+        return {'indexed': len(rows), 'skipped': skipped}
+
+
+if __name__ == '__main__':
+    # python -m src.frame_index [frames 폴더] [bbox 폴더] [색인 파일] : 폴더를 훑어 프레임 색인을 다시 만든다.
+    # 카메라별 색인 파일은 logs/frames-<카메라 이름>.sqlite3 이다.
+    frame_dir, bbox_dir, index_path = (sys.argv[1:] + ['frames', 'bbox', 'logs/frames.sqlite3'][len(sys.argv) - 1:])[:3]
+    index = FrameIndex(index_path)
+    for kind, directory in (('frame', frame_dir), ('bbox', bbox_dir)):
+        result = index.rebuild(kind, directory)
+        print(f'{directory}: {result["indexed"]}개 색인, {result["skipped"]}개 건너뜀')
+    index.close()
@@ -0,0 +1,237 @@
+import os
+import queue
+import threading
+import time
+from collections import deque
+
+import cv2 as cv
+
+from src.metrics import QUEUE_DEPTH, STAGE_SECONDS, metrics
+
+WRITTEN = metrics.counter('written_frames_total', '디스크에 저장한 프레임 수')
+WRITTEN_BYTES = metrics.counter('written_bytes_total', '디스크에 저장한 프레임의 총 크기(byte)')
+WRITE_DROPPED = metrics.counter('write_dropped_frames_total', '저장 큐가 가득 차 저장하지 못한 프레임 수')
+WRITE_BLOCKED = metrics.counter('write_blocked_total', '저장 큐가 가득 차 제출이 기다린 횟수')
+WRITE_FAILED = metrics.counter('write_failures_total', '인코딩, 쓰기, 동기화에 실패한 프레임 수')
+
+
+class FrameWriter:
+    """
+    프레임을 백그라운드 작업자 스레드들에서 JPEG 파일로 저장하는 비동기 싱크.
+    프레임마다 한 번만 인코딩해 최종 파일 이름으로 바로 쓰고, fsync는 여러 파일을 모아 한 번에 한다.
+    큐가 가득 차면 submit()이 block_timeout초까지 기다려(호출한 캡쳐/추론 스레드를 늦춰) 디스크가 따라오게 하고,
+    그래도 자리가 나지 않으면 그 프레임을 버린다.
+    """
+
+    def __init__(
+        self, max_queue=64, camera=None, workers=2, quality=90, block_timeout=0.5,
+        fsync=True, fsync_every=32, fsync_interval=1.0,
+    ):
+        """
+        Args:
+            max_queue (int): 저장을 기다리는 최대 프레임 수
+            workers (int): 인코딩과 쓰기를 하는 작업자 스레드 수
+            quality (int): JPEG 품질 (0~100)
+            block_timeout (float): 큐가 가득 찼을 때 submit()이 기다리는 최대 시간(초). 0이면 바로 버린다.
+            fsync (bool): 저장한 파일을 디스크에 동기화할지 여부
+            fsync_every (int): 작업자마다 이 개수만큼 파일이 모이면 동기화한다.
+            fsync_interval (float): 파일이 덜 모였어도 이 시간(초)이 지나면 동기화한다.
+        """
+        self._queue = queue.Queue(maxsize=max_queue)
+        self.labels = {'camera': camera} if camera else {}
+        self.quality = quality
+        self.block_timeout = block_timeout
+        self.fsync = fsync
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.written = 0
+        self.written_bytes = 0
+        self.dropped = 0
+        self.blocked = 0
+        self.failed = 0
+        self.fsyncs = 0
+        self._latencies = deque(maxlen=100)  # 제출부터 동기화까지 걸린 시간(ms)
+        self._stats_lock = threading.Lock()
+        QUEUE_DEPTH.track(self._queue.qsize, queue='writer', **self.labels)
+        self._threads = [
+            threading.Thread(target=self._run, name=f'frame-writer-{i}', daemon=True) for i in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, path, image, on_written=None) -> bool:
+        """
+        저장할 프레임을 큐에 넣는다. on_written이 있으면 파일이 저장(동기화)된 뒤 경로를 넘겨 호출한다.
+
+        Returns:
+            bool: 큐에 넣었으면 True, 큐가 가득 차 버렸으면 False
+        """
+        item = (path, image, on_written, time.perf_counter())
+        try:
+            self._queue.put_nowait(item)
+            return True
+        except queue.Full:
+            pass
+        with self._stats_lock:
+            self.blocked += 1
+        WRITE_BLOCKED.inc(**self.labels)
+        try:
+            if self.block_timeout <= 0:
+                raise queue.Full
+            self._queue.put(item, timeout=self.block_timeout)
+            return True
+        except queue.Full:
+            with self._stats_lock:
+                self.dropped += 1
+            WRITE_DROPPED.inc(**self.labels)
+            return False
+
+    def join(self):
+        """큐에 쌓인 프레임이 모두 저장되고 동기화될 때까지 기다린다."""
+        self._queue.join()
+
+    def close(self):
+        """남은 프레임을 모두 저장하고 작업자를 멈춘다."""
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+
+    def stats(self):
+        latencies = list(self._latencies)
+        return {
+            'written': self.written,
+            'written_bytes': self.written_bytes,
+            'dropped': self.dropped,
+            'blocked': self.blocked,
+            'failed': self.failed,
+            'fsyncs': self.fsyncs,
+            'queue_depth': self._queue.qsize(),
+            'mean_latency_ms': sum(latencies) / len(latencies) if latencies else None,
+            'max_latency_ms': max(latencies) if latencies else None,
+        }
+
+    def _encode(self, path, image):
+        ext = os.path.splitext(path)[1].lower() or '.jpg'
+        params = [cv.IMWRITE_JPEG_QUALITY, self.quality] if ext in ('.jpg', '.jpeg') else []
+        ok, data = cv.imencode(ext, image, params)
+        if not ok:
+            raise ValueError('인코딩 실패')
+        return data
+
+    def _write(self, path, image):
+        """프레임을 인코딩해 최종 경로에 쓴다. 동기화는 _sync()에서 모아서 한다."""
+        with STAGE_SECONDS.time(stage='encode', **self.labels):
+            data = self._encode(path, image)
+        directory = os.path.dirname(path) or '.'
+        os.makedirs(directory, exist_ok=True)
+        with STAGE_SECONDS.time(stage='write', **self.labels):
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0), 0o644)
+            try:
+                os.write(fd, data.tobytes())
+            except BaseException:
+                os.close(fd)
+                raise
+        return fd, len(data)
+
+    def _sync(self, pending):
+        """
+        모아 둔 파일을 한 번에 동기화하고 닫은 뒤 on_written을 호출한다.
+        동기화에 실패한 파일은 실패로 세고 on_written을 호출하지 않는다. 어떤 경우에도 모든 파일을 닫고 작업을 끝낸 것으로 표시한다.
+        """
+        if not pending:
+            return
+        try:
+            with STAGE_SECONDS.time(stage='fsync', **self.labels):
+                synced = self._flush(pending)
+            now = time.perf_counter()
+            with self._stats_lock:
+                self.fsyncs += 1
+                for _, _, size, _, submitted in synced:
+                    self.written += 1
+                    self.written_bytes += size
+                    self._latencies.append((now - submitted) * 1000)
+            WRITTEN.inc(len(synced), **self.labels)
+            WRITTEN_BYTES.inc(sum(size for _, _, size, _, _ in synced), **self.labels)
+            for path, _, _, on_written, _ in synced:
+                try:
+                    if on_written is not None:
+                        on_written(path)
+                except Exception as e:
+                    print(f'❌ 저장 후 처리 실패: {path} ({e})')
+        except Exception as e:
+            # 작업자가 죽으면 join()과 종료가 멈추므로 예상하지 못한 오류도 여기서 끝낸다.
+            print(f'❌ 프레임 동기화 실패: {e}')
+        finally:
+            for _ in pending:
+                self._queue.task_done()
+            pending.clear()
+
+    def _flush(self, pending):
+        """파일마다 fsync하고 닫은 뒤 새 파일이 있는 폴더를 동기화한다. 동기화까지 끝난 항목만 반환한다."""
+        synced = []
+        for entry in pending:
+            path, fd = entry[0], entry[1]
+            try:
+                if self.fsync:
+                    os.fsync(fd)
+                synced.append(entry)
+            except OSError as e:
+                self._failed(path, e)
+            finally:
+                try:
+                    os.close(fd)
+                except OSError:
+                    pass
+        if self.fsync and os.name == 'posix':
+            # 새 파일 이름(디렉터리 항목)도 디스크에 남도록 폴더를 동기화한다.
+            for directory in {os.path.dirname(path) or '.' for path, *_ in synced}:
+                try:
+                    dir_fd = os.open(directory, os.O_RDONLY)
+                    try:
+                        os.fsync(dir_fd)
+                    finally:
+                        os.close(dir_fd)
+                except OSError as e:
+                    print(f'❌ 폴더 동기화 실패: {directory} ({e})')
+                    failed = [entry for entry in synced if (os.path.dirname(entry[0]) or '.') == directory]
+                    for entry in failed:
+                        self._failed(entry[0], e, report=False)
+                    synced = [entry for entry in synced if entry not in failed]
+        return synced
+
+    def _failed(self, path, error, report=True):
+        with self._stats_lock:
+            self.failed += 1
+        WRITE_FAILED.inc(**self.labels)
+        if report:
+            print(f'❌ 프레임 저장 실패: {path} ({error})')
+
+    def _run(self):
+        pending = []
+        first = None
+        while True:
+            timeout = None
+            if pending:
+                timeout = max(0.0, first + self.fsync_interval - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                self._sync(pending)
+                continue
+            if item is None:
+                self._sync(pending)
+                self._queue.task_done()
+                return
+            path, image, on_written, submitted = item
+            try:
+                fd, size = self._write(path, image)
+            except Exception as e:
+                self._failed(path, e)
+                self._queue.task_done()
+                continue
+            if not pending:
+                first = time.monotonic()
+            pending.append((path, fd, size, on_written, submitted))
+            if len(pending) >= self.fsync_every or time.monotonic() - first >= self.fsync_interval:
+                self._sync(pending)
@@ -1,19 +1,78 @@
 import os
-import imageio
+import time
 
+import cv2 as cv
+from PIL import Image
+
+from src.metrics import STAGE_SECONDS, metrics
+
+CLIPS = metrics.counter('clips_total', '만든 행동 클립 수')
+CLIP_BYTES = metrics.counter('clip_bytes_total', '만든 행동 클립의 총 크기(byte)')
+
+
+def _resize(image, width):
+    height, w = image.shape[:2]
+    if width and w > width:
+        image = cv.resize(image, (width, round(height * width / w)), interpolation=cv.INTER_AREA)
+    return image
 
-def make_gif(src_dir, dest_dir, file_name, frame_num):
-    all_images = os.listdir(src_dir)
-    if not all_images:
-        print(f"⚠️ 이미지가 없습니다.")
-        return None
 
-    os.makedirs(dest_dir, exist_ok=True)
-    gif_path = os.path.join(dest_dir, file_name)
+def _frame_rate(timestamps):
+    span = (timestamps[-1] - timestamps[0]).total_seconds() if len(timestamps) > 1 else 0
+    return (len(timestamps) - 1) / span if span > 0 else 1.0
+
+
+def make_clip(images, timestamps, path, width=480, fmt='gif'):
+    """
+    메모리의 프레임(BGR numpy 배열)으로 GIF 또는 MP4 클립을 만든다.
+    GIF는 첫 프레임에서 만든 팔레트를 모든 프레임에 재사용하고, MP4는 cv2.VideoWriter로 H.264(안 되면 MPEG-4) 인코딩한다.
+    두 코덱 모두 열 수 없으면 RuntimeError를 낸다.
+
+    Args:
+        images (list[numpy.ndarray]): 시간 순서의 BGR 프레임
+        timestamps (list[datetime]): 프레임별 촬영 시각 (재생 속도 계산에 사용)
+        path (str): 저장할 파일 경로
+        width (int | None): 가로 해상도. 더 큰 프레임은 줄인다.
+        fmt (str): 'gif' 또는 'mp4'
+
+    Returns:
+        dict | None: 경로, 프레임 수, 인코딩 시간(ms), 파일 크기(byte). 프레임이 없으면 None
+    """
+    if not images:
+        print("⚠️ 이미지가 없습니다.")
+        return None
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    start = time.perf_counter()
+    fps = _frame_rate(timestamps)
+    images = [_resize(image, width) for image in images]
 
-    with imageio.get_writer(gif_path, mode='I', duration=0.99) as writer:
-        for image_name in all_images[-frame_num:]:
-            img = imageio.imread(os.path.join(src_dir, image_name))
-            writer.append_data(img)
+    if fmt == 'mp4':
+        height, w = images[0].shape[:2]
+        for fourcc in ('avc1', 'mp4v'):
+            writer = cv.VideoWriter(path, cv.VideoWriter_fourcc(*fourcc), fps, (w, height))
+            if writer.isOpened():
+                break
+            writer.release()
+        if not writer.isOpened():
+            if os.path.exists(path):
+                os.remove(path)
+            raise RuntimeError(f'MP4 인코더(avc1, mp4v)를 열 수 없습니다: {path} ({w}x{height}, {fps:.2f}fps)')
+        for image in images:
+            writer.write(image)
+        writer.release()
+    else:
+        frames = [Image.fromarray(cv.cvtColor(image, cv.COLOR_BGR2RGB)) for image in images]
+        palette = frames[0].quantize(colors=256, method=Image.Quantize.MEDIANCUT)
+        frames = [palette] + [frame.quantize(palette=palette, dither=Image.Dither.NONE) for frame in frames[1:]]
+        frames[0].save(path, save_all=True, append_images=frames[1:], duration=round(1000 / fps), loop=0)
 
-    return gif_path
+    stats = {
+        'path': path,
+        'frames': len(images),
+        'encode_ms': (time.perf_counter() - start) * 1000,
+        'bytes': os.path.getsize(path),
+    }
+    STAGE_SECONDS.observe(stats['encode_ms'] / 1000, stage='clip', format=fmt)
+    CLIPS.inc(format=fmt)
+    CLIP_BYTES.inc(stats['bytes'], format=fmt)
+    return stats
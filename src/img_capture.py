@@ -1,7 +1,17 @@
 import cv2 as cv
-import os
+import threading
+import time
+from collections import deque
 from datetime import datetime
 
+from src.frame_buffer import Frame, FrameBuffer
+from src.metrics import STAGE_SECONDS, metrics
+
+FRAME_NAME_FORMAT = r'%Y-%m-%d %H_%M_%S_%f'
+
+CAPTURED = metrics.counter('captured_frames_total', '카메라에서 읽은 프레임 수')
+CAPTURE_FAILED = metrics.counter('capture_failures_total', '프레임 읽기에 실패한 횟수')
+
 
 def open_capture(src=0):
     if src == 0:
@@ -13,17 +23,112 @@ def close_capture(cap: cv.VideoCapture):
     cap.release()
 
 
-def capture_frame(cap, target_dir='frames', image_name=None):
-    os.makedirs(target_dir, exist_ok=True)
+def frame_name(timestamp: datetime) -> str:
+    return timestamp.strftime(FRAME_NAME_FORMAT)
+
+
+def capture_frame(cap):
+    """
+    프레임 하나를 읽어 디코딩된 이미지(BGR numpy 배열)와 촬영 시각을 반환한다.
+    디스크 저장은 호출하는 쪽에서 FrameWriter로 선택적으로 수행한다.
+    """
     ret, frame = cap.read()
     now = datetime.now()
     if not ret:
         cap.set(cv.CAP_PROP_POS_FRAMES, 900)
         ret, frame = cap.read()
         now = datetime.now()
+    if not ret:
+        return None, now
+    return frame, now
+
+
+class CaptureThread:
+    """
+    open_capture/capture_frame을 감싸는 백그라운드 캡쳐 스레드.
+    Streamlit 재실행과 무관하게 지정한 FPS로 프레임을 읽어 링 버퍼에 넣는다.
+    소비하는 쪽(추론)은 버퍼를 번호로 읽으므로, 따라가지 못한 프레임은 버퍼에서 밀려나며 버려진다.
+    """
+
+    def __init__(self, src=0, fps=2.0, buffer: FrameBuffer | None = None, on_frame=None, camera=None):
+        self.src = src
+        # 계측 값에 붙일 카메라 레이블
+        self.labels = {'camera': camera} if camera else {}
+        self.fps = fps
+        self.buffer = buffer if buffer is not None else FrameBuffer()
+        self.on_frame = on_frame
+        self._stop = threading.Event()
+        self._thread = None
+        self.captured = 0
+        self.failed = 0
+        self.last_read_ms = 0.0
+        self._recent = deque(maxlen=30)
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=2.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def latest(self) -> Frame | None:
+        return self.buffer.latest()
+
+    def stats(self) -> dict:
+        recent = list(self._recent)
+        elapsed = recent[-1] - recent[0] if len(recent) > 1 else 0
+        return {
+            'target_fps': self.fps,
+            'actual_fps': (len(recent) - 1) / elapsed if elapsed else 0.0,
+            'captured': self.captured,
+            'failed': self.failed,
+            'last_read_ms': self.last_read_ms,
+        }
+
+    def _run(self):
+        cap = open_capture(self.src)
+        try:
+            next_time = time.monotonic()
+            while not self._stop.is_set():
+                start = time.monotonic()
+                image, timestamp = capture_frame(cap)
+                self.last_read_ms = (time.monotonic() - start) * 1000
+                STAGE_SECONDS.observe(self.last_read_ms / 1000, stage='capture', **self.labels)
+                if image is None:
+                    self.failed += 1
+                    CAPTURE_FAILED.inc(**self.labels)
+                else:
+                    self.feed(image, timestamp)
+
+                # 처리가 밀렸으면 따라잡으려 하지 않고 주기를 다시 맞춘다.
+                next_time += 1 / self.fps
+                now = time.monotonic()
+                if next_time < now:
+                    next_time = now
+                self._stop.wait(next_time - now)
+        finally:
+            close_capture(cap)
+
+    def feed(self, image, timestamp=None) -> Frame:
+        """
+        읽은 프레임을 버퍼에 넣고 on_frame을 호출한다. 캡쳐 스레드가 쓰며, 스레드 없이 프레임을 직접 넣을 때(벤치마크)도 쓴다.
 
-    if image_name is None:
-        image_name = datetime.now().strftime(r"%Y-%m-%d %H_%M_%S_%f")
-    file_name = os.path.join(target_dir, f'{image_name}.jpg')
-    if cv.imwrite(file_name, frame):
-        return file_name, now
\ No newline at end of file
+        Args:
+            image (numpy.ndarray): BGR 프레임
+            timestamp (datetime | None): 촬영 시각. None이면 지금
+        """
+        frame = self.buffer.append(image, timestamp or datetime.now())
+        self.captured += 1
+        CAPTURED.inc(**self.labels)
+        self._recent.append(time.monotonic())
+        if self.on_frame is not None:
+            try:
+                self.on_frame(frame)
+            except Exception as e:
+                print(f'❌ 프레임 처리 실패: {e}')
+        return frame
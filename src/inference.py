@@ -1,11 +1,6 @@
 from torchvision import models
-from ultralytics import YOLO
-from PIL import Image
 
-import pandas as pd
 import numpy as np
-import shutil
-import time
 import cv2
 import os
 
@@ -13,42 +8,173 @@ import torch
 import torch.nn as nn
 import torchvision.transforms as transforms
 
+from src.backends import build_classifier, build_detector, classifier_parity, detector_parity
+from src.metrics import STAGE_SECONDS, metrics
+from src.model_registry import registry
+from src.preprocess import check_parity, preprocess
+
 torch.classes.__path__ = []
 
 # ------------------------
 # 1. 환경 설정
 # ------------------------
 NODOG = '강아지 없음'
-BBOX_DIR = 'bbox'
-os.makedirs(BBOX_DIR, exist_ok=True)
 BEHAVIORS = ['FEETUP', 'LYING', 'SIT', 'WALK']
+YOLO_WEIGHTS = "resources/yolo11m.pt"
+RESNET_WEIGHTS = "resources/ResNet-34_96_1m17s_2537_8_10_2e-04_1e-06.pth"
+device = 'cuda' if torch.cuda.is_available() else 'cpu'
+
+# 추론 백엔드 설정 ('torch', 'torchscript', 'onnx')와 int8 보정에 쓸 프레임 폴더
+backend_config = {'yolo': 'torch', 'resnet': 'torch', 'int8': False, 'calibration': None}
 
 # ------------------------
 # 2. YOLO 모델 로드 (강아지 탐지)
 # ------------------------
-yolo_model = YOLO("resources/yolo11m.pt")
+def load_yolo_model():
+    return build_detector(YOLO_WEIGHTS, backend_config['yolo'], backend_config['int8'])
+
+
+def warmup_yolo_model(model):
+    model(np.zeros((640, 640, 3), dtype=np.uint8), verbose=False)
 
 # ------------------------
 # 3. ResNet 모델 로드 (강아지 동작 분류)
 # ------------------------
-device = 'cuda' if torch.cuda.is_available() else 'cpu'
-resnet_model = models.resnet34(weights=None)
-num_features = resnet_model.fc.in_features
-num_classes = 4
-resnet_model.fc = nn.Linear(num_features, num_classes)
-resnet_model.load_state_dict(torch.load("resources/ResNet-34_96_1m17s_2537_8_10_2e-04_1e-06.pth", map_location=device))
-resnet_model.to(device)
-resnet_model.eval()
+def load_eager_resnet_model():
+    resnet_model = models.resnet34(weights=None)
+    num_features = resnet_model.fc.in_features
+    num_classes = 4
+    resnet_model.fc = nn.Linear(num_features, num_classes)
+    resnet_model.load_state_dict(torch.load(RESNET_WEIGHTS, map_location=device))
+    resnet_model.to(device)
+    resnet_model.eval()
+    return resnet_model
+
+
+def load_resnet_model():
+    calibration = None
+    if backend_config['int8'] and backend_config['resnet'] != 'onnx' and backend_config['calibration']:
+        # 정적 양자화의 활성값 범위는 저장된 프레임의 강아지 크롭으로 정한다.
+        calibration = input_batches(dog_crops(load_sample_frames(backend_config['calibration'])))
+    return build_classifier(
+        load_eager_resnet_model(), RESNET_WEIGHTS, backend_config['resnet'], backend_config['int8'], device,
+        calibration=calibration,
+    )
+
+
+def warmup_resnet_model(model):
+    model(torch.zeros((1, 3, 224, 224)))
+
+
+def configure_backends(yolo='torch', resnet='torch', int8=False, calibration=None):
+    """
+    추론 백엔드를 바꾼다. 이미 불러온 모델은 내려가고, 다음 사용 시 새 백엔드로 다시 불러온다.
+
+    Args:
+        yolo (str): YOLO 탐지기 백엔드 ('torch', 'torchscript', 'onnx')
+        resnet (str): ResNet 분류기 백엔드 ('torch', 'torchscript', 'onnx')
+        int8 (bool): int8 양자화 적용 여부 (YOLO는 onnx에서만 지원)
+        calibration (str | None): torch/torchscript ResNet의 int8 정적 양자화 보정에 쓸 저장된 프레임 폴더 또는 영상
+    """
+    config = {'yolo': yolo, 'resnet': resnet, 'int8': int8, 'calibration': calibration}
+    if backend_config == config:
+        return
+    backend_config.update(config)
+    registry.register('yolo', load_yolo_model, warmup_yolo_model)
+    registry.register('resnet', load_resnet_model, warmup_resnet_model)
+
+
+def load_sample_frames(source, limit=32):
+    """
+    보정과 정확도 비교에 쓸 프레임을 고르게 골라 RGB로 읽는다.
+
+    Args:
+        source (str | list[str]): 저장된 프레임 폴더(하위 폴더 포함), 영상 파일 또는 이미지 경로 목록
+
+    Returns:
+        list[numpy.ndarray]: 최대 limit개의 RGB 프레임
+    """
+    if isinstance(source, str) and os.path.isfile(source):
+        cap = cv2.VideoCapture(source)
+        step = max(1, int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) // limit)
+        frames = []
+        index = 0
+        while len(frames) < limit:
+            ok, frame = cap.read()
+            if not ok:
+                break
+            if index % step == 0:
+                frames.append(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+            index += 1
+        cap.release()
+        return frames
+    if isinstance(source, str):
+        source = sorted(
+            os.path.join(root, name) for root, _, names in os.walk(source) for name in names
+            if name.lower().endswith(('.jpg', '.jpeg', '.png'))
+        )
+    paths = list(source)[::max(1, len(source) // limit)][:limit]
+    frames = [cv2.imread(path) for path in paths]
+    return [cv2.cvtColor(frame, cv2.COLOR_BGR2RGB) for frame in frames if frame is not None]
+
+
+def dog_crops(frames_rgb, batch_size=8):
+    """프레임마다 강아지 크롭을, 강아지가 없으면 프레임 전체를 반환한다."""
+    crops = []
+    for i in range(0, len(frames_rgb), batch_size):
+        chunk = frames_rgb[i:i + batch_size]
+        for frame, box in zip(chunk, detect_dogs(chunk)):
+            if box is not None and box[2] > box[0] and box[3] > box[1]:
+                x1, y1, x2, y2 = box
+                frame = frame[y1:y2, x1:x2]
+            crops.append(frame)
+    return crops
+
+
+def input_batches(crops_rgb, batch_size=8):
+    """크롭을 ResNet 입력 배치 목록으로 만든다. preprocess의 버퍼는 재사용되므로 복사해 둔다."""
+    return [preprocess(crops_rgb[i:i + batch_size]).clone() for i in range(0, len(crops_rgb), batch_size)]
+
+
+def check_backend_parity(frames):
+    """
+    현재 백엔드와 eager PyTorch 모델의 출력을 비교한다.
+
+    Args:
+        frames (list[numpy.ndarray]): 비교에 사용할 RGB 프레임 (저장된 프레임 등). ResNet은 이 프레임의 강아지 크롭으로 비교한다.
+
+    Returns:
+        dict: 모델별 비교 결과와 전처리(preprocess와 transform) 비교
+    """
+    from ultralytics import YOLO
+    if not frames:
+        raise ValueError('비교할 프레임이 없습니다.')
+    crops = dog_crops(frames)
+    reference = build_classifier(load_eager_resnet_model(), RESNET_WEIGHTS)
+    return {
+        'resnet': classifier_parity(reference, registry.get('resnet'), input_batches(crops)),
+        'yolo': detector_parity(YOLO(YOLO_WEIGHTS), registry.get('yolo'), frames),
+        'preprocess': check_parity(crops, transform, registry.get('resnet')),
+    }
+
+
+# 모델은 import 시점이 아니라 처음 사용할 때 불러온다.
+registry.register('yolo', load_yolo_model, warmup_yolo_model)
+registry.register('resnet', load_resnet_model, warmup_resnet_model)
 
 # ------------------------
 # 4. 이미지 전처리 함수 (ResNet 입력용)
 # ------------------------
+# 추론에는 src.preprocess의 preprocess를 쓴다. transform은 정확도 비교의 기준으로 남겨 둔다.
 transform = transforms.Compose([
     transforms.Resize((224, 224)),
     transforms.ToTensor(),
     transforms.Normalize([0.485, 0.456, 0.406], [0.229, 0.224, 0.225])
 ])
 
+INFERRED = metrics.counter('inferred_frames_total', 'YOLO로 탐지한 프레임 수')
+CLASSIFIED = metrics.counter('classified_crops_total', 'ResNet으로 분류한 강아지 크롭 수')
+
 # ------------------------
 # 5. 바운딩 박스 그리기 (YOLO + ResNet)
 # ------------------------
@@ -90,63 +216,275 @@ def draw_bounding_box(frame, x1, y1, x2, y2, class_name):
     return frame
 
 # ------------------------
-# 6. 이미지 추론 함수 (YOLO + ResNet)
+# 6. 탐지/분류 함수 (배치 단위)
 # ------------------------
-def infer_image(image_path, prev_has_dog, prev_class, magic=-1):
+class DogTracker:
     """
-    입력 이미지에서 강아지를 감지하고 동작을 분류하는 함수.
-
-    Returns:
-        dict: 결과 정보 (바운딩 박스 이미지 경로, 강아지 존재 여부, 현재 동작, GIF 생성 여부)
+    한 번 강아지를 찾은 뒤에는 직전 박스 주변의 확장된 영역(ROI)만 작은 해상도로 탐지하는 추적기.
+    redetect_every 프레임마다, 또는 ROI에서 강아지를 놓치면 전체 프레임을 다시 탐지한다.
     """
-    global yolo_model
-    
-    frame = cv2.imread(image_path)
-    if frame is None:
-        print(f"❌ 이미지 로드 실패: {image_path}")
-        return {"has_dog": prev_has_dog, "current_class": prev_class, "make_gif": False}
-    
-    # 우선 목적지에 원본 이미지를 복제
-    shutil.copy(image_path, BBOX_DIR)
-    image_path = os.path.join(BBOX_DIR, os.path.basename(image_path))
-    
-    frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
 
-    # 1️⃣ YOLO 탐지
-    results = yolo_model(frame_rgb)
-    best_box = None
-    best_confidence = 0.0
+    def __init__(self, margin=0.5, redetect_every=10, min_roi=160, roi_imgsz=320):
+        """
+        Args:
+            margin (float): 박스 너비/높이 대비 ROI를 양쪽으로 넓히는 비율
+            redetect_every (int): 전체 프레임 재탐지 주기 (프레임 수)
+            min_roi (int): ROI의 최소 한 변 길이 (픽셀)
+            roi_imgsz (int): ROI 탐지에 사용할 YOLO 입력 크기
+        """
+        self.margin = margin
+        self.redetect_every = redetect_every
+        self.min_roi = min_roi
+        self.roi_imgsz = roi_imgsz
+        self.box = None
+        self._since_full = 0
+        self.full_detections = 0
+        self.roi_detections = 0
+        self.lost = 0
+
+    def roi(self, shape):
+        """다음 탐지에 사용할 ROI (x1, y1, x2, y2). 전체 프레임을 탐지해야 하면 None."""
+        if self.box is None or self._since_full >= self.redetect_every:
+            return None
+        height, width = shape[:2]
+        x1, y1, x2, y2 = self.box
+        pad_x = max((x2 - x1) * self.margin, (self.min_roi - (x2 - x1)) / 2, 0)
+        pad_y = max((y2 - y1) * self.margin, (self.min_roi - (y2 - y1)) / 2, 0)
+        return (
+            max(0, int(x1 - pad_x)), max(0, int(y1 - pad_y)),
+            min(width, int(x2 + pad_x)), min(height, int(y2 + pad_y)),
+        )
+
+    def update(self, boxes, full):
+        found = [box for box in boxes if box is not None]
+        self.box = found[-1] if found else None
+        self._since_full = 0 if full else self._since_full + len(boxes)
+
+    def reset(self):
+        self.box = None
 
+    def stats(self):
+        total = self.full_detections + self.roi_detections
+        return {
+            'full_detections': self.full_detections,
+            'roi_detections': self.roi_detections,
+            'lost': self.lost,
+            'roi_ratio': self.roi_detections / total if total else 0.0,
+        }
+
+
+def _detect(frames_rgb, imgsz=None):
+    best_boxes = []
+    yolo_model = registry.get('yolo')
+    kwargs = {'imgsz': imgsz} if imgsz else {}
+    with STAGE_SECONDS.time(stage='detect'):
+        results = yolo_model(list(frames_rgb), **kwargs)
     for result in results:
+        best_box = None
+        best_confidence = 0.0
         for box in result.boxes.data:
             x1, y1, x2, y2, conf, cls = box.tolist()
             if int(cls) == 16 and conf > best_confidence:
                 best_confidence = conf
                 best_box = (int(x1), int(y1), int(x2), int(y2))
+        best_boxes.append(best_box)
+    return best_boxes
 
-    # 2️⃣ 강아지가 없는 경우 처리
-    if best_box is None:
-        print('👁️‍🗨️ 강아지가 없습니다.')
-        new_image_path = f'{image_path[:-4]} False 강아지 없음.jpg'
-        if not os.path.exists(new_image_path):
-            os.rename(image_path, new_image_path)
+
+def detect_dogs(frames_rgb, tracker=None):
+    """
+    YOLO를 프레임 배치에 한 번 실행하고, 프레임마다 신뢰도가 가장 높은 강아지 박스를 반환한다.
+    tracker가 있으면 같은 카메라의 연속된 프레임으로 보고 직전 박스 주변만 탐지한다.
+
+    Returns:
+        list: 프레임별 (x1, y1, x2, y2) 또는 None
+    """
+    return detect_dogs_groups([(frames_rgb, tracker)])[0]
+
+
+def detect_dogs_groups(groups):
+    """
+    여러 카메라의 프레임 묶음을 함께 탐지한다. 전체 프레임 탐지와 ROI 탐지를 카메라에 관계없이
+    각각 한 번의 YOLO 배치로 모아 실행한다.
+
+    Args:
+        groups (list[tuple]): (RGB 프레임 목록, DogTracker 또는 None) 목록. 한 묶음은 한 카메라의 연속된 프레임이다.
+
+    Returns:
+        list: 묶음별로 프레임별 (x1, y1, x2, y2) 또는 None 목록
+    """
+    best_boxes = [[None] * len(frames_rgb) for frames_rgb, _ in groups]
+    full, rois = [], {}  # (묶음, 프레임) 목록. ROI 탐지는 입력 크기별로 모은다.
+    full_groups = set()
+    for g, (frames_rgb, tracker) in enumerate(groups):
+        if not frames_rgb:
+            continue
+        roi = tracker.roi(frames_rgb[0].shape) if tracker is not None else None
+        if roi is None:
+            full.extend((g, i) for i in range(len(frames_rgb)))
+            full_groups.add(g)
+            if tracker is not None:
+                tracker.full_detections += len(frames_rgb)
         else:
-            os.remove(image_path)
-        return {"bbox_image_path": image_path, "has_dog": False, "current_class": NODOG, "make_gif": prev_has_dog}
+            rois.setdefault(tracker.roi_imgsz, []).extend((g, i, roi) for i in range(len(frames_rgb)))
+            tracker.roi_detections += len(frames_rgb)
+
+    lost = []
+    for imgsz, items in rois.items():
+        crops = [groups[g][0][i][y1:y2, x1:x2] for g, i, (x1, y1, x2, y2) in items]
+        for (g, i, (rx1, ry1, _, _)), box in zip(items, _detect(crops, imgsz=imgsz)):
+            if box is None:
+                # ROI에서 놓친 프레임은 전체 프레임으로 다시 탐지한다.
+                lost.append((g, i))
+                continue
+            best_boxes[g][i] = (box[0] + rx1, box[1] + ry1, box[2] + rx1, box[3] + ry1)
+    for g, _ in lost:
+        tracker = groups[g][1]
+        tracker.lost += 1
+        tracker.full_detections += 1
+        full_groups.add(g)
+
+    full += lost
+    if full:
+        for (g, i), box in zip(full, _detect([groups[g][0][i] for g, i in full])):
+            best_boxes[g][i] = box
+
+    for g, (frames_rgb, tracker) in enumerate(groups):
+        if tracker is not None and frames_rgb:
+            tracker.update(best_boxes[g], full=g in full_groups)
+    return best_boxes
 
-    # 3️⃣ 강아지 영역 크롭 후 ResNet으로 분류
-    x1, y1, x2, y2 = best_box
-    cropped_img = frame_rgb[y1:y2, x1:x2]
-    cropped_img_pil = Image.fromarray(cropped_img)
-    processed_img = transform(cropped_img_pil).unsqueeze(0)
+
+def classify_crops(crops_rgb):
+    """
+    강아지 크롭 이미지들을 한 번의 ResNet 배치 연산으로 분류한다.
+
+    Returns:
+        list: 크롭별 (예측 클래스 인덱스, 신뢰도)
+    """
+    if not crops_rgb:
+        return []
+    resnet_model = registry.get('resnet')
+    with STAGE_SECONDS.time(stage='preprocess'):
+        batch = preprocess(crops_rgb)
 
     with torch.no_grad():
-        start_time = time.time()
-        outputs = resnet_model(processed_img.to(device))
-        end_time = time.time()
+        with STAGE_SECONDS.time(stage='classify'):
+            outputs = resnet_model(batch)
         probs = torch.softmax(outputs, dim=1)
-        predicted_class = torch.argmax(probs, dim=1).item()
-        confidence = probs[0, predicted_class].item()
+        confidences, predicted = probs.max(dim=1)
+    CLASSIFIED.inc(len(crops_rgb))
+    return list(zip(predicted.tolist(), confidences.tolist()))
+
+
+def _as_list(value):
+    return list(value) if isinstance(value, (list, tuple)) else None
+
+
+# ------------------------
+# 7. 이미지 추론 함수 (YOLO + ResNet)
+# ------------------------
+def infer_batch(frames, prev_has_dog=False, prev_class=NODOG, magic=-1, tracker=None):
+    """
+    여러 프레임에서 강아지를 감지하고 동작을 분류하는 함수.
+    YOLO는 프레임 배치에 한 번, ResNet은 모든 강아지 크롭에 한 번만 실행된다.
+
+    Args:
+        frames (list[numpy.ndarray | str]): 디코딩된 BGR 이미지 또는 이미지 경로 목록
+        prev_has_dog (bool | list[bool]): 이전 강아지 존재 여부. 하나의 값이면 frames를 같은 카메라의
+            연속된 프레임으로 보고 앞 프레임의 결과를 다음 프레임의 이전 상태로 사용한다.
+            목록이면 프레임마다 독립된 이전 상태로 사용한다.
+        prev_class (str | list[str]): 이전 동작. prev_has_dog와 같은 규칙을 따른다.
+        magic (int | list[int]): 시연 영상용 프레임 번호. 하나의 값이면 프레임마다 1씩 증가한다.
+        tracker (DogTracker | None): 같은 카메라의 연속된 프레임일 때 사용할 추적기
+
+    Returns:
+        list[dict]: 프레임별 결과 정보 (바운딩 박스 이미지, 박스 좌표, 강아지 존재 여부, 현재 동작, GIF 생성 여부)
+    """
+    return infer_streams([(frames, prev_has_dog, prev_class, magic, tracker)])[0]
+
+
+def infer_streams(streams, annotate=True):
+    """
+    여러 카메라의 프레임을 한꺼번에 추론한다. 카메라마다 infer_batch와 같은 결과를 내지만,
+    YOLO 탐지와 ResNet 분류는 모든 카메라의 프레임을 모아 배치로 실행한다.
+
+    Args:
+        streams (list[tuple]): 카메라별 (frames, prev_has_dog, prev_class, magic, tracker). 각 값은 infer_batch와 같다.
+        annotate (bool): False면 바운딩 박스를 그리지 않고 'bbox_image'에 원본 프레임을 넣는다.
+            그림을 결과를 받는 쪽에서 다시 그리는 경우(작업자 프로세스)에 쓴다.
+
+    Returns:
+        list[list[dict]]: 카메라별 infer_batch 결과
+    """
+    groups = []
+    for frames, prev_has_dog, prev_class, magic, tracker in streams:
+        n = len(frames)
+        prev_has_dogs = _as_list(prev_has_dog)
+        prev_classes = _as_list(prev_class)
+        chained = prev_has_dogs is None
+        if chained:
+            prev_has_dogs, prev_classes = [prev_has_dog] * n, [prev_class] * n
+        magics = _as_list(magic) or [magic + i if magic > -1 else -1 for i in range(n)]
+
+        images = []
+        for frame in frames:
+            if isinstance(frame, str):
+                image_path = frame
+                with STAGE_SECONDS.time(stage='load'):
+                    frame = cv2.imread(image_path)
+                if frame is None:
+                    print(f"❌ 이미지 로드 실패: {image_path}")
+            images.append(frame)
+        loaded = [i for i, frame in enumerate(images) if frame is not None]
+        with STAGE_SECONDS.time(stage='convert'):
+            frames_rgb = [cv2.cvtColor(images[i], cv2.COLOR_BGR2RGB) for i in loaded]
+        INFERRED.inc(len(loaded))
+        groups.append((images, loaded, frames_rgb, prev_has_dogs, prev_classes, magics, chained, tracker))
+
+    # 1️⃣ YOLO 탐지 (모든 카메라를 한 번에)
+    detections = detect_dogs_groups([(frames_rgb, tracker) for _, _, frames_rgb, *_, tracker in groups])
+    best_boxes = []
+    for (images, loaded, *_), boxes in zip(groups, detections):
+        frame_boxes = [None] * len(images)
+        for i, best_box in zip(loaded, boxes):
+            frame_boxes[i] = best_box
+        best_boxes.append(frame_boxes)
+
+    # 2️⃣ 강아지 영역 크롭 후 ResNet으로 분류 (모든 카메라의 크롭을 한 번에)
+    with_dog, crops = [], []
+    for g, (images, loaded, frames_rgb, *_) in enumerate(groups):
+        for i, frame_rgb in zip(loaded, frames_rgb):
+            if best_boxes[g][i] is not None:
+                x1, y1, x2, y2 = best_boxes[g][i]
+                with_dog.append((g, i))
+                crops.append(frame_rgb[y1:y2, x1:x2])
+    predictions = dict(zip(with_dog, classify_crops(crops)))
+
+    outputs = []
+    for g, (images, _, _, prev_has_dogs, prev_classes, magics, chained, _) in enumerate(groups):
+        results = []
+        for i in range(len(images)):
+            if chained and results:
+                prev_has_dogs[i] = results[-1]['has_dog']
+                prev_classes[i] = results[-1]['current_class']
+            results.append(_make_result(
+                images[i], best_boxes[g][i], predictions.get((g, i)), prev_has_dogs[i], prev_classes[i], magics[i],
+                annotate,
+            ))
+        outputs.append(results)
+    return outputs
+
+
+def _make_result(frame, best_box, prediction, prev_has_dog, prev_class, magic, annotate=True):
+    if frame is None:
+        return {"bbox_image": None, "bbox": None, "has_dog": prev_has_dog, "current_class": prev_class, "make_gif": False}
+
+    # 3️⃣ 강아지가 없는 경우 처리
+    if best_box is None:
+        return {"bbox_image": frame, "bbox": None, "has_dog": False, "current_class": NODOG, "make_gif": prev_has_dog}
+
+    predicted_class, confidence = prediction
 
     """시연 영상"""
     if magic > -1:
@@ -159,19 +497,28 @@ def infer_image(image_path, prev_has_dog, prev_class, magic=-1):
 
     current_class = BEHAVIORS[predicted_class]
 
-    # 추론 시간 계산 (ms 단위)
-    inference_time_ms = (end_time - start_time) * 1000
-    print(f"Speed: {inference_time_ms:.2f}ms for ResNet")
-
     # 4️⃣ 바운딩 박스 그리기 (현재 클래스 적용)
-    frame = draw_bounding_box(frame, x1, y1, x2, y2, current_class)
-    cv2.imwrite(image_path, frame)
+    # 원본 프레임은 링 버퍼에서 공유되므로 복사본에 그린다.
+    bbox_image = frame
+    if annotate:
+        x1, y1, x2, y2 = best_box
+        with STAGE_SECONDS.time(stage='annotate'):
+            bbox_image = draw_bounding_box(frame.copy(), x1, y1, x2, y2, current_class)
 
     # 5️⃣ 이전 클래스와 비교하여 GIF 생성 여부 결정
-    print(f'👁️‍🗨️ 추론 결과: {current_class}')
-    new_image_path = f'{image_path[:-4]} True {current_class}.jpg'
-    if not os.path.exists(new_image_path):
-        os.rename(image_path, new_image_path)
-    else:
-        os.remove(image_path)
-    return {"bbox_image_path": image_path, "has_dog": True, "current_class": current_class, "make_gif": prev_class != current_class}
+    return {"bbox_image": bbox_image, "bbox": best_box, "has_dog": True, "current_class": current_class, "make_gif": prev_class != current_class}
+
+
+def infer_image(frame, prev_has_dog, prev_class, magic=-1):
+    """
+    입력 이미지에서 강아지를 감지하고 동작을 분류하는 함수.
+
+    Args:
+        frame (numpy.ndarray | str): 디코딩된 BGR 이미지 또는 이미지 경로
+        prev_has_dog (bool): 이전 프레임의 강아지 존재 여부
+        prev_class (str): 이전 프레임의 동작
+
+    Returns:
+        dict: 결과 정보 (바운딩 박스 이미지, 박스 좌표, 강아지 존재 여부, 현재 동작, GIF 생성 여부)
+    """
+    return infer_batch([frame], prev_has_dog, prev_class, magic)[0]
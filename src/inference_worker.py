@@ -0,0 +1,367 @@
+import multiprocessing as mp
+import os
+import queue
+import sys
+import threading
+import time
+import types
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+
+import cv2
+import numpy as np
+
+from src.inference import draw_bounding_box
+from src.metrics import STAGE_SECONDS, metrics
+from src.model_server import InferenceServer
+
+
+class WorkerError(RuntimeError):
+    """추론 작업자 프로세스가 죽었거나 응답하지 않을 때 발생한다."""
+
+
+_main_lock = threading.Lock()
+
+
+@contextmanager
+def _hidden_main():
+    """
+    Streamlit은 앱 스크립트를 __main__으로 실행하므로, spawn된 작업자가 __main__을 다시 import하면
+    앱 전체가 작업자 안에서 다시 실행된다. 작업자를 띄우는 동안만 빈 __main__으로 바꿔 둔다.
+    """
+    with _main_lock:
+        main = sys.modules['__main__']
+        sys.modules['__main__'] = types.ModuleType('__main__')
+        try:
+            yield
+        finally:
+            sys.modules['__main__'] = main
+
+
+def _attach(name):
+    # 3.13부터는 연결한 쪽이 공유 메모리를 정리하지 않도록 할 수 있다. 정리는 만든 쪽(부모)이 한다.
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    return shared_memory.SharedMemory(name=name)
+
+
+def _pack(streams):
+    """
+    모든 카메라의 프레임을 공유 메모리 하나에 이어 붙인다.
+
+    Returns:
+        tuple: (SharedMemory 또는 None, 카메라별 프레임 배치 정보 목록)
+    """
+    layouts, size = [], 0
+    for frames, *_ in streams:
+        layout = []
+        for frame in frames:
+            if isinstance(frame, np.ndarray):
+                frame = np.ascontiguousarray(frame)
+                layout.append(('array', size, frame.shape, frame.dtype.str))
+                size += frame.nbytes
+            else:
+                layout.append(('path', frame))
+        layouts.append(layout)
+
+    shm = shared_memory.SharedMemory(create=True, size=size) if size else None
+    for (frames, *_), layout in zip(streams, layouts):
+        for frame, item in zip(frames, layout):
+            if item[0] == 'array':
+                _, offset, shape, dtype = item
+                np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset)[...] = frame
+    return shm, layouts
+
+
+def _unpack(buf, layouts):
+    frames = []
+    for layout in layouts:
+        frames.append([
+            np.ndarray(item[2], dtype=item[3], buffer=buf, offset=item[1]) if item[0] == 'array' else item[1]
+            for item in layout
+        ])
+    return frames
+
+
+def _run_task(infer_streams, buf, layouts, states):
+    frames = _unpack(buf, layouts)
+    streams = [(stream_frames, *state) for stream_frames, state in zip(frames, states)]
+    replies = []
+    # 바운딩 박스는 부모가 원본 프레임에 그리므로 작업자에서는 그리지 않는다.
+    for (_, _, _, _, tracker), results in zip(streams, infer_streams(streams, annotate=False)):
+        replies.append((
+            [{key: value for key, value in result.items() if key != 'bbox_image'} | {'loaded': result['bbox_image'] is not None}
+             for result in results],
+            tracker.__dict__ if tracker is not None else None,
+        ))
+    # 공유 메모리를 가리키는 배열은 이 함수가 끝나면 모두 해제된다.
+    return replies
+
+
+def _worker_main(tasks, results, backends, threads, initializer, initargs):
+    """
+    작업자 프로세스의 본체. 모델을 불러와 예열한 뒤 'ready'를 알리고,
+    작업 큐에서 추론 요청과 상태 확인(ping)을 받아 결과 큐로 답한다.
+    바운딩 박스 이미지는 보내지 않고 박스 좌표만 돌려준다. 그림은 부모가 원본 프레임에 그린다.
+    답하기 전에 이 프로세스의 계측 값('metrics')을 함께 보낸다.
+    """
+    if initializer is not None:
+        initializer(*initargs)
+    import torch
+    from src.inference import configure_backends, infer_streams
+    from src.model_registry import registry
+    if threads:
+        torch.set_num_threads(threads)
+    if backends:
+        configure_backends(**backends)
+    registry.warmup()
+    results.put(('ready', None, os.getpid()))
+
+    parent = mp.parent_process()
+    while True:
+        try:
+            message = tasks.get(timeout=1.0)
+        except queue.Empty:
+            # 앱이 강제로 종료되어 부모가 사라졌으면 함께 끝낸다.
+            if parent is not None and not parent.is_alive():
+                break
+            continue
+        if message is None:
+            break
+        kind, task_id, payload = message
+        if kind == 'ping':
+            results.put(('metrics', None, metrics.snapshot()))
+            results.put(('pong', task_id, None))
+            continue
+        shm_name, layouts, states = payload
+        shm = _attach(shm_name) if shm_name else None
+        try:
+            reply = ('done', task_id, _run_task(infer_streams, shm.buf if shm is not None else None, layouts, states))
+        except Exception as e:
+            reply = ('error', task_id, f'{type(e).__name__}: {e}')
+        if shm is not None:
+            shm.close()
+        results.put(('metrics', None, metrics.snapshot()))
+        results.put(reply)
+
+
+class _Worker:
+    """작업자 프로세스 하나와 그 작업/결과 큐. 죽거나 응답이 없으면 restart()로 새 프로세스를 띄운다."""
+
+    def __init__(self, index, ctx, args):
+        self.index = index
+        self.ctx = ctx
+        self.args = args
+        self.process = None
+        self.tasks = None
+        self.results = None
+        self.ready = False
+        self.restarts = -1
+        self.completed = 0
+        self.failed = 0
+        self.last_seen = None
+        self.last_error = None
+
+    def start(self):
+        self.tasks = self.ctx.Queue()
+        self.results = self.ctx.Queue()
+        self.process = self.ctx.Process(
+            target=_worker_main, args=(self.tasks, self.results, *self.args),
+            name=f'inference-worker-{self.index}', daemon=True,
+        )
+        with _hidden_main():
+            self.process.start()
+        self.ready = False
+        self.restarts += 1
+
+    def kill(self):
+        if self.process is not None and self.process.is_alive():
+            self.process.kill()
+            self.process.join(timeout=5)
+        for q in (self.tasks, self.results):
+            if q is not None:
+                q.cancel_join_thread()
+                q.close()
+
+    def restart(self, reason):
+        print(f'⚠️ 추론 작업자 {self.index} 재시작: {reason}')
+        self.last_error = reason
+        self.kill()
+        self.start()
+
+    def report(self):
+        return {
+            'pid': self.process.pid if self.process is not None else None,
+            'alive': self.process is not None and self.process.is_alive(),
+            'ready': self.ready,
+            'restarts': max(self.restarts, 0),
+            'completed': self.completed,
+            'failed': self.failed,
+            'last_seen': self.last_seen,
+            'last_error': self.last_error,
+        }
+
+
+class ProcessInferenceServer(InferenceServer):
+    """
+    추론을 별도의 작업자 프로세스들에서 실행하는 InferenceServer.
+    프레임은 파일 경로가 아니라 공유 메모리로 넘기고, 결과(박스 좌표, 행동)는 큐로 돌려받는다.
+    작업자마다 전담 스레드가 배치를 보내므로 작업자 수만큼 배치가 동시에 처리되며,
+    Streamlit 프로세스는 모델 연산에 GIL을 잡히지 않는다.
+    작업자가 죽거나 task_timeout 안에 답하지 않으면 그 배치는 실패로 돌리고 작업자를 다시 띄운다.
+    한가할 때는 health_interval마다 상태를 확인한다.
+    """
+
+    def __init__(
+        self, processes=1, backends=None, threads=None, task_timeout=60.0, startup_timeout=300.0,
+        health_interval=5.0, initializer=None, initargs=(), **kwargs,
+    ):
+        """
+        Args:
+            processes (int): 작업자 프로세스 수
+            backends (dict | None): 작업자에서 호출할 configure_backends 인자
+            threads (int | None): 작업자마다 torch가 쓸 스레드 수
+            task_timeout (float): 배치 하나를 기다리는 최대 시간(초)
+            startup_timeout (float): 작업자가 모델을 불러오고 준비될 때까지 기다리는 최대 시간(초)
+            health_interval (float): 한가할 때 상태를 확인하는 주기(초)
+            initializer (callable | None): 작업자 프로세스가 모델을 불러오기 전에 호출할 함수
+            kwargs: InferenceServer 인자
+        """
+        super().__init__(**kwargs)
+        self.concurrency = processes
+        self.task_timeout = task_timeout
+        self.startup_timeout = startup_timeout
+        self.health_interval = health_interval
+        # torch와 스레드를 쓰는 부모를 fork하지 않도록 spawn으로 띄운다.
+        ctx = mp.get_context('spawn')
+        args = (backends, threads, initializer, initargs)
+        self.workers = [_Worker(i, ctx, args) for i in range(processes)]
+        self._task_ids = iter(range(1, sys.maxsize))
+        self._task_lock = threading.Lock()
+
+    def start(self):
+        for worker in self.workers:
+            worker.start()
+        return super().start()
+
+    def stop(self):
+        super().stop()
+        for worker in self.workers:
+            try:
+                worker.tasks.put(None)
+            except (ValueError, OSError):
+                pass
+        for worker in self.workers:
+            if worker.process is not None:
+                worker.process.join(timeout=5)
+            worker.kill()
+            metrics.forget(f'worker-{worker.index}')
+
+    def health(self):
+        """작업자별 pid, 생존 여부, 준비 여부, 재시작 횟수, 처리/실패 배치 수, 마지막 응답 시각을 반환한다."""
+        return [worker.report() for worker in self.workers]
+
+    def stats(self):
+        stats = super().stats()
+        stats.update(workers=len(self.workers), restarts=sum(max(worker.restarts, 0) for worker in self.workers))
+        return stats
+
+    def _next_task_id(self):
+        with self._task_lock:
+            return next(self._task_ids)
+
+    def _wait(self, worker, task_id, timeout):
+        """worker가 task_id에 답할 때까지 기다린다. 'ready'는 도중에 오더라도 기록만 한다."""
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                kind, reply_id, payload = worker.results.get(timeout=0.5)
+            except queue.Empty:
+                if not worker.process.is_alive():
+                    raise WorkerError(f'작업자 {worker.index}가 종료되었습니다 (exit code {worker.process.exitcode})')
+                if time.monotonic() > deadline:
+                    raise WorkerError(f'작업자 {worker.index}가 {timeout:.0f}초 동안 응답하지 않았습니다')
+                continue
+            worker.last_seen = time.time()
+            if kind == 'metrics':
+                metrics.merge(f'worker-{worker.index}', payload)
+                continue
+            if kind == 'ready':
+                worker.ready = True
+                if task_id is None:
+                    return payload
+                continue
+            if reply_id != task_id:
+                continue  # 재시작 전 작업의 늦은 응답
+            if kind == 'error':
+                raise RuntimeError(payload)
+            return payload
+
+    def _ensure_ready(self, worker):
+        if worker.ready:
+            return
+        try:
+            self._wait(worker, None, self.startup_timeout)
+        except WorkerError as e:
+            worker.restart(str(e))
+            raise
+
+    def _idle(self, slot):
+        worker = self.workers[slot]
+        if self._stop.is_set():
+            return
+        if worker.last_seen is not None and time.time() - worker.last_seen < self.health_interval:
+            return
+        try:
+            self._ensure_ready(worker)
+            task_id = self._next_task_id()
+            worker.tasks.put(('ping', task_id, None))
+            self._wait(worker, task_id, self.task_timeout)
+        except WorkerError as e:
+            if not self._stop.is_set() and worker.ready:
+                worker.restart(str(e))
+
+    def _infer_streams(self, streams, slot):
+        worker = self.workers[slot]
+        self._ensure_ready(worker)
+        shm, layouts = _pack(streams)
+        try:
+            task_id = self._next_task_id()
+            states = [(prev_has_dog, prev_class, magic, tracker) for _, prev_has_dog, prev_class, magic, tracker in streams]
+            worker.tasks.put(('infer', task_id, (shm.name if shm is not None else None, layouts, states)))
+            try:
+                replies = self._wait(worker, task_id, self.task_timeout)
+            except WorkerError as e:
+                worker.failed += 1
+                worker.restart(str(e))
+                raise
+            except RuntimeError:
+                worker.failed += 1
+                raise
+            worker.completed += 1
+        finally:
+            if shm is not None:
+                shm.close()
+                shm.unlink()
+
+        outputs = []
+        for (frames, *_, tracker), (results, tracker_state) in zip(streams, replies):
+            if tracker is not None:
+                tracker.__dict__.update(tracker_state)
+            outputs.append([_with_image(frame, result) for frame, result in zip(frames, results)])
+        return outputs
+
+
+def _with_image(frame, result):
+    """작업자가 돌려준 결과에 바운딩 박스 이미지를 다시 붙인다."""
+    loaded = result.pop('loaded')
+    if isinstance(frame, str):
+        frame = cv2.imread(frame) if loaded else None
+    if not loaded or frame is None:
+        result['bbox_image'] = None
+    elif result['bbox'] is not None:
+        with STAGE_SECONDS.time(stage='annotate'):
+            result['bbox_image'] = draw_bounding_box(frame.copy(), *result['bbox'], result['current_class'])
+    else:
+        result['bbox_image'] = frame
+    return result
@@ -0,0 +1,265 @@
+import os
+import sqlite3
+import sys
+import threading
+from datetime import datetime
+
+import pandas as pd
+
+COLUMNS = ['날짜', '시간', '행동', '파일']
+DATE_FORMAT = r'%Y년 %m월 %d일'
+TIME_FORMAT = r'%H시 %M분 %S초 %f'
+
+
+def _to_row(timestamp: datetime, behavior, file, camera=None):
+    return (
+        timestamp.isoformat(sep=' ', timespec='microseconds'), timestamp.strftime('%Y-%m-%d'),
+        timestamp.strftime(DATE_FORMAT), timestamp.strftime(TIME_FORMAT), behavior, file, camera,
+    )
+
+
+def _in(column, values):
+    return f'{column} IN ({", ".join("?" * len(values))})'
+
+
+def _to_dataframe(rows):
+    return pd.DataFrame(rows, columns=COLUMNS)
+
+
+class LogStore:
+    """
+    행동 기록을 SQLite에 한 줄씩 추가하는 저장소.
+    기록 하나를 추가하는 비용은 기록의 양과 무관하며, 시각(ts)과 날짜 인덱스로 기간/행동별 조회를 한다.
+    조회 결과는 기존 CSV와 같은 열(날짜, 시간, 행동, 파일)의 DataFrame이며 최신 기록이 먼저 온다.
+    여러 카메라가 하나의 저장소를 함께 쓰며, 조회할 때 cameras로 카메라를 골라낼 수 있다.
+    """
+
+    def __init__(self, path='logs/logs.sqlite3'):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript('''
+            CREATE TABLE IF NOT EXISTS events (
+                id INTEGER PRIMARY KEY,
+                ts TEXT NOT NULL,
+                day TEXT NOT NULL,
+                date TEXT NOT NULL,
+                time TEXT NOT NULL,
+                behavior TEXT NOT NULL,
+                file TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_events_day ON events(day, ts);
+            CREATE INDEX IF NOT EXISTS idx_events_behavior ON events(behavior, ts);
+            CREATE TABLE IF NOT EXISTS migrated_files (
+                name TEXT PRIMARY KEY,
+                mtime REAL NOT NULL
+            );
+        ''')
+        # 카메라 열이 없던 이전 저장소에는 열을 추가한다. 이전 기록의 카메라는 NULL로 남는다.
+        columns = [row[1] for row in self._conn.execute('PRAGMA table_info(events)')]
+        if 'camera' not in columns:
+            self._conn.execute('ALTER TABLE events ADD COLUMN camera TEXT')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_events_camera ON events(camera, ts)')
+        self._migrate_unique_index()
+        self._conn.commit()
+        self.version = 0
+
+    def _migrate_unique_index(self):
+        """
+        같은 기록을 막는 인덱스에 카메라를 넣는다. 여러 카메라가 같은 시각에 같은 행동을 기록해도 각각 남는다.
+        SQLite 인덱스에서 NULL은 서로 다른 값이므로 파일, 카메라가 없는 기록은 빈 문자열로 비교한다.
+        카메라가 없던 이전 저장소는 중복 기록을 지운 뒤 인덱스를 다시 만든다.
+        """
+        row = self._conn.execute("SELECT sql FROM sqlite_master WHERE type = 'index' AND name = 'idx_events_unique'").fetchone()
+        if row is not None and 'camera' in row[0]:
+            return
+        self._conn.execute('DROP INDEX IF EXISTS idx_events_unique')
+        self._conn.execute('''
+            DELETE FROM events WHERE id NOT IN (
+                SELECT MIN(id) FROM events GROUP BY ts, behavior, IFNULL(file, ''), IFNULL(camera, '')
+            )
+        ''')
+        self._conn.execute(
+            "CREATE UNIQUE INDEX idx_events_unique ON events(ts, behavior, IFNULL(file, ''), IFNULL(camera, ''))"
+        )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def append(self, timestamp: datetime, behavior, file=None, camera=None):
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR IGNORE INTO events (ts, day, date, time, behavior, file, camera) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                _to_row(timestamp, behavior, file, camera),
+            )
+            self._conn.commit()
+            self.version += 1
+
+    def _select(self, where='', params=(), limit=None, newest_first=True):
+        sql = 'SELECT date, time, behavior, file FROM events'
+        if where:
+            sql += f' WHERE {where}'
+        sql += f' ORDER BY ts {"DESC" if newest_first else "ASC"}'
+        if limit is not None:
+            sql += f' LIMIT {int(limit)}'
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def _filters(self, behaviors=None, cameras=None):
+        where, params = [], []
+        if behaviors:
+            where.append(_in('behavior', behaviors))
+            params.extend(behaviors)
+        if cameras:
+            where.append(_in('camera', cameras))
+            params.extend(cameras)
+        return where, params
+
+    def query(self, start: datetime | None = None, end: datetime | None = None, behaviors=None,
+              limit=None, newest_first=True, cameras=None) -> pd.DataFrame:
+        """
+        start <= 시각 < end 이고 행동이 behaviors 중 하나, 카메라가 cameras 중 하나인 기록을 반환한다.
+        조건이 None이면 제한하지 않는다.
+        """
+        where, params = self._filters(behaviors, cameras)
+        if start is not None:
+            where.append('ts >= ?')
+            params.append(start.isoformat(sep=' ', timespec='microseconds'))
+        if end is not None:
+            where.append('ts < ?')
+            params.append(end.isoformat(sep=' ', timespec='microseconds'))
+        return _to_dataframe(self._select(' AND '.join(where), params, limit, newest_first))
+
+    def days(self, behaviors=None, cameras=None) -> list[str]:
+        """기록이 있는 날짜('YYYY-MM-DD')를 최신 순으로 반환한다."""
+        sql = 'SELECT DISTINCT day FROM events'
+        where, params = self._filters(behaviors, cameras)
+        if where:
+            sql += f' WHERE {" AND ".join(where)}'
+        with self._lock:
+            return [row[0] for row in self._conn.execute(sql + ' ORDER BY day DESC', params)]
+
+    def day(self, day, behaviors=None, cameras=None) -> pd.DataFrame:
+        """하루('YYYY-MM-DD')의 기록을 반환한다."""
+        where, params = self._filters(behaviors, cameras)
+        return _to_dataframe(self._select(' AND '.join(['day = ?'] + where), [day] + params))
+
+    def latest(self, limit=10, cameras=None) -> pd.DataFrame:
+        where, params = self._filters(cameras=cameras)
+        return _to_dataframe(self._select(' AND '.join(where), params, limit=limit))
+
+    def timeline(self, start: datetime | None = None, end: datetime | None = None, cameras=None) -> pd.DataFrame:
+        """
+        분석용으로 기록을 시각 순서의 열 형식으로 한 번에 읽는다.
+
+        Returns:
+            pd.DataFrame: ts(datetime64), behavior, camera, file 열
+        """
+        where, params = self._filters(cameras=cameras)
+        if start is not None:
+            where.append('ts >= ?')
+            params.append(start.isoformat(sep=' ', timespec='microseconds'))
+        if end is not None:
+            where.append('ts < ?')
+            params.append(end.isoformat(sep=' ', timespec='microseconds'))
+        sql = 'SELECT ts, behavior, camera, file FROM events'
+        if where:
+            sql += f' WHERE {" AND ".join(where)}'
+        with self._lock:
+            rows = self._conn.execute(sql + ' ORDER BY ts', params).fetchall()
+        df = pd.DataFrame(rows, columns=['ts', 'behavior', 'camera', 'file'])
+        df['ts'] = pd.to_datetime(df['ts'], format='ISO8601')
+        return df
+
+    def events(self, after_id=0, day=None, camera=None):
+        """
+        id가 after_id보다 큰 기록을 id 순서로 반환한다. 증분 집계처럼 새 기록만 읽을 때 사용한다.
+
+        Returns:
+            list: (id, 시각 datetime, 행동) 목록
+        """
+        sql, params = 'SELECT id, ts, behavior FROM events WHERE id > ?', [after_id]
+        if day is not None:
+            sql += ' AND day = ?'
+            params.append(day)
+        if camera is not None:
+            sql += ' AND camera = ?'
+            params.append(camera)
+        with self._lock:
+            rows = self._conn.execute(sql + ' ORDER BY id', params).fetchall()
+        return [(id, datetime.fromisoformat(ts), behavior) for id, ts, behavior in rows]
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM events').fetchone()[0]
+
+    def claim_unassigned(self, camera) -> int:
+        """
+        카메라가 지정되지 않은 기록(카메라 열이 생기기 전의 기록, CSV에서 가져온 기록)을 camera의 기록으로 만든다.
+
+        Returns:
+            int: 바뀐 기록 수
+        """
+        with self._lock:
+            changed = self._conn.execute('UPDATE events SET camera = ? WHERE camera IS NULL', (camera,)).rowcount
+            self._conn.commit()
+        if changed:
+            self.version += 1
+        return changed
+
+    def migrate_csv(self, log_dir='logs') -> int:
+        """
+        기존 일별 CSV(logs/*.csv)를 가져온다. 이미 가져온 파일은 수정되지 않았다면 건너뛰고,
+        같은 기록은 중복으로 들어가지 않는다.
+
+        Returns:
+            int: 새로 추가된 기록 수
+        """
+        if not os.path.isdir(log_dir):
+            return 0
+        added = 0
+        for file_name in sorted(os.listdir(log_dir)):
+            if not file_name.endswith('.csv'):
+                continue
+            path = os.path.join(log_dir, file_name)
+            mtime = os.path.getmtime(path)
+            with self._lock:
+                row = self._conn.execute('SELECT mtime FROM migrated_files WHERE name = ?', (file_name,)).fetchone()
+            if row is not None and row[0] >= mtime:
+                continue
+
+            df = pd.read_csv(path, dtype=str).dropna(subset=['날짜', '시간', '행동'])
+            timestamps = pd.to_datetime(df['날짜'] + ' ' + df['시간'], format=f'{DATE_FORMAT} {TIME_FORMAT}')
+            files = df['파일'] if '파일' in df else [None] * len(df)
+            rows = [
+                _to_row(ts.to_pydatetime(), behavior, None if pd.isna(file) else file)
+                for ts, behavior, file in zip(timestamps, df['행동'], files)
+            ]
+            with self._lock:
+                before = self._conn.total_changes
+                # CSV 기록에는 카메라가 없으므로, 이미 카메라가 지정된 같은 기록이 있어도 다시 넣지 않는다.
+                self._conn.executemany(
+                    '''
+                    INSERT OR IGNORE INTO events (ts, day, date, time, behavior, file, camera)
+                    SELECT ?1, ?2, ?3, ?4, ?5, ?6, ?7
+                    WHERE NOT EXISTS (SELECT 1 FROM events WHERE ts = ?1 AND behavior = ?5 AND file IS ?6)
+                    ''',
+                    rows,
+                )
+                self._conn.execute('INSERT OR REPLACE INTO migrated_files (name, mtime) VALUES (?, ?)', (file_name, mtime))
+                self._conn.commit()
+                added += self._conn.total_changes - before - 1
+        if added:
+            self.version += 1
+        return added
+
+
+if __name__ == '__main__':
+    # python -m src.log_store [logs 폴더] : 기존 CSV 기록을 SQLite로 옮긴다.
+    log_dir = sys.argv[1] if len(sys.argv) > 1 else 'logs'
+    store = LogStore(os.path.join(log_dir, 'logs.sqlite3'))
+    print(f'{store.migrate_csv(log_dir)}개 기록을 가져왔습니다. (전체 {store.count()}개)')
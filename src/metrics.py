@@ -0,0 +1,261 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+PREFIX = 'rogun_'
+# 초 단위 구간. 1ms 이하의 단계(주석, 로그)부터 수 초 걸리는 클립 인코딩까지 담는다.
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+
+def _key(labels):
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _format_labels(key):
+    if not key:
+        return ''
+    escaped = (value.replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n') for _, value in key)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(key, escaped)) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """늘어나기만 하는 값 (처리한 프레임 수, 저장한 바이트 등)."""
+
+    kind = 'counter'
+
+    def __init__(self, name, help=''):
+        self.name = name
+        self.help = help
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = _key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(_key(labels), 0)
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._values)
+
+    def samples(self, series):
+        for key, value in series.items():
+            yield self.name, key, value
+
+
+class Gauge(Counter):
+    """올라가고 내려가는 현재 값 (큐 깊이 등). track()으로 읽을 때마다 값을 가져오는 함수를 등록할 수 있다."""
+
+    kind = 'gauge'
+
+    def __init__(self, name, help=''):
+        super().__init__(name, help)
+        self._callbacks = {}
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[_key(labels)] = value
+
+    def track(self, callback, **labels):
+        with self._lock:
+            self._callbacks[_key(labels)] = callback
+
+    def snapshot(self):
+        with self._lock:
+            values = dict(self._values)
+            callbacks = dict(self._callbacks)
+        for key, callback in callbacks.items():
+            try:
+                values[key] = callback()
+            except Exception:
+                continue
+        return values
+
+
+class Histogram:
+    """관측값(소요 시간 등)의 분포. 구간별 누적 개수와 합계를 저장한다."""
+
+    kind = 'histogram'
+
+    def __init__(self, name, help='', buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(buckets)
+        self._values = {}  # labels -> [구간별 개수, 합계, 개수]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = _key(labels)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][bisect.bisect_left(self.buckets, value)] += 1
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """with 블록의 소요 시간(초)을 기록한다."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def snapshot(self):
+        with self._lock:
+            return {key: [list(counts), total, count] for key, (counts, total, count) in self._values.items()}
+
+    def samples(self, series):
+        for key, (counts, total, count) in series.items():
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float('inf'),), counts):
+                cumulative += n
+                yield f'{self.name}_bucket', key + (('le', _format_value(float(bound))),), cumulative
+            yield f'{self.name}_sum', key, total
+            yield f'{self.name}_count', key, count
+
+    def quantile(self, q, counts, count):
+        """구간 안에서 선형 보간해 q 분위수를 추정한다 (Prometheus histogram_quantile과 같은 방식)."""
+        if not count:
+            return None
+        rank = q * count
+        cumulative = 0
+        for i, n in enumerate(counts):
+            if cumulative + n >= rank and n:
+                if i == len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[i - 1] if i else 0.0
+                return lower + (self.buckets[i] - lower) * (rank - cumulative) / n
+            cumulative += n
+        return self.buckets[-1]
+
+
+class MetricsRegistry:
+    """
+    파이프라인 전체의 계측 값을 모으는 저장소. 이름으로 지표를 만들거나 가져오고,
+    Prometheus 텍스트 형식(render)이나 설정 탭의 표(report)로 내보낸다.
+    추론 작업자 프로세스의 값은 merge()로 받아 process 레이블을 붙여 함께 내보낸다.
+    """
+
+    def __init__(self):
+        self._metrics = {}
+        self._remote = {}  # 프로세스 이름 -> snapshot()
+        self._lock = threading.Lock()
+
+    def _get(self, cls, name, help, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(PREFIX + name, help, **kwargs)
+            return metric
+
+    def counter(self, name, help='') -> Counter:
+        return self._get(Counter, name, help)
+
+    def gauge(self, name, help='') -> Gauge:
+        return self._get(Gauge, name, help)
+
+    def histogram(self, name, help='', buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._get(Histogram, name, help, buckets=buckets)
+
+    def snapshot(self):
+        """다른 프로세스로 보낼 수 있는(pickle 가능한) 현재 값."""
+        with self._lock:
+            metrics = dict(self._metrics)
+        return {name: (metric.kind, metric.help, metric.snapshot()) for name, metric in metrics.items()}
+
+    def merge(self, process, snapshot):
+        """다른 프로세스의 snapshot()을 저장한다. 같은 프로세스 이름의 이전 값은 대체된다."""
+        with self._lock:
+            self._remote[process] = snapshot
+
+    def forget(self, process):
+        """merge()로 받은 프로세스의 값을 지운다 (작업자를 멈출 때)."""
+        with self._lock:
+            self._remote.pop(process, None)
+
+    def series(self, name):
+        """
+        name 지표와 모든 프로세스의 값을 함께 반환한다. 다른 프로세스의 값에는 process 레이블이 붙는다.
+
+        Returns:
+            tuple: (지표 또는 None, {레이블: 값})
+        """
+        for metric_name, metric, sources in self._collect():
+            if metric_name == name:
+                return metric, {tuple(sorted(key + extra)): value for extra, series in sources for key, value in series.items()}
+        return None, {}
+
+    def _collect(self):
+        """(이름, 지표, [(추가 레이블, 값)])을 이름 순서로 반환한다."""
+        with self._lock:
+            metrics = dict(self._metrics)
+            remote = dict(self._remote)
+        collected = {}
+        for name, metric in metrics.items():
+            collected[name] = (metric, [((), metric.snapshot())])
+        for process, snapshot in remote.items():
+            for name, (kind, help, series) in snapshot.items():
+                if name not in collected:
+                    cls = {'counter': Counter, 'gauge': Gauge, 'histogram': Histogram}[kind]
+                    collected[name] = (cls(PREFIX + name, help), [])
+                collected[name][1].append(((('process', process),), series))
+        return [(name, *collected[name]) for name in sorted(collected)]
+
+    def render(self):
+        """Prometheus 텍스트 노출 형식(0.0.4)으로 모든 지표를 반환한다."""
+        lines = []
+        for _, metric, sources in self._collect():
+            if metric.help:
+                lines.append(f'# HELP {metric.name} {metric.help}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            for extra, series in sources:
+                series = {tuple(sorted(key + extra)): value for key, value in series.items()}
+                for name, key, value in metric.samples(series):
+                    lines.append(f'{name}{_format_labels(key)} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+    def report(self):
+        """
+        설정 탭에 표시할 요약.
+
+        Returns:
+            dict: 'histograms'(지표, 레이블, 횟수, 평균/p50/p90/p99 ms)와 'values'(카운터와 게이지) 목록
+        """
+        histograms, values = [], []
+        for name, metric, sources in self._collect():
+            for extra, series in sources:
+                for key, value in sorted(series.items()):
+                    labels = dict(key + extra)
+                    if metric.kind == 'histogram':
+                        counts, total, count = value
+                        row = {'metric': name, 'labels': labels, 'count': count, 'mean_ms': total / count * 1000 if count else None}
+                        for q in (50, 90, 99):
+                            seconds = metric.quantile(q / 100, counts, count)
+                            row[f'p{q}_ms'] = seconds * 1000 if seconds is not None else None
+                        histograms.append(row)
+                    else:
+                        values.append({'metric': name, 'kind': metric.kind, 'labels': labels, 'value': value})
+        return {'histograms': histograms, 'values': values}
+
+
+metrics = MetricsRegistry()
+
+# 파이프라인 단계별 소요 시간. stage 레이블로 구분한다.
+STAGE_SECONDS = metrics.histogram('stage_seconds', '파이프라인 단계별 소요 시간(초)')
+# 대기열별 쌓인 작업 수. queue 레이블로 구분한다.
+QUEUE_DEPTH = metrics.gauge('queue_depth', '대기열에 쌓인 작업 수')
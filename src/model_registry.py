@@ -0,0 +1,62 @@
+import threading
+import time
+
+
+class ModelRegistry:
+    """
+    모델을 처음 사용할 때 불러오는 지연 로딩 레지스트리.
+    모듈을 import해도 모델을 읽지 않으며, warmup()으로 첫 추론의 초기화 비용을 미리 치를 수 있다.
+    """
+
+    def __init__(self):
+        self._loaders = {}
+        self._warmups = {}
+        self._models = {}
+        self._stats = {}
+        self._lock = threading.RLock()
+
+    def register(self, name, loader, warmup=None):
+        with self._lock:
+            self._loaders[name] = loader
+            self._warmups[name] = warmup
+            self._models.pop(name, None)
+            self._stats[name] = {'loaded': False, 'load_ms': None, 'warmed_up': False, 'warmup_ms': None}
+
+    def get(self, name):
+        model = self._models.get(name)
+        if model is not None:
+            return model
+        with self._lock:
+            if name not in self._models:
+                start = time.perf_counter()
+                self._models[name] = self._loaders[name]()
+                self._stats[name].update(loaded=True, load_ms=(time.perf_counter() - start) * 1000)
+                print(f'🧠 모델 로드: {name} ({self._stats[name]["load_ms"]:.0f}ms)')
+            return self._models[name]
+
+    def is_loaded(self, name):
+        return name in self._models
+
+    def warmup(self, *names):
+        """모델을 불러오고 더미 입력으로 한 번 실행한다. names가 없으면 등록된 모든 모델."""
+        for name in names or list(self._loaders):
+            model = self.get(name)
+            warmup = self._warmups.get(name)
+            if warmup is None or self._stats[name]['warmed_up']:
+                continue
+            start = time.perf_counter()
+            warmup(model)
+            self._stats[name].update(warmed_up=True, warmup_ms=(time.perf_counter() - start) * 1000)
+            print(f'🔥 모델 예열: {name} ({self._stats[name]["warmup_ms"]:.0f}ms)')
+
+    def unload(self, name):
+        with self._lock:
+            self._models.pop(name, None)
+            self._stats[name].update(loaded=False, load_ms=None, warmed_up=False, warmup_ms=None)
+
+    def report(self):
+        """모델별 로드 여부, 로드 시간, 예열 시간(ms)을 반환한다."""
+        return {name: dict(stats) for name, stats in self._stats.items()}
+
+
+registry = ModelRegistry()
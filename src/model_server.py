@@ -0,0 +1,129 @@
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+from src.inference import infer_streams
+from src.metrics import QUEUE_DEPTH, STAGE_SECONDS
+
+
+class InferenceServer:
+    """
+    여러 카메라 파이프라인이 함께 쓰는 추론 작업자.
+    카메라마다 submit()으로 프레임 묶음을 넣으면, 작업자 스레드가 잠시(linger초) 기다렸다가
+    그동안 들어온 요청을 모아 infer_streams로 한 번에 추론한다. 모델은 프로세스에 하나만 올라간다.
+    """
+
+    def __init__(self, max_batch=8, linger=0.05):
+        """
+        Args:
+            max_batch (int): 한 번에 추론할 최대 프레임 수 (카메라 합계)
+            linger (float): 첫 요청 뒤 다른 카메라의 요청을 기다리는 시간(초)
+        """
+        self.max_batch = max_batch
+        self.linger = linger
+        self._queue = queue.Queue()
+        self._stop = threading.Event()
+        self._threads = []
+        # 동시에 배치를 처리하는 작업 슬롯 수. 프로세스 작업자를 쓰는 하위 클래스에서 늘린다.
+        self.concurrency = 1
+        self._stats_lock = threading.Lock()
+        self.batches = 0
+        self.frames = 0
+        self.batch_sizes = deque(maxlen=100)
+        self.last_infer_ms = 0.0
+        QUEUE_DEPTH.track(self._queue.qsize, queue='inference')
+
+    def start(self):
+        for slot in range(self.concurrency):
+            thread = threading.Thread(target=self._run, args=(slot,), daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def submit(self, frames, prev_has_dog, prev_class, magic=-1, tracker=None) -> Future:
+        """
+        한 카메라의 연속된 프레임을 추론 대기열에 넣는다. 인자는 infer_batch와 같다.
+
+        Returns:
+            Future: infer_batch와 같은 결과 목록
+        """
+        future = Future()
+        self._queue.put((future, (frames, prev_has_dog, prev_class, magic, tracker)))
+        return future
+
+    def infer(self, frames, prev_has_dog, prev_class, magic=-1, tracker=None, timeout=None):
+        """submit()하고 결과를 기다린다."""
+        return self.submit(frames, prev_has_dog, prev_class, magic, tracker).result(timeout)
+
+    def stats(self):
+        sizes = list(self.batch_sizes)
+        return {
+            'batches': self.batches,
+            'batched_frames': self.frames,
+            'mean_batch': sum(sizes) / len(sizes) if sizes else 0.0,
+            'queued': self._queue.qsize(),
+            'last_infer_ms': self.last_infer_ms,
+        }
+
+    def _collect(self):
+        try:
+            requests = [self._queue.get(timeout=0.5)]
+        except queue.Empty:
+            return []
+        size = len(requests[0][1][0])
+        deadline = time.monotonic() + self.linger
+        while size < self.max_batch:
+            try:
+                request = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                break
+            requests.append(request)
+            size += len(request[1][0])
+        return requests
+
+    def _infer_streams(self, streams, slot):
+        return infer_streams(streams)
+
+    def _idle(self, slot):
+        pass
+
+    def _run(self, slot=0):
+        while not self._stop.is_set():
+            requests = self._collect()
+            if not requests:
+                self._idle(slot)
+                continue
+            # 같은 추적기(같은 카메라)의 요청이 두 번 들어오면 순서가 섞이지 않도록 다음 배치로 미룬다.
+            batch, deferred, trackers = [], [], set()
+            for future, stream in requests:
+                tracker = stream[4]
+                if tracker is not None and id(tracker) in trackers:
+                    deferred.append((future, stream))
+                    continue
+                if tracker is not None:
+                    trackers.add(id(tracker))
+                batch.append((future, stream))
+            for request in deferred:
+                self._queue.put(request)
+
+            start = time.perf_counter()
+            try:
+                outputs = self._infer_streams([stream for _, stream in batch], slot)
+            except Exception as e:
+                for future, _ in batch:
+                    future.set_exception(e)
+                continue
+            size = sum(len(stream[0]) for _, stream in batch)
+            STAGE_SECONDS.observe(time.perf_counter() - start, stage='infer_batch')
+            with self._stats_lock:
+                self.last_infer_ms = (time.perf_counter() - start) * 1000
+                self.batches += 1
+                self.frames += size
+                self.batch_sizes.append(size)
+            for (future, _), results in zip(batch, outputs):
+                future.set_result(results)
@@ -0,0 +1,69 @@
+import time
+
+import cv2 as cv
+
+
+class MotionGate:
+    """
+    축소한 흑백 프레임의 차이로 장면 변화를 감지해, 변화가 없으면 추론을 건너뛰게 하는 게이트.
+    비교 기준은 마지막으로 추론한 프레임이므로 느린 변화도 누적되어 결국 감지된다.
+    """
+
+    def __init__(self, threshold=0.01, pixel_delta=25, size=(64, 48), force_interval=30.0):
+        """
+        Args:
+            threshold (float): 변화한 픽셀 비율이 이 값 이상이면 추론한다.
+            pixel_delta (int): 픽셀 밝기 차이가 이 값보다 크면 변화한 픽셀로 본다.
+            size (tuple): 비교에 사용할 축소 해상도 (너비, 높이)
+            force_interval (float): 변화가 없어도 이 시간(초)이 지나면 다시 추론한다.
+        """
+        self.threshold = threshold
+        self.pixel_delta = pixel_delta
+        self.size = size
+        self.force_interval = force_interval
+        self._reference = None
+        self._reference_time = 0.0
+        self.checked = 0
+        self.skipped = 0
+        self.forced = 0
+        self.last_score = 0.0
+
+    def _thumbnail(self, image):
+        gray = cv.cvtColor(image, cv.COLOR_BGR2GRAY) if image.ndim == 3 else image
+        small = cv.resize(gray, self.size, interpolation=cv.INTER_AREA)
+        return cv.GaussianBlur(small, (5, 5), 0)
+
+    def check(self, image):
+        """이 프레임을 추론해야 하면 True, 이전 결과를 재사용해도 되면 False."""
+        self.checked += 1
+        thumbnail = self._thumbnail(image)
+        now = time.monotonic()
+        if self._reference is None:
+            return self._accept(thumbnail, now)
+
+        diff = cv.absdiff(thumbnail, self._reference)
+        self.last_score = float((diff > self.pixel_delta).mean())
+        if self.last_score >= self.threshold:
+            return self._accept(thumbnail, now)
+        if now - self._reference_time >= self.force_interval:
+            self.forced += 1
+            return self._accept(thumbnail, now)
+        self.skipped += 1
+        return False
+
+    def _accept(self, thumbnail, now):
+        self._reference = thumbnail
+        self._reference_time = now
+        return True
+
+    def reset(self):
+        self._reference = None
+
+    def stats(self):
+        return {
+            'checked': self.checked,
+            'skipped': self.skipped,
+            'forced': self.forced,
+            'skip_ratio': self.skipped / self.checked if self.checked else 0.0,
+            'last_score': self.last_score,
+        }
@@ -0,0 +1,442 @@
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
+
+from src.frame_buffer import FrameBuffer
+from src.frame_index import FrameIndex
+from src.frame_writer import FrameWriter
+from src.gif import make_clip
+from src.img_capture import CaptureThread, frame_name
+from src.inference import (
+    infer_batch, configure_backends, check_backend_parity, draw_bounding_box, load_sample_frames, DogTracker,
+)
+from src.analysis import ActivityTracker
+from src.metrics import QUEUE_DEPTH, STAGE_SECONDS, metrics
+from src.model_registry import registry
+from src.motion import MotionGate
+from src.preview import LivePreview
+from src.retention import RetentionJanitor, RetentionPolicy
+from src.scheduler import AdaptiveScheduler
+from src.segments import SegmentIndex
+
+NODOG = '강아지 없음'
+
+BEHAVIOR_EVENTS = metrics.counter('behavior_events_total', '기록한 행동 이벤트 수')
+SKIPPED_FRAMES = metrics.counter('skipped_frames_total', '추론이 밀려 추론하지 못하고 지나간 프레임 수')
+DROPPED_FRAMES = metrics.counter('dropped_frames_total', '추론이 보기 전에 링 버퍼에서 밀려난 프레임 수')
+# segment_gap이 없으면 관측이 가장 긴 추론(캡쳐) 주기의 이 배수보다 오래 끊길 때 행동 구간을 끊는다.
+SEGMENT_GAP_INTERVALS = 5
+
+
+class Pipeline:
+    """
+    카메라 하나의 캡쳐, 추론, 행동 기록, GIF 생성을 프로세스 전체에서 하나만 돌리는 비전 파이프라인.
+    브라우저 세션은 이 객체의 버퍼와 기록을 읽기만 하므로, 접속자가 늘어도 비용은 그대로다.
+    행동 기록 저장소(log_store), 추론 서버(inference), 미리보기 스트리밍 서버는 CameraSet이 만들어 모든 카메라가 함께 쓴다.
+    """
+
+    def __init__(
+        self, source, log_store, log_dir='logs', frame_dir='frames', bbox_dir='bbox', capture_dir='captures',
+        buffer_size=120, capture_fps=2.0, infer_interval=1.0, infer_batch_size=1,
+        persist_frames=True, max_files=1000, gif_duration=10, warmup_models=True,
+        backends=None, motion_gate=None, tracking=None, preview_width=800, preview_quality=80,
+        clip_format='gif', clip_width=480, clip_workers=2, retention=None,
+        camera=None, inference=None, jpeg_quality=90, writer_workers=2, writer_queue_size=64,
+        scheduler=None, segment_gap=None,
+    ):
+        self.camera = camera
+        self.log_dir = log_dir
+        self.frame_dir = frame_dir
+        self.bbox_dir = bbox_dir
+        self.capture_dir = capture_dir
+        self.infer_interval = infer_interval
+        self.infer_batch_size = infer_batch_size
+        self.persist_frames = persist_frames
+        self.max_files = max_files
+        self.gif_duration = gif_duration
+        self.warmup_models = warmup_models
+        if backends:
+            configure_backends(**backends)
+        # motion_gate: MotionGate 설정 dict. None이면 모든 프레임을 추론한다.
+        self.motion_gate = MotionGate(**motion_gate) if motion_gate is not None else None
+        # tracking: DogTracker 설정 dict. None이면 매 프레임 전체를 탐지한다.
+        self.tracker = DogTracker(**tracking) if tracking is not None else None
+        for directory in (log_dir, frame_dir, bbox_dir, capture_dir):
+            os.makedirs(directory, exist_ok=True)
+
+        self.frame_buffer = FrameBuffer(buffer_size)
+        self.bbox_buffer = FrameBuffer(buffer_size)
+        # 원본과 바운딩 박스 프레임은 작업자 풀에서 한 번씩만 인코딩해 최종 이름으로 저장한다.
+        self.frame_writer = FrameWriter(writer_queue_size, camera, workers=writer_workers, quality=jpeg_quality)
+        # 저장된 프레임 목록은 색인에서 최신 max_files개만 읽는다. 색인이 비어 있으면 폴더를 한 번 훑어 만든다.
+        self.frame_index = FrameIndex(os.path.join(log_dir, f'frames-{camera}.sqlite3' if camera else 'frames.sqlite3'))
+        for kind, directory in (('frame', frame_dir), ('bbox', bbox_dir)):
+            if self.frame_index.count(kind) == 0:
+                self.frame_index.rebuild(kind, directory)
+        self.frames = deque(self.frame_index.recent('frame', max_files), maxlen=max_files)
+        self.bbox_frames = deque(self.frame_index.recent('bbox', max_files), maxlen=max_files)
+        # retention: 폴더별 RetentionPolicy 설정 dict. 없으면 frames/bbox를 max_files개까지만 남긴다.
+        if retention is None:
+            retention = {frame_dir: {'max_files': max_files}, bbox_dir: {'max_files': max_files}}
+        self.janitor = RetentionJanitor(
+            [RetentionPolicy(directory, **policy) for directory, policy in retention.items() if policy is not None],
+            on_delete=self.frame_index.remove,
+        )
+        self.gif_queue = deque()
+        # 클립은 작업자 수가 정해진 풀에서 만든다. 대기 중인 작업이 너무 많으면 새 클립을 건너뛴다.
+        self.clip_format = clip_format
+        self.clip_width = clip_width
+        self.clip_workers = clip_workers
+        self._clip_pool = ThreadPoolExecutor(max_workers=clip_workers, thread_name_prefix='clip')
+        self._clips_pending = 0
+        self._clip_futures = set()
+        self._clip_lock = threading.Lock()
+        self.clip_stats = deque(maxlen=20)
+        self.preview = LivePreview(self.frame_buffer, preview_width, preview_quality)
+        self.bbox_preview = LivePreview(self.bbox_buffer, preview_width, preview_quality)
+        self.capture = CaptureThread(
+            source, fps=capture_fps, buffer=self.frame_buffer, on_frame=self._persist_frame, camera=camera,
+        )
+        self.labels = {'camera': camera} if camera else {}
+        # 추론이 따라가지 못해 보기 전에 링 버퍼에서 밀려난 프레임 수
+        self.dropped_frames = 0
+        QUEUE_DEPTH.track(lambda: len(self.gif_queue), queue='clip_wait', **self.labels)
+        QUEUE_DEPTH.track(lambda: self._clips_pending, queue='clip', **self.labels)
+        # scheduler: AdaptiveScheduler 설정 dict. None이면 capture_fps와 infer_interval을 그대로 쓴다.
+        self.scheduler = None
+        if scheduler is not None:
+            self.scheduler = AdaptiveScheduler(capture_fps, infer_interval, **scheduler)
+            self.capture.fps = self.scheduler.capture_fps
+            metrics.gauge('capture_fps_target', '스케줄러가 정한 캡쳐 FPS').track(
+                lambda: self.scheduler.capture_fps, **self.labels
+            )
+            metrics.gauge('infer_interval_seconds', '스케줄러가 정한 추론 주기(초)').track(
+                lambda: self.scheduler.infer_interval, **self.labels
+            )
+
+        # inference: 여러 카메라가 함께 쓰는 InferenceServer. None이면 이 파이프라인에서 직접 추론한다.
+        self.inference = inference
+        self._log_lock = threading.Lock()
+        self.log_store = log_store
+        self.activity = ActivityTracker(self.log_store, camera)
+        # 행동 구간 색인. 지난 행동 기록과 bbox 프레임 색인으로 만들고, 이후로는 추론 결과와 기록으로 늘려 간다.
+        # 움직임 게이트가 건너뛴 프레임도 직전 결과로 관측되므로, 관측 간격은 추론 주기와 캡쳐 주기 중 긴 쪽을 넘지 않는다.
+        if segment_gap is None:
+            if self.scheduler is not None:
+                slowest = max(self.scheduler.max_infer_interval, 1 / self.scheduler.min_capture_fps)
+            else:
+                slowest = max(infer_interval, 1 / capture_fps)
+            segment_gap = SEGMENT_GAP_INTERVALS * slowest
+        self.segment_gap = segment_gap
+        self.segments = SegmentIndex(segment_gap)
+        history = self.log_store.timeline(cameras=[camera] if camera else None)
+        self.segments.load(
+            [(ts.to_pydatetime(), behavior) for ts, behavior in zip(history['ts'], history['behavior'])]
+            + [(timestamp, behavior) for _, timestamp, _, behavior in self.bbox_frames],
+            [(ts.to_pydatetime(), file) for ts, file in zip(history['ts'], history['file']) if file],
+        )
+        self.events = deque(maxlen=100)
+        self._event_seq = 0
+        self.behavior = NODOG
+
+        self._stop = threading.Event()
+        self._threads = []
+
+    def start(self):
+        if self.warmup_models:
+            # 첫 프레임이 모델 로드와 예열 비용을 치르지 않도록 미리 불러온다.
+            threading.Thread(target=registry.warmup, daemon=True).start()
+        self.capture.start()
+        self.janitor.start()
+        for interval, job in (
+            (self.scheduler.next_delay if self.scheduler is not None else self.infer_interval, self._infer),
+            (1.0, self._dispatch_gifs),
+        ):
+            thread = threading.Thread(target=self._every, args=(interval, job), daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self.capture.stop()
+        self.janitor.stop()
+        self._clip_pool.shutdown(wait=True)
+        self.frame_writer.close()
+        self.frame_index.flush()
+
+    def feed(self, image, timestamp=None):
+        """
+        캡쳐 스레드 대신 프레임을 직접 넣는다. 버퍼에 넣고 원본 프레임 저장을 제출한다.
+        start() 없이 feed(), step(), drain()으로 파이프라인을 그대로 돌릴 수 있다 (벤치마크).
+
+        Returns:
+            Frame: 버퍼에 들어간 프레임
+        """
+        return self.capture.feed(image, timestamp)
+
+    def step(self):
+        """추론 주기를 기다리지 않고, 아직 추론하지 않은 프레임의 추론과 때가 된 클립 작업 넘기기를 한 번 실행한다."""
+        self._infer()
+        self._dispatch_gifs()
+
+    def drain(self):
+        """대기 중인 클립을 지금까지의 프레임으로 모두 만들고, 클립과 프레임 저장이 끝날 때까지 기다린다."""
+        self._dispatch_gifs(force=True)
+        with self._clip_lock:
+            futures = list(self._clip_futures)
+        wait(futures)
+        self.frame_writer.join()
+
+    def request_clip(self, timestamp, name=None):
+        """
+        timestamp 앞뒤 gif_duration / 2초의 bbox 프레임으로 클립을 만들도록 대기열에 넣는다.
+        클립은 그 구간이 지난 뒤 만들어진다.
+
+        Returns:
+            str: 만들어질 클립 경로
+        """
+        name = name or f'{frame_name(timestamp)}.{self.clip_format}'
+        self.gif_queue.append((name, timestamp))
+        return os.path.join(self.capture_dir, name)
+
+    def _every(self, interval, job):
+        """interval초마다 job을 실행한다. interval이 함수면 매번 호출해 기다릴 시간을 정한다."""
+        while not self._stop.wait(interval() if callable(interval) else interval):
+            try:
+                job()
+            except Exception as e:
+                print(f'❌ {job.__name__} 실패: {e}')
+
+    """
+    세션이 구독하는 출력
+    """
+
+    def latest_frame(self):
+        return self.frame_buffer.latest()
+
+    def latest_bbox_frame(self):
+        return self.bbox_buffer.latest()
+
+    @property
+    def log_version(self):
+        return self.log_store.version
+
+    def events_since(self, seq):
+        """번호가 seq보다 큰 행동 이벤트를 (번호, 시각, 행동, 알림 여부) 형태로 반환한다."""
+        return [event for event in list(self.events) if event[0] > seq]
+
+    def model_report(self):
+        return registry.report()
+
+    def capture_stats(self):
+        return {**self.capture.stats(), 'dropped': self.dropped_frames}
+
+    def inference_stats(self):
+        stats = {'processed': self.bbox_buffer.version}
+        if self.motion_gate is not None:
+            stats.update(self.motion_gate.stats())
+        if self.tracker is not None:
+            stats.update(self.tracker.stats())
+        if self.scheduler is not None:
+            stats.update(self.scheduler.stats())
+        return stats
+
+    def backend_parity(self):
+        """현재 백엔드를 eager PyTorch 모델과 비교한다. 최근 저장된 원본 프레임들과 최신 프레임을 입력으로 쓴다."""
+        frames = load_sample_frames([path for path, _ in list(self.frames)[-256:]], limit=31)
+        frame = self.frame_buffer.latest()
+        if frame is not None:
+            frames.append(frame.image[..., ::-1].copy())
+        return check_backend_parity(frames)
+
+    @property
+    def event_seq(self):
+        return self._event_seq
+
+    """
+    기록과 캡쳐
+    """
+
+    def add_log(self, timestamp, behavior, image_path, notify=True):
+        with STAGE_SECONDS.time(stage='log', **self.labels):
+            self.log_store.append(timestamp, behavior, image_path, self.camera)
+        # 캡쳐(notify=False)는 최신 원본 프레임 시각이라 추론 결과보다 앞설 수 있으므로 구간에 파일만 붙인다.
+        if notify:
+            self.segments.observe(timestamp, behavior)
+        if image_path:
+            self.segments.attach(timestamp, image_path)
+        BEHAVIOR_EVENTS.inc(behavior=behavior, **self.labels)
+        with self._log_lock:
+            self._event_seq += 1
+            self.events.append((self._event_seq, timestamp, behavior, notify))
+        self.behavior = behavior
+
+    def capture_latest(self):
+        """최신 프레임을 captures 폴더에 저장하고 기록에 남긴다. 프레임이 없으면 None."""
+        frame = self.frame_buffer.latest()
+        if frame is None:
+            return None
+        capture_path = os.path.join(self.capture_dir, f'{frame_name(frame.timestamp)}.jpg')
+        self.frame_writer.submit(capture_path, frame.image)
+        self.add_log(frame.timestamp, self.behavior, capture_path, notify=False)
+        return capture_path
+
+    """
+    백그라운드 작업
+    """
+
+    def _persist_frame(self, frame):
+        if self.persist_frames:
+            frame_path = os.path.join(self.frame_dir, f'{frame_name(frame.timestamp)}.jpg')
+            self.frame_writer.submit(
+                frame_path, frame.image, on_written=lambda path: self.frame_index.add('frame', path, frame.timestamp)
+            )
+            self.frames.append((frame_path, frame.timestamp))
+
+    def _infer(self):
+        """
+        아직 추론하지 않은 프레임 중 최신 infer_batch_size개를 한 번에 추론한다.
+        infer_batch_size가 1이면 최신 프레임 하나만 추론하고 나머지는 건너뛴다.
+        스케줄러가 있으면 행동이 바뀐 직후에는 쌓인 프레임을 더 많이(오래된 것부터) 추론하고,
+        걸린 시간을 알려 다음 주기와 캡쳐 FPS를 정하게 한다.
+        """
+        bbox_frames = self.bbox_frames
+
+        last = self.bbox_buffer.latest()
+        last_seq = last.meta['source_seq'] if last is not None else 0
+        pending = self.frame_buffer.since(last_seq)
+        # 마지막으로 추론한 프레임과 버퍼에 남은 가장 오래된 프레임 사이의 번호는 추론하기 전에 밀려난 프레임이다.
+        dropped = pending[0].seq - last_seq - 1 if pending else 0
+        if dropped > 0:
+            self.dropped_frames += dropped
+            DROPPED_FRAMES.inc(dropped, **self.labels)
+        batch_size = self.scheduler.batch_size(self.infer_batch_size) if self.scheduler is not None else self.infer_batch_size
+        if self.scheduler is not None and self.scheduler.boosting:
+            # 행동 변화 직후의 프레임을 놓치지 않도록 오래된 프레임부터 추론한다. 나머지는 다음 주기에 이어서 본다.
+            frames, skipped = pending[:batch_size], 0
+        else:
+            frames = pending[-batch_size:]
+            skipped = len(pending) - len(frames)
+        if not frames:
+            return
+        if skipped:
+            SKIPPED_FRAMES.inc(skipped, **self.labels)
+
+        if last is not None:
+            has_dog, behavior = last.meta['has_dog'], last.meta['behavior']
+        elif bbox_frames:
+            _, _, has_dog, behavior = bbox_frames[-1]
+        else:
+            has_dog = False
+            behavior = NODOG
+
+        # 장면 변화가 없는 프레임은 추론하지 않고 직전 결과를 재사용한다.
+        with STAGE_SECONDS.time(stage='motion_gate', **self.labels):
+            gated = [self.motion_gate is None or self.motion_gate.check(frame.image) for frame in frames]
+        to_infer = [frame.image for frame, run in zip(frames, gated) if run]
+        infer = self.inference.infer if self.inference is not None else infer_batch
+        start = time.perf_counter()
+        results = iter(infer(to_infer, has_dog, behavior, magic=len(bbox_frames), tracker=self.tracker) if to_infer else [])
+        if self.scheduler is not None:
+            self.scheduler.observe(len(to_infer), time.perf_counter() - start, skipped)
+            self.capture.fps = self.scheduler.capture_fps
+
+        previous = (has_dog, behavior, last.meta.get('bbox') if last is not None else None)
+        for frame, run in zip(frames, gated):
+            result = next(results) if run else self._reuse_result(frame, *previous)
+            previous = (result['has_dog'], result['current_class'], result['bbox'])
+            self._handle_result(frame, result)
+
+    def _reuse_result(self, frame, has_dog, behavior, bbox):
+        bbox_image = frame.image
+        if bbox is not None:
+            bbox_image = draw_bounding_box(frame.image.copy(), *bbox, behavior)
+        return {"bbox_image": bbox_image, "bbox": bbox, "has_dog": has_dog, "current_class": behavior, "make_gif": False}
+
+    def _handle_result(self, frame, result):
+        bbox_frames = self.bbox_frames
+        timestamp = frame.timestamp
+        has_dog = result['has_dog']
+        behavior = result['current_class']
+        # 추론이 행동 변화(강아지 등장, 사라짐, 행동 바뀜)로 판단한 프레임에서 기록을 남기고 클립을 만든다.
+        # 움직임 게이트가 건너뛴 프레임은 직전 결과를 재사용하므로 변화로 보지 않는다.
+        need_gif = result['make_gif']
+
+        self.bbox_buffer.append(
+            result['bbox_image'], timestamp, source_seq=frame.seq, has_dog=has_dog, behavior=behavior, bbox=result['bbox']
+        )
+        # 촬영부터 결과가 나오기까지 걸린 시간 (캡쳐 큐와 추론 대기 포함)
+        STAGE_SECONDS.observe((datetime.now() - timestamp).total_seconds(), stage='end_to_end', **self.labels)
+        bbox_image = os.path.join(self.bbox_dir, f'{frame_name(timestamp)} {has_dog} {behavior}.jpg')
+        self.frame_writer.submit(
+            bbox_image, result['bbox_image'],
+            on_written=lambda path: self.frame_index.add('bbox', path, timestamp, has_dog, behavior),
+        )
+        bbox_frames.append((bbox_image, timestamp, has_dog, behavior))
+        self.segments.observe(timestamp, behavior)
+        if self.scheduler is not None and behavior != self.behavior:
+            self.scheduler.behavior_changed()
+
+        if need_gif:
+            self.add_log(timestamp, behavior, self.request_clip(timestamp))
+
+        self.behavior = behavior
+
+    def _dispatch_gifs(self, force=False):
+        """
+        행동이 기록된 시각 앞뒤 gif_duration / 2초의 프레임을 버퍼에서 꺼내 클립 작업으로 넘긴다.
+        force면 구간이 아직 지나지 않은 클립도 지금까지의 프레임으로 넘긴다.
+        """
+        gif_queue = self.gif_queue
+        half = timedelta(seconds=self.gif_duration / 2)
+        while gif_queue:
+            gif_name, timestamp = gif_queue[0]
+            if not force and datetime.now() - timestamp <= half:
+                break
+            gif_queue.popleft()
+            if self._clips_pending >= 2 * self.clip_workers:
+                print(f'⚠️ 클립 작업이 밀려 건너뜁니다: {gif_name}')
+                continue
+            frames = self.bbox_buffer.window(timestamp - half, timestamp + half)
+            clip_path = os.path.join(self.capture_dir, gif_name)
+            # 인코딩 중인 클립 파일은 정리 대상에서 제외한다.
+            self.janitor.protect(clip_path)
+            with self._clip_lock:
+                self._clips_pending += 1
+                future = self._clip_pool.submit(
+                    self._make_clip, [frame.image for frame in frames], [frame.timestamp for frame in frames], clip_path,
+                )
+                self._clip_futures.add(future)
+            future.add_done_callback(self._clip_done)
+
+    def _clip_done(self, future):
+        with self._clip_lock:
+            self._clip_futures.discard(future)
+
+    def _make_clip(self, images, timestamps, path):
+        try:
+            stats = make_clip(images, timestamps, path, width=self.clip_width, fmt=self.clip_format)
+            if stats is not None:
+                self.clip_stats.append(stats)
+                print(f'🎞️ 클립 생성: {path} ({stats["frames"]}프레임, {stats["encode_ms"]:.0f}ms, {stats["bytes"] / 1024:.0f}KB)')
+        except Exception as e:
+            print(f'❌ 클립 생성 실패: {path} ({e})')
+        finally:
+            self.janitor.release(path)
+            with self._clip_lock:
+                self._clips_pending -= 1
+
+    def clip_report(self):
+        """최근 클립들의 인코딩 시간과 크기, 대기 중인 작업 수를 반환한다."""
+        stats = list(self.clip_stats)
+        return {
+            'pending': self._clips_pending,
+            'clips': len(stats),
+            'mean_encode_ms': sum(s['encode_ms'] for s in stats) / len(stats) if stats else None,
+            'mean_bytes': sum(s['bytes'] for s in stats) / len(stats) if stats else None,
+            'recent': stats[-5:],
+        }
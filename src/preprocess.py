@@ -0,0 +1,165 @@
+"""
+ResNet 입력 전처리. torchvision transform(Resize → ToTensor → Normalize)과 같은 결과를
+PIL 변환 없이 OpenCV 리사이즈와 한 번의 in-place 정규화로 만든다.
+
+    python -m src.preprocess [이미지 경로]
+
+로 기존 transform과의 차이(parity)와 크롭 수별 처리 시간을 비교할 수 있다.
+"""
+import sys
+import threading
+import time
+
+import cv2
+import numpy as np
+import torch
+
+MEAN = (0.485, 0.456, 0.406)
+STD = (0.229, 0.224, 0.225)
+
+
+class Preprocessor:
+    """
+    강아지 크롭(RGB numpy 배열)을 (N, 3, size, size) 정규화 텐서로 만드는 전처리기.
+    리사이즈 결과와 입력 텐서는 스레드마다 미리 할당해 두고 재사용하므로, 프레임마다 중간 이미지나 텐서를 만들지 않는다.
+    반환된 텐서는 같은 스레드에서 다음 호출 때 덮어쓰이므로 모델에 바로 넘겨야 한다.
+    """
+
+    def __init__(self, size=224, mean=MEAN, std=STD, max_batch=8):
+        """
+        Args:
+            size (int): 출력 가로/세로 크기
+            mean, std (tuple[float]): 채널별 정규화 값 (0~1 범위 기준)
+            max_batch (int): 처음에 할당할 크롭 수. 더 많이 들어오면 버퍼를 두 배씩 늘린다.
+        """
+        self.size = size
+        self.max_batch = max_batch
+        # (x / 255 - mean) / std = x * scale - offset
+        std = torch.tensor(std, dtype=torch.float32).view(1, 3, 1, 1)
+        self.scale = 1.0 / (255.0 * std)
+        self.offset = torch.tensor(mean, dtype=torch.float32).view(1, 3, 1, 1) / std
+        self._local = threading.local()
+
+    def _buffers(self, n):
+        local = self._local
+        capacity = getattr(local, 'capacity', 0)
+        if capacity < n:
+            capacity = max(n, capacity * 2, self.max_batch)
+            local.resized = np.empty((capacity, self.size, self.size, 3), dtype=np.uint8)
+            local.tensor = torch.empty((capacity, 3, self.size, self.size), dtype=torch.float32)
+            local.capacity = capacity
+        return local.resized, local.tensor
+
+    def resize(self, crop, out):
+        """크롭을 out(size×size×3 uint8)에 리사이즈한다. 줄일 때는 torchvision의 antialias에 가까운 INTER_AREA를 쓴다."""
+        height, width = crop.shape[:2]
+        shrink = height >= self.size and width >= self.size
+        cv2.resize(crop, (self.size, self.size), dst=out, interpolation=cv2.INTER_AREA if shrink else cv2.INTER_LINEAR)
+
+    def __call__(self, crops_rgb) -> torch.Tensor:
+        """
+        Args:
+            crops_rgb (list[numpy.ndarray]): HxWx3 uint8 RGB 크롭. 원본 프레임의 슬라이스를 그대로 넘겨도 된다.
+
+        Returns:
+            torch.Tensor: (N, 3, size, size) float32 텐서 (미리 할당된 버퍼의 앞부분)
+        """
+        n = len(crops_rgb)
+        resized, tensor = self._buffers(n)
+        for i, crop in enumerate(crops_rgb):
+            self.resize(crop, resized[i])
+        batch = tensor[:n]
+        # NHWC uint8 → NCHW float32 변환과 정규화를 버퍼 안에서 한 번에 처리한다.
+        batch.copy_(torch.from_numpy(resized[:n]).permute(0, 3, 1, 2))
+        batch.mul_(self.scale).sub_(self.offset)
+        return batch
+
+    def one(self, crop_rgb) -> torch.Tensor:
+        """크롭 하나를 (1, 3, size, size) 텐서로 만든다."""
+        return self([crop_rgb])
+
+
+preprocess = Preprocessor()
+
+
+def check_parity(crops_rgb, transform=None, model=None):
+    """
+    preprocess와 torchvision transform의 출력을 비교한다.
+    OpenCV와 PIL의 리사이즈 보간이 조금 달라 값이 완전히 같지는 않으므로, 차이와 분류 결과 일치율을 함께 본다.
+
+    Args:
+        crops_rgb (list[numpy.ndarray]): 비교할 RGB 크롭
+        transform (callable | None): PIL 이미지를 받는 기존 전처리. 없으면 src.inference.transform
+        model (callable | None): 분류기. 있으면 두 입력의 예측 클래스가 같은지도 비교한다.
+
+    Returns:
+        dict: 최대/평균 절대 차이, (model이 있으면) 예측 일치율
+    """
+    from PIL import Image
+    if transform is None:
+        from src.inference import transform
+    expected = torch.stack([transform(Image.fromarray(crop)) for crop in crops_rgb])
+    actual = preprocess(crops_rgb).clone()
+    diff = (expected - actual).abs()
+    report = {'crops': len(crops_rgb), 'max_abs_diff': float(diff.max()), 'mean_abs_diff': float(diff.mean())}
+    if model is not None:
+        with torch.no_grad():
+            agree = model(expected).argmax(dim=1) == model(actual).argmax(dim=1)
+        report['top1_agreement'] = float(agree.float().mean())
+    return report
+
+
+def benchmark(crops_rgb, batch_sizes=(1, 4, 8), repeat=50, transform=None):
+    """
+    기존 transform(크롭마다 PIL 변환 후 torch.stack)과 preprocess의 크롭 하나당 처리 시간(ms)을 비교한다.
+
+    Returns:
+        list[dict]: 배치 크기별 기존/새 처리 시간과 속도 향상 배율
+    """
+    from PIL import Image
+    if transform is None:
+        from src.inference import transform
+
+    def timed(fn, batch):
+        fn(batch)
+        start = time.perf_counter()
+        for _ in range(repeat):
+            fn(batch)
+        return (time.perf_counter() - start) / repeat / len(batch) * 1000
+
+    results = []
+    for size in batch_sizes:
+        batch = [crops_rgb[i % len(crops_rgb)] for i in range(size)]
+        legacy = timed(lambda b: torch.stack([transform(Image.fromarray(crop)) for crop in b]), batch)
+        fast = timed(preprocess, batch)
+        results.append({'batch': size, 'transform_ms': legacy, 'preprocess_ms': fast, 'speedup': legacy / fast})
+    return results
+
+
+def _sample_crops(path=None, count=8, seed=0):
+    """이미지에서 크기가 다른 크롭을 잘라낸다. 이미지가 없으면 매끄러운 합성 이미지를 쓴다."""
+    rng = np.random.default_rng(seed)
+    image = cv2.imread(path) if path else None
+    if image is None:
+        y, x = np.mgrid[0:720, 0:1280]
+        image = np.stack([(x / 5) % 256, (y / 3) % 256, ((x + y) / 7) % 256], axis=-1).astype(np.uint8)
+        image = cv2.GaussianBlur(image, (0, 0), 3)
+    image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+    height, width = image.shape[:2]
+    crops = []
+    for _ in range(count):
+        h = int(rng.integers(min(96, height), height // 2 + 1))
+        w = int(rng.integers(min(96, width), width // 2 + 1))
+        y = int(rng.integers(0, height - h + 1))
+        x = int(rng.integers(0, width - w + 1))
+        crops.append(image[y:y + h, x:x + w])
+    return crops
+
+
+if __name__ == '__main__':
+    crops = _sample_crops(sys.argv[1] if len(sys.argv) > 1 else None)
+    parity = check_parity(crops)
+    print(f'parity: 최대 차이 {parity["max_abs_diff"]:.4f}, 평균 차이 {parity["mean_abs_diff"]:.4f} ({parity["crops"]}개 크롭)')
+    for row in benchmark(crops):
+        print(f'batch {row["batch"]}: transform {row["transform_ms"]:.2f}ms, '
+              f'preprocess {row["preprocess_ms"]:.2f}ms (크롭당, {row["speedup"]:.1f}배)')
@@ -0,0 +1,51 @@
+import threading
+
+import cv2 as cv
+
+
+class LivePreview:
+    """
+    링 버퍼의 최신 프레임을 미리보기용 JPEG로 한 번만 인코딩해 두는 핸들.
+    프레임 번호(version)가 바뀔 때만 다시 인코딩하므로, 여러 화면과 세션이 같은 바이트를 공유한다.
+    """
+
+    def __init__(self, buffer, width=800, quality=80):
+        """
+        Args:
+            buffer (FrameBuffer): 미리보기할 프레임 버퍼
+            width (int | None): 미리보기 가로 해상도. None이면 원본 크기
+            quality (int): JPEG 품질 (0~100)
+        """
+        self.buffer = buffer
+        self.width = width
+        self.quality = quality
+        self._lock = threading.Lock()
+        self._version = 0
+        self._data = None
+        self.encoded = 0
+
+    @property
+    def version(self):
+        return self.buffer.version
+
+    def get(self):
+        """
+        Returns:
+            tuple | None: (프레임 번호, JPEG 바이트). 프레임이 없으면 None
+        """
+        frame = self.buffer.latest()
+        if frame is None:
+            return None
+        with self._lock:
+            if frame.seq != self._version:
+                self._data = self._encode(frame.image)
+                self._version = frame.seq
+                self.encoded += 1
+            return self._version, self._data
+
+    def _encode(self, image):
+        height, width = image.shape[:2]
+        if self.width and width > self.width:
+            image = cv.resize(image, (self.width, round(height * self.width / width)), interpolation=cv.INTER_AREA)
+        ok, data = cv.imencode('.jpg', image, [cv.IMWRITE_JPEG_QUALITY, self.quality])
+        return data.tobytes() if ok else None
@@ -0,0 +1,147 @@
+import os
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+
+
+@dataclass
+class RetentionPolicy:
+    """
+    폴더 하나의 보관 정책. 조건이 None이면 그 조건으로는 지우지 않는다.
+
+    Attributes:
+        directory (str): 대상 폴더
+        max_bytes (int | None): 폴더 전체 용량 한도. 넘으면 오래된 파일부터 지운다.
+        max_age (float | None): 파일 보관 기간(초)
+        max_files (int | None): 파일 수 한도
+    """
+    directory: str
+    max_bytes: int | None = None
+    max_age: float | None = None
+    max_files: int | None = None
+
+
+class RetentionJanitor:
+    """
+    폴더별 보관 정책에 따라 오래된 파일을 백그라운드에서 한꺼번에 지우는 관리자.
+    폴더를 직접 훑으므로 이전 실행에서 남은 파일도 계산에 포함된다.
+    protect()로 등록한 파일과 min_age초보다 최근에 수정된(아직 쓰는 중일 수 있는) 파일은 지우지 않는다.
+    """
+
+    def __init__(self, policies, interval=10.0, min_age=5.0, max_deletes=500, on_delete=None):
+        """
+        Args:
+            policies (list[RetentionPolicy]): 폴더별 정책
+            interval (float): 정리 주기(초)
+            min_age (float): 이보다 최근에 수정된 파일은 지우지 않는다(초)
+            max_deletes (int): 한 번에 지우는 최대 파일 수
+            on_delete (callable | None): 폴더 하나를 정리한 뒤 지운 파일 경로 목록을 넘겨 호출한다
+        """
+        self.policies = policies
+        self.interval = interval
+        self.min_age = min_age
+        self.max_deletes = max_deletes
+        self.on_delete = on_delete
+        self._protected = Counter()
+        self._lock = threading.Lock()
+        self._usage = {policy.directory: {'files': 0, 'bytes': 0, 'deleted_files': 0, 'deleted_bytes': 0}
+                       for policy in policies}
+        self.last_run_ms = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def protect(self, *paths):
+        with self._lock:
+            self._protected.update(os.path.normpath(path) for path in paths)
+
+    def release(self, *paths):
+        with self._lock:
+            self._protected.subtract(os.path.normpath(path) for path in paths)
+            self._protected += Counter()
+
+    def usage(self):
+        """폴더별 현재 파일 수와 용량, 지금까지 지운 파일 수와 용량을 반환한다."""
+        with self._lock:
+            return {directory: dict(usage) for directory, usage in self._usage.items()}
+
+    def _run(self):
+        while True:
+            start = time.perf_counter()
+            self.run_once()
+            self.last_run_ms = (time.perf_counter() - start) * 1000
+            if self._stop.wait(self.interval):
+                break
+
+    def run_once(self):
+        for policy in self.policies:
+            try:
+                self._apply(policy)
+            except Exception as e:
+                print(f'❌ 파일 정리 실패: {policy.directory} ({e})')
+
+    def _scan(self, directory):
+        entries = []
+        with os.scandir(directory) as it:
+            for entry in it:
+                if entry.is_file():
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+        entries.sort()
+        return entries
+
+    def _apply(self, policy):
+        if not os.path.isdir(policy.directory):
+            return
+        entries = self._scan(policy.directory)
+        total_bytes = sum(size for _, size, _ in entries)
+        total_files = len(entries)
+        now = time.time()
+        with self._lock:
+            protected = set(self._protected)
+
+        to_delete = []
+        for mtime, size, path in entries:
+            if len(to_delete) >= self.max_deletes:
+                break
+            expired = policy.max_age is not None and now - mtime > policy.max_age
+            over_bytes = policy.max_bytes is not None and total_bytes > policy.max_bytes
+            over_files = policy.max_files is not None and total_files > policy.max_files
+            if not (expired or over_bytes or over_files):
+                # 오래된 순서로 정렬되어 있으므로 이후 파일은 모두 조건을 만족한다.
+                break
+            if now - mtime < self.min_age or os.path.normpath(path) in protected:
+                continue
+            to_delete.append((path, size))
+            total_bytes -= size
+            total_files -= 1
+
+        deleted_files = deleted_bytes = 0
+        deleted = []
+        for path, size in to_delete:
+            try:
+                os.remove(path)
+            except OSError as e:
+                print(e)
+                total_bytes += size
+                total_files += 1
+                continue
+            deleted_files += 1
+            deleted_bytes += size
+            deleted.append(path)
+        if deleted and self.on_delete is not None:
+            self.on_delete(deleted)
+
+        with self._lock:
+            usage = self._usage[policy.directory]
+            usage.update(files=total_files, bytes=total_bytes)
+            usage['deleted_files'] += deleted_files
+            usage['deleted_bytes'] += deleted_bytes
@@ -0,0 +1,163 @@
+import os
+import threading
+import time
+from collections import deque
+
+
+def _clamp(value, low, high):
+    return max(low, min(high, value))
+
+
+class CpuMonitor:
+    """
+    시스템 전체 CPU 사용률(0~1)을 읽는다. psutil이 없으면 load average를, 그것도 없으면(Windows) None을 반환한다.
+    읽을 방법(source)이 없으면 시작할 때 한 번 경고하고, 스케줄러는 CPU 여유를 보지 않고 추론 시간만으로 조절한다.
+    """
+
+    def __init__(self):
+        try:
+            import psutil
+            self._psutil = psutil
+            psutil.cpu_percent(interval=None)  # 첫 호출은 기준점만 만든다.
+            self.source = 'psutil'
+        except ImportError:
+            self._psutil = None
+            self.source = 'loadavg' if hasattr(os, 'getloadavg') else None
+        if self.source is None:
+            print('⚠️ CPU 사용률을 읽을 수 없어 CPU 여유에 맞춘 조절을 하지 않습니다. psutil을 설치하세요.')
+
+    def sample(self):
+        if self.source == 'psutil':
+            return self._psutil.cpu_percent(interval=None) / 100
+        if self.source == 'loadavg':
+            return min(os.getloadavg()[0] / (os.cpu_count() or 1), 1.0)
+        return None
+
+
+class AdaptiveScheduler:
+    """
+    추론에 실제로 걸린 시간과 CPU 여유에 맞춰 캡쳐 FPS와 추론 주기를 정한다.
+    추론이 주기의 target_load만큼만 차지하도록 주기를 잡고, 캡쳐는 그 주기에 추론할 수 있는 만큼만 한다.
+    CPU 사용률이 cpu_limit을 넘으면 그 비율만큼 더 늦춘다. 두 값은 설정한 범위 안에서만 움직이므로,
+    느린 미니 PC에서는 하한으로, 빠른 PC에서는 상한으로 수렴한다.
+    행동이 바뀌면 boost_duration초 동안 가장 짧은 주기로, 쌓인 프레임을 boost_batch개까지 추론한다.
+    """
+
+    def __init__(
+        self, capture_fps=2.0, infer_interval=1.0, min_capture_fps=1.0, max_capture_fps=5.0,
+        min_infer_interval=0.25, max_infer_interval=2.0, target_load=0.7, cpu_limit=0.85,
+        boost_duration=5.0, boost_batch=4, smoothing=0.3,
+    ):
+        """
+        Args:
+            capture_fps (float): 처음 캡쳐 FPS
+            infer_interval (float): 처음 추론 주기(초)
+            min_capture_fps, max_capture_fps (float): 캡쳐 FPS 범위
+            min_infer_interval, max_infer_interval (float): 추론 주기 범위(초)
+            target_load (float): 추론 주기 중 추론이 차지해도 되는 비율
+            cpu_limit (float): 이 사용률(0~1)을 넘으면 캡쳐와 추론을 늦춘다.
+            boost_duration (float): 행동이 바뀐 뒤 우선 추론하는 시간(초)
+            boost_batch (int): 우선 추론 중 한 번에 추론할 최대 프레임 수
+            smoothing (float): 지연 시간 이동 평균의 가중치 (클수록 최근 값을 많이 반영)
+        """
+        self.capture_fps = _clamp(capture_fps, min_capture_fps, max_capture_fps)
+        self.infer_interval = _clamp(infer_interval, min_infer_interval, max_infer_interval)
+        self.min_capture_fps = min_capture_fps
+        self.max_capture_fps = max_capture_fps
+        self.min_infer_interval = min_infer_interval
+        self.max_infer_interval = max_infer_interval
+        self.target_load = target_load
+        self.cpu_limit = cpu_limit
+        self.boost_duration = boost_duration
+        self.boost_batch = boost_batch
+        self.smoothing = smoothing
+        self.cpu = CpuMonitor()
+        self._lock = threading.Lock()
+        self.frame_ms = None  # 프레임당 추론 시간 이동 평균
+        self.batch_ms = None  # 한 번 추론할 때 걸린 시간 이동 평균
+        self.last_batch_s = 0.0
+        self.cpu_usage = None
+        self.inferred = 0
+        self.skipped = 0
+        self.boosts = 0
+        self._boost_until = 0.0
+        self._recent = deque(maxlen=200)  # (시각, 추론한 프레임 수)
+        self._warmed_up = False
+
+    @property
+    def boosting(self):
+        return time.monotonic() < self._boost_until
+
+    def behavior_changed(self):
+        """행동 변화가 감지되었음을 알린다. 잠시 동안 변화 직후의 프레임을 우선 추론한다."""
+        if not self.boosting:
+            self.boosts += 1
+        self._boost_until = time.monotonic() + self.boost_duration
+
+    def batch_size(self, default):
+        """이번에 추론할 최대 프레임 수."""
+        return max(default, self.boost_batch) if self.boosting else default
+
+    def next_delay(self):
+        """다음 추론까지 기다릴 시간(초). 이번 추론에 걸린 시간은 주기에서 뺀다."""
+        interval = self.min_infer_interval if self.boosting else self.infer_interval
+        return max(0.0, interval - self.last_batch_s)
+
+    def observe(self, frames, elapsed, skipped=0):
+        """
+        추론 한 번의 결과를 반영해 캡쳐 FPS와 추론 주기를 다시 계산한다.
+
+        Args:
+            frames (int): 추론한 프레임 수 (움직임이 없어 건너뛴 프레임 제외)
+            elapsed (float): 추론(대기 포함)에 걸린 시간(초)
+            skipped (int): 추론하지 못하고 지나간 프레임 수
+        """
+        with self._lock:
+            self.last_batch_s = elapsed
+            self.skipped += skipped
+            self.inferred += frames
+            self._recent.append((time.monotonic(), frames))
+            if not frames:
+                return
+            if not self._warmed_up:
+                # 첫 추론은 모델 로드와 작업자 시작을 기다린 시간이 섞여 있으므로 반영하지 않는다.
+                self._warmed_up = True
+                return
+            a = self.smoothing
+            frame_ms = elapsed * 1000 / frames
+            self.frame_ms = frame_ms if self.frame_ms is None else a * frame_ms + (1 - a) * self.frame_ms
+            batch_ms = elapsed * 1000
+            self.batch_ms = batch_ms if self.batch_ms is None else a * batch_ms + (1 - a) * self.batch_ms
+            self.cpu_usage = self.cpu.sample()
+
+            interval = self.batch_ms / 1000 / self.target_load
+            capture_fps = self.target_load * 1000 / self.frame_ms if self.frame_ms > 0 else self.max_capture_fps
+            if self.cpu_usage is not None and self.cpu_usage > self.cpu_limit:
+                pressure = self.cpu_usage / self.cpu_limit
+                interval *= pressure
+                capture_fps /= pressure
+            self.infer_interval = _clamp(interval, self.min_infer_interval, self.max_infer_interval)
+            self.capture_fps = _clamp(capture_fps, self.min_capture_fps, self.max_capture_fps)
+
+    def effective_fps(self, window=10.0):
+        """최근 window초 동안 실제로 추론한 초당 프레임 수."""
+        now = time.monotonic()
+        recent = [(t, n) for t, n in list(self._recent) if now - t <= window]
+        if not recent:
+            return 0.0
+        span = max(now - recent[0][0], self.infer_interval)
+        return sum(n for _, n in recent) / span
+
+    def stats(self):
+        return {
+            'capture_fps_target': self.capture_fps,
+            'infer_interval': self.infer_interval,
+            'infer_fps': self.effective_fps(),
+            'frame_ms': self.frame_ms,
+            'cpu_usage': self.cpu_usage,
+            'cpu_source': self.cpu.source,
+            'inferred': self.inferred,
+            'skipped_frames': self.skipped,
+            'boosting': self.boosting,
+            'boosts': self.boosts,
+        }
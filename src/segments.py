@@ -0,0 +1,171 @@
+import bisect
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+# 관측이 이 시간(초)보다 오래 끊기면 구간을 끊는다. 앱의 가장 긴 추론 주기(2초)의 5배다.
+DEFAULT_MAX_GAP = 10.0
+
+
+@dataclass
+class Segment:
+    start: datetime
+    end: datetime
+    behavior: str
+    files: list = field(default_factory=list)
+
+    @property
+    def duration(self) -> timedelta:
+        return self.end - self.start
+
+
+class SegmentIndex:
+    """
+    행동 기록과 추론 결과(시각, 행동)를 이어 붙여 만든 (시작, 끝, 행동) 구간 목록.
+    같은 행동이 이어지는 동안은 한 구간으로 늘리고, 행동이 바뀌면 그 시각에 구간을 닫고 새 구간을 연다.
+    build_timeline과 같이 날짜가 바뀌면 구간을 끊고, 관측이 max_gap보다 오래 끊긴 곳(앱 종료, 캡쳐 멈춤)에서도 끊는다.
+    끊긴 동안은 어떤 구간에도 속하지 않으므로, 보지 못한 시간에 행동이 이어졌다고 답하지 않는다.
+
+    구간은 겹치지 않고 시작 시각 순서로 쌓이므로, 시작 시각 목록을 이분 탐색해
+    시점, 기간(겹침) 조회를 O(log n + 결과 수)에 한다. 행동별로도 같은 목록을 따로 둔다.
+    """
+
+    def __init__(self, max_gap=DEFAULT_MAX_GAP):
+        """
+        Args:
+            max_gap (float | None): 관측이 이 시간(초)보다 오래 끊기면 구간을 끊는다. None이면 날짜가 바뀔 때만 끊는다.
+        """
+        self.max_gap = timedelta(seconds=max_gap) if max_gap is not None else None
+        self._lock = threading.Lock()
+        self._segments: list[Segment] = []
+        self._starts: list[datetime] = []
+        self._by_behavior: dict[str, tuple[list[datetime], list[int]]] = {}
+        self._last_seen = None
+
+    def __len__(self):
+        return len(self._segments)
+
+    def load(self, observations, files=()):
+        """
+        지난 기록으로 구간을 만든다. 순서가 섞여 있어도 시각 순서로 정렬해 넣는다.
+
+        Args:
+            observations (iterable): (시각, 행동) 목록 (행동 기록, bbox 프레임 색인 등)
+            files (iterable): 구간에 붙일 (시각, 파일 경로) 목록 (클립, 캡쳐)
+        """
+        for timestamp, behavior in sorted(observations, key=lambda item: item[0]):
+            self.observe(timestamp, behavior)
+        for timestamp, path in files:
+            self.attach(timestamp, path)
+
+    def observe(self, timestamp: datetime, behavior):
+        """
+        한 시점의 행동을 반영한다. 마지막 관측보다 이른 관측은 무시한다.
+
+        Returns:
+            bool: 새 구간이 시작되었으면 True
+        """
+        with self._lock:
+            last = self._last_seen
+            if last is not None and timestamp < last:
+                return False
+            self._last_seen = timestamp
+            current = self._segments[-1] if self._segments else None
+            if current is not None and last is not None:
+                broken = timestamp.date() != last.date() or (self.max_gap is not None and timestamp - last > self.max_gap)
+                if not broken and current.behavior == behavior:
+                    current.end = timestamp
+                    return False
+                # 행동이 바뀌었으면 바뀐 시각까지, 관측이 끊겼으면 마지막 관측까지를 앞 구간으로 본다.
+                current.end = last if broken else timestamp
+            self._append(Segment(timestamp, timestamp, behavior))
+            return True
+
+    def _append(self, segment):
+        index = len(self._segments)
+        self._segments.append(segment)
+        self._starts.append(segment.start)
+        starts, indices = self._by_behavior.setdefault(segment.behavior, ([], []))
+        starts.append(segment.start)
+        indices.append(index)
+
+    def attach(self, timestamp: datetime, path):
+        """
+        timestamp를 포함하는 구간에 파일(클립, 캡쳐)을 붙인다. 진행 중인 마지막 구간 뒤의 같은 날 시각이고
+        마지막 관측에서 max_gap 이내이면 그 구간에 붙인다. 해당 구간이 없으면 False.
+        """
+        with self._lock:
+            segment = self._at(timestamp)
+            if segment is None and self._segments:
+                last = self._segments[-1]
+                if (timestamp >= last.start and timestamp.date() == last.start.date()
+                        and (self.max_gap is None or timestamp - last.end <= self.max_gap)):
+                    segment = last
+            if segment is None or not path:
+                return False
+            if path not in segment.files:
+                segment.files.append(path)
+            return True
+
+    def _at(self, timestamp):
+        i = bisect.bisect_right(self._starts, timestamp) - 1
+        if i >= 0 and timestamp <= self._segments[i].end:
+            return self._segments[i]
+        return None
+
+    def at(self, timestamp: datetime) -> Segment | None:
+        """timestamp에 진행 중이던 구간. 없으면 None."""
+        with self._lock:
+            return self._at(timestamp)
+
+    def overlapping(self, start: datetime | None = None, end: datetime | None = None, behaviors=None,
+                    min_duration: float | None = None) -> list[Segment]:
+        """
+        [start, end)와 겹치는 구간을 시작 시각 순서로 반환한다.
+
+        Args:
+            behaviors (list[str] | None): 이 행동들의 구간만 반환한다.
+            min_duration (float | None): 이 시간(초)보다 짧은 구간은 뺀다.
+        """
+        with self._lock:
+            if behaviors:
+                candidates = []
+                for behavior in behaviors:
+                    starts, indices = self._by_behavior.get(behavior, ([], []))
+                    lo, hi = self._range(starts, start, end, lambda k: self._segments[indices[k]].end)
+                    candidates.extend(indices[lo:hi])
+                segments = [self._segments[i] for i in sorted(candidates)]
+            else:
+                lo, hi = self._range(self._starts, start, end, lambda k: self._segments[k].end)
+                segments = self._segments[lo:hi]
+            if min_duration is not None:
+                segments = [s for s in segments if s.duration.total_seconds() >= min_duration]
+            return list(segments)
+
+    @staticmethod
+    def _range(starts, start, end, end_of):
+        # 구간은 겹치지 않으므로 시작 시각이 start 이전인 구간 중에서는 마지막 하나만 start 이후까지 이어질 수 있다.
+        lo = 0
+        if start is not None:
+            lo = bisect.bisect_right(starts, start) - 1
+            if lo < 0 or end_of(lo) <= start:
+                lo += 1
+        hi = len(starts) if end is None else bisect.bisect_left(starts, end)
+        return lo, max(lo, hi)
+
+    def clips(self, start: datetime | None = None, end: datetime | None = None, behaviors=None) -> list[str]:
+        """기간과 겹치는 구간에 붙은 파일 경로 목록."""
+        return [path for segment in self.overlapping(start, end, behaviors) for path in segment.files]
+
+    def to_frame(self, segments=None) -> pd.DataFrame:
+        """구간 목록을 시작, 끝, 행동, 지속 시간, 파일 열의 DataFrame으로 만든다."""
+        segments = self.overlapping() if segments is None else segments
+        return pd.DataFrame({
+            '시작': [s.start for s in segments],
+            '끝': [s.end for s in segments],
+            '행동': [s.behavior for s in segments],
+            '지속 시간': [s.duration for s in segments],
+            '파일': [s.files[-1] if s.files else None for s in segments],
+        })
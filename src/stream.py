@@ -0,0 +1,122 @@
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+from src.metrics import metrics
+
+BOUNDARY = b'frame'
+
+
+class _StreamHandler(BaseHTTPRequestHandler):
+    server: 'MjpegServer'
+
+    def do_GET(self):
+        path = urlparse(self.path).path.strip('/')
+        if path == 'metrics':
+            self._send_metrics()
+            return
+        name, ext = os.path.splitext(path)
+        preview = self.server.streams.get(name)
+        if preview is None or ext not in ('.mjpg', '.jpg'):
+            self.send_error(404)
+            return
+        if ext == '.jpg':
+            self._send_snapshot(preview)
+        else:
+            self._send_stream(preview)
+
+    def _send_snapshot(self, preview):
+        current = preview.get()
+        if current is None:
+            self.send_error(503)
+            return
+        _, data = current
+        self.send_response(200)
+        self.send_header('Content-Type', 'image/jpeg')
+        self.send_header('Content-Length', str(len(data)))
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_metrics(self):
+        data = metrics.render().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_stream(self, preview):
+        self.send_response(200)
+        self.send_header('Content-Type', f'multipart/x-mixed-replace; boundary={BOUNDARY.decode()}')
+        self.send_header('Cache-Control', 'no-store')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.server.connected(1)
+        version = 0
+        try:
+            while not self.server.stopped.is_set():
+                preview.buffer.wait_for(version, timeout=1.0)
+                current = preview.get()
+                if current is None or current[0] == version:
+                    continue
+                # 인코딩에 실패한 프레임도 번호는 넘겨야 같은 번호로 계속 깨어나지 않는다.
+                version, data = current
+                if data is None:
+                    continue
+                self.wfile.write(
+                    b'--' + BOUNDARY + b'\r\nContent-Type: image/jpeg\r\n'
+                    + f'Content-Length: {len(data)}\r\n\r\n'.encode() + data + b'\r\n'
+                )
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            self.server.connected(-1)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MjpegServer(ThreadingHTTPServer):
+    """
+    파이프라인의 미리보기를 MJPEG(HTTP multipart)로 내보내는 로컬 스트리밍 서버.
+    프레임은 LivePreview에서 한 번만 인코딩되고, 같은 바이트를 모든 접속자에게 보낸다.
+
+    경로:
+        /<이름>.mjpg: 연속 스트림
+        /<이름>.jpg: 최신 프레임 한 장
+        /metrics: 파이프라인 계측 값 (Prometheus 텍스트 형식)
+    """
+
+    daemon_threads = True
+
+    def __init__(self, streams, host='127.0.0.1', port=8502):
+        """
+        Args:
+            streams (dict[str, LivePreview]): 경로 이름별 미리보기 (예: {'raw': ..., 'annotated': ...})
+            host (str): 바인딩할 주소. 인증이 없으므로 기본값은 이 PC에서만 접속할 수 있는 127.0.0.1이다.
+                다른 기기에서 보려면 '0.0.0.0' 등으로 바꾼다 (같은 네트워크의 누구나 카메라 영상과 지표를 볼 수 있다).
+        """
+        super().__init__((host, port), _StreamHandler)
+        self.streams = streams
+        self.stopped = threading.Event()
+        self.clients = 0
+        self._clients_lock = threading.Lock()
+        self._thread = None
+
+    def connected(self, delta):
+        with self._clients_lock:
+            self.clients += delta
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.stopped.set()
+        self.shutdown()
+        self.server_close()
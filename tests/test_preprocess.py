@@ -0,0 +1,75 @@
+"""
+Preprocessor와 기존 torchvision transform(Resize → ToTensor → Normalize)의 출력 비교.
+
+OpenCV(INTER_AREA/INTER_LINEAR)와 PIL(antialias bilinear)의 리사이즈 보간이 조금 달라 값이 완전히 같지는 않다.
+정규화 후 값에서 밝기 한 단계는 1 / (255 * 0.225) ≈ 0.0174이므로, 크롭마다 다음을 허용 범위로 둔다.
+
+    - 평균 절대 차이 0.01 이하 (밝기 약 0.6단계)
+    - 밝기 2단계(0.035)보다 차이 나는 값의 비율 5% 이하
+
+카메라 프레임에서는 2단계를 넘는 값이 거의 없고, 경계가 날카로운 그래픽(resources/)에서도 3% 정도다.
+저장된 원본 프레임(frames/)이 있으면 최근 프레임의 크롭으로도 비교한다.
+"""
+import glob
+import os
+
+import numpy as np
+import pytest
+import torch
+from PIL import Image
+
+from src.inference import transform
+from src.preprocess import Preprocessor, _sample_crops, preprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MEAN_TOLERANCE = 0.01
+LEVEL_TOLERANCE = 0.035
+OUTLIER_RATIO = 0.05
+
+IMAGES = [os.path.join(ROOT, 'resources', name) for name in ('placeholder.png', 'cam_blind.png')]
+IMAGES += sorted(glob.glob(os.path.join(ROOT, 'frames', '**', '*.jpg'), recursive=True))[-3:]
+
+
+def _expected(crops):
+    return torch.stack([transform(Image.fromarray(crop)) for crop in crops])
+
+
+@pytest.mark.parametrize('path', IMAGES, ids=os.path.basename)
+def test_matches_torchvision_transform(path):
+    crops = _sample_crops(path, count=8)
+    expected = _expected(crops)
+    actual = preprocess(crops)
+
+    assert actual.shape == expected.shape == (len(crops), 3, 224, 224)
+    assert actual.dtype == torch.float32
+    for i in range(len(crops)):
+        diff = (expected[i] - actual[i]).abs()
+        assert float(diff.mean()) <= MEAN_TOLERANCE, f'크롭 {i}: 평균 차이 {float(diff.mean()):.4f}'
+        outliers = float((diff > LEVEL_TOLERANCE).float().mean())
+        assert outliers <= OUTLIER_RATIO, f'크롭 {i}: 2단계를 넘는 값 {outliers * 100:.1f}%'
+
+
+def test_upscaled_crops_match():
+    # 224보다 작은 크롭은 INTER_LINEAR로 키운다.
+    crops = [crop[:96, :128] for crop in _sample_crops(IMAGES[0], count=4)]
+    diff = (_expected(crops) - preprocess(crops)).abs()
+    assert float(diff.mean()) <= MEAN_TOLERANCE
+
+
+def test_buffers_grow_and_are_reused():
+    preprocessor = Preprocessor(max_batch=2)
+    crops = _sample_crops(IMAGES[0], count=5)
+    first = preprocessor(crops[:2])
+    assert first.data_ptr() == preprocessor(crops[2:4]).data_ptr()
+
+    # max_batch보다 많은 크롭이 들어오면 버퍼를 늘리고, 결과는 크롭을 하나씩 처리한 것과 같다.
+    batch = preprocessor(crops).clone()
+    singles = torch.cat([preprocessor.one(crop).clone() for crop in crops])
+    assert torch.equal(batch, singles)
+
+
+def test_non_contiguous_crop():
+    image = np.ascontiguousarray(_sample_crops(IMAGES[0], count=1)[0])
+    crop = image[::2, ::2]
+    assert not crop.flags['C_CONTIGUOUS']
+    assert float((_expected([crop]) - preprocess([crop])).abs().mean()) <= MEAN_TOLERANCE